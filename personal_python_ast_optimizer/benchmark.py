@@ -0,0 +1,222 @@
+"""Times minifying a corpus of python files, split by phase.
+
+Run with python -m personal_python_ast_optimizer.benchmark --help"""
+
+import argparse
+import ast
+import json
+import os
+import sys
+import sysconfig
+import time
+import tokenize
+import warnings
+from typing import Any
+
+from personal_python_ast_optimizer.flake_wrapper import run_autoflake
+from personal_python_ast_optimizer.parser.config import SkipConfig
+from personal_python_ast_optimizer.parser.minifier import MinifyUnparser
+from personal_python_ast_optimizer.parser.skipper import AstNodeSkipper
+
+PHASES: tuple[str, ...] = ("parse", "skip", "unparse", "autoflake")
+
+
+class BenchmarkResult:
+    """Seconds spent in each phase over every file that minified successfully"""
+
+    __slots__ = ("files", "size_bytes", "errors", "phase_seconds")
+
+    def __init__(
+        self,
+        files: int = 0,
+        size_bytes: int = 0,
+        errors: int = 0,
+        phase_seconds: dict[str, float] | None = None,
+    ) -> None:
+        self.files: int = files
+        self.size_bytes: int = size_bytes
+        self.errors: int = errors
+        self.phase_seconds: dict[str, float] = (
+            {phase: 0.0 for phase in PHASES} if phase_seconds is None else phase_seconds
+        )
+
+    def total_seconds(self) -> float:
+        return sum(self.phase_seconds.values())
+
+    def files_per_second(self) -> float:
+        total_seconds: float = self.total_seconds()
+        return self.files / total_seconds if total_seconds else 0.0
+
+    def megabytes_per_second(self) -> float:
+        total_seconds: float = self.total_seconds()
+        return self.size_bytes / 1_000_000 / total_seconds if total_seconds else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "python": sys.version.split()[0],
+            "files": self.files,
+            "bytes": self.size_bytes,
+            "errors": self.errors,
+            "phase_seconds": self.phase_seconds,
+            "total_seconds": self.total_seconds(),
+            "files_per_second": self.files_per_second(),
+            "megabytes_per_second": self.megabytes_per_second(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "BenchmarkResult":
+        return cls(data["files"], data["bytes"], data["errors"], data["phase_seconds"])
+
+
+def load_corpus(directory: str) -> list[str]:
+    """Reads every .py file under directory, skipping third party packages"""
+    sources: list[str] = []
+
+    for dir_path, dir_names, file_names in os.walk(directory):
+        dir_names[:] = sorted(name for name in dir_names if name != "site-packages")
+
+        for file_name in sorted(file_names):
+            if not file_name.endswith(".py"):
+                continue
+            try:
+                with tokenize.open(os.path.join(dir_path, file_name)) as fp:
+                    sources.append(fp.read())
+            except (OSError, SyntaxError, UnicodeDecodeError):
+                continue
+
+    return sources
+
+
+def run_benchmark(sources: list[str], repeat: int = 1) -> BenchmarkResult:
+    """Minifies each source repeat times and keeps the fastest time of each phase"""
+    result = BenchmarkResult()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+
+        for source in sources:
+            best_seconds: list[float] | None = None
+            try:
+                for _ in range(repeat):
+                    seconds: list[float] = _time_phases(source)
+                    best_seconds = (
+                        seconds
+                        if best_seconds is None
+                        else list(map(min, best_seconds, seconds))
+                    )
+            except Exception:
+                result.errors += 1
+                continue
+
+            if best_seconds is None:
+                continue
+
+            result.files += 1
+            result.size_bytes += len(source.encode("utf-8", "surrogatepass"))
+            for phase, phase_seconds in zip(PHASES, best_seconds):
+                result.phase_seconds[phase] += phase_seconds
+
+    return result
+
+
+def compare_to_baseline(
+    result: BenchmarkResult, baseline: BenchmarkResult, max_regression: float = 0.1
+) -> list[str]:
+    """Returns a message for each phase that got slower by more than
+    max_regression, as a fraction of the baseline's time.
+    Times are scaled by file count so a changed corpus size still compares"""
+    regressions: list[str] = []
+
+    for phase in PHASES:
+        baseline_seconds: float = baseline.phase_seconds.get(phase, 0.0)
+        if not baseline_seconds or not result.files or not baseline.files:
+            continue
+
+        seconds_per_file: float = result.phase_seconds[phase] / result.files
+        baseline_seconds_per_file: float = baseline_seconds / baseline.files
+        change: float = seconds_per_file / baseline_seconds_per_file - 1
+
+        if change > max_regression:
+            regressions.append(f"{phase} is {change:.1%} slower than baseline")
+
+    return regressions
+
+
+def _time_phases(source: str) -> list[float]:
+    start: float = time.perf_counter()
+    module: ast.Module = ast.parse(source)
+    parsed: float = time.perf_counter()
+    module = AstNodeSkipper(SkipConfig()).visit(module)
+    skipped: float = time.perf_counter()
+    minified_source: str = MinifyUnparser().visit(module)
+    unparsed: float = time.perf_counter()
+    run_autoflake(minified_source)
+    end: float = time.perf_counter()
+
+    return [parsed - start, skipped - parsed, unparsed - skipped, end - unparsed]
+
+
+def _print_result(result: BenchmarkResult, baseline: BenchmarkResult | None) -> None:
+    print(
+        f"{result.files} files, {result.size_bytes / 1_000_000:.2f} MB, "
+        f"{result.errors} errors"
+    )
+    print(
+        f"{result.files_per_second():.1f} files/sec, "
+        f"{result.megabytes_per_second():.3f} MB/sec"
+    )
+
+    total_seconds: float = result.total_seconds()
+    for phase in PHASES:
+        seconds: float = result.phase_seconds[phase]
+        share: float = seconds / total_seconds if total_seconds else 0.0
+        line: str = f"{phase:>10}: {seconds:8.3f}s {share:6.1%}"
+
+        if baseline is not None and baseline.phase_seconds.get(phase):
+            line += f" (baseline {baseline.phase_seconds[phase]:8.3f}s)"
+        print(line)
+
+
+def main(argv: list[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument(
+        "--corpus",
+        default=sysconfig.get_paths()["stdlib"],
+        help="directory of .py files to minify, defaults to the standard library",
+    )
+    arg_parser.add_argument("--repeat", type=int, default=1)
+    arg_parser.add_argument("--output", help="path to save results as JSON")
+    arg_parser.add_argument("--baseline", help="path of saved results to compare to")
+    arg_parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.1,
+        help="fraction a phase may slow down before failing, defaults to 0.1",
+    )
+    args = arg_parser.parse_args(argv)
+
+    result: BenchmarkResult = run_benchmark(load_corpus(args.corpus), args.repeat)
+
+    baseline: BenchmarkResult | None = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as fp:
+            baseline = BenchmarkResult.from_dict(json.load(fp))
+
+    _print_result(result, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump(result.to_dict(), fp, indent=2)
+
+    if baseline is None:
+        return 0
+
+    regressions: list[str] = compare_to_baseline(result, baseline, args.max_regression)
+    for regression in regressions:
+        print(regression)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
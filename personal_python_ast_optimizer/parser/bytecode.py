@@ -0,0 +1,78 @@
+import ast
+import importlib.util
+import marshal
+import os
+import sys
+import tempfile
+from py_compile import PycInvalidationMode
+
+# Bits of the pyc header's flags field, see PEP 552
+_HASH_BASED_FLAG: int = 0b01
+_CHECK_SOURCE_FLAG: int = 0b10
+
+
+def get_default_invalidation_mode() -> PycInvalidationMode:
+    """Same default as py_compile, reproducible builds get hash based pycs"""
+    if os.environ.get("SOURCE_DATE_EPOCH"):
+        return PycInvalidationMode.CHECKED_HASH
+
+    return PycInvalidationMode.TIMESTAMP
+
+
+def check_target_python_version(target_python_version: tuple[int, int] | None) -> None:
+    """Bytecode only loads on the python version that compiled it"""
+    if (
+        target_python_version is not None
+        and target_python_version != sys.version_info[:2]
+    ):
+        raise ValueError(
+            f"Bytecode for python {target_python_version} can not be compiled "
+            f"by python {sys.version_info[:2]}"
+        )
+
+
+def compile_to_pyc(
+    module: ast.Module,
+    filename: str,
+    source_bytes: bytes,
+    source_mtime: float = 0,
+    invalidation_mode: PycInvalidationMode | None = None,
+) -> bytes:
+    """Compiles module to the contents of a pyc file.
+    source_bytes and source_mtime describe the source file the pyc is checked
+    against when imported, which does not need to be the source of module"""
+    if invalidation_mode is None:
+        invalidation_mode = get_default_invalidation_mode()
+
+    ast.fix_missing_locations(module)
+    code = compile(module, filename, "exec", dont_inherit=True)
+
+    header: bytearray = bytearray(importlib.util.MAGIC_NUMBER)
+    if invalidation_mode == PycInvalidationMode.TIMESTAMP:
+        header.extend((0).to_bytes(4, "little"))
+        header.extend((int(source_mtime) & 0xFFFFFFFF).to_bytes(4, "little"))
+        header.extend((len(source_bytes) & 0xFFFFFFFF).to_bytes(4, "little"))
+    else:
+        flags: int = _HASH_BASED_FLAG
+        if invalidation_mode == PycInvalidationMode.CHECKED_HASH:
+            flags |= _CHECK_SOURCE_FLAG
+        header.extend(flags.to_bytes(4, "little"))
+        header.extend(importlib.util.source_hash(source_bytes))
+
+    return bytes(header) + marshal.dumps(code)
+
+
+def write_pyc(path: str, pyc: bytes) -> None:
+    """Writes pyc to a temp file and moves it into place,
+    so an importer never sees a partially written file"""
+    pyc_dir: str = os.path.dirname(path) or "."
+    os.makedirs(pyc_dir, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(dir=pyc_dir, prefix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(pyc)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
@@ -0,0 +1,206 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from importlib.metadata import PackageNotFoundError, version
+
+from personal_python_ast_optimizer.parser.config import Config, SkipUsage, TokensToSkip
+
+# Bump when the layout of cache entries changes
+_CACHE_FORMAT: int = 3
+
+_TEMP_FILE_PREFIX: str = ".tmp"
+
+# Temp files this old were left by a writer that died
+_STALE_TEMP_FILE_SECONDS: int = 60 * 60
+
+
+class CachedMinify:
+    """Minified source, the warnings raised while minifying it,
+    and the tokens to skip that were found in it"""
+
+    __slots__ = ("source", "warnings", "skip_usage")
+
+    def __init__(
+        self, source: str, warnings: list[str], skip_usage: SkipUsage | None = None
+    ) -> None:
+        self.source: str = source
+        self.warnings: list[str] = warnings
+        self.skip_usage: SkipUsage = SkipUsage() if skip_usage is None else skip_usage
+
+
+class MinifyCache:
+    """On disk cache of minified sources keyed by source and config.
+
+    Entries are written to a temp file and moved into place, so any number of
+    processes can read and write the same directory without locks.
+    Call prune to evict the least recently used entries above max_size bytes."""
+
+    __slots__ = ("directory", "max_size")
+
+    def __init__(self, directory: str, max_size: int = 256 * 1024 * 1024) -> None:
+        self.directory: str = directory
+        self.max_size: int = max_size
+
+    def get_key(self, source: str, config_fingerprint: str) -> str:
+        """Returns key of source minified with config of the given fingerprint"""
+        key_hash = hashlib.sha256()
+        key_hash.update(_get_environment_fingerprint().encode())
+        key_hash.update(b"\0")
+        key_hash.update(config_fingerprint.encode())
+        key_hash.update(b"\0")
+        key_hash.update(source.encode("utf-8", "surrogatepass"))
+
+        return key_hash.hexdigest()
+
+    def get(self, key: str) -> CachedMinify | None:
+        path: str = self._get_entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as fp:
+                entry: dict = json.load(fp)
+            # mtime tracks last use for eviction
+            os.utime(path)
+        except (OSError, ValueError):
+            # Missing, evicted by another process, or unreadable
+            return None
+
+        return CachedMinify(
+            entry["source"],
+            entry["warnings"],
+            SkipUsage(entry["found_tokens"], entry["moved_imports"]),
+        )
+
+    def put(self, key: str, cached_minify: CachedMinify) -> None:
+        path: str = self._get_entry_path(key)
+        entry_dir: str = os.path.dirname(path)
+        os.makedirs(entry_dir, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(dir=entry_dir, prefix=_TEMP_FILE_PREFIX)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fp:
+                json.dump(
+                    {
+                        "source": cached_minify.source,
+                        "warnings": cached_minify.warnings,
+                        "found_tokens": cached_minify.skip_usage.found_counts,
+                        "moved_imports": cached_minify.skip_usage.moved_imports,
+                    },
+                    fp,
+                )
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def prune(self) -> None:
+        """Deletes least recently used entries until the cache fits in max_size"""
+        entries: list[tuple[float, int, str]] = []
+        now: float = time.time()
+
+        for path in self._iter_files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            if os.path.basename(path).startswith(_TEMP_FILE_PREFIX):
+                if now - stat.st_mtime > _STALE_TEMP_FILE_SECONDS:
+                    _remove_if_exists(path)
+                continue
+
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size: int = sum(size for _, size, _ in entries)
+        entries.sort()
+
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            _remove_if_exists(path)
+            total_size -= size
+
+    def _get_entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def _iter_files(self):
+        if not os.path.isdir(self.directory):
+            return
+
+        for shard in os.scandir(self.directory):
+            if shard.is_dir():
+                for entry in os.scandir(shard.path):
+                    yield entry.path
+
+
+def get_config_fingerprint(config: Config | None) -> str:
+    """Returns a string that is equal for configs with equal settings,
+    regardless of insertion order of their sets and dicts"""
+    return repr(_to_stable_value(config))
+
+
+def _to_stable_value(value: object) -> object:
+    if isinstance(value, TokensToSkip):
+        return (value.token_type, tuple(sorted(value)))
+
+    if isinstance(value, Config):
+        attrs: tuple[str, ...] = value.__slots__  # type: ignore
+        return (
+            type(value).__name__,
+            tuple((attr, _to_stable_value(getattr(value, attr))) for attr in attrs),
+        )
+
+    if isinstance(value, dict):
+        return tuple(sorted((repr(k), _to_stable_value(v)) for k, v in value.items()))
+
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(repr(v) for v in value))
+
+    if isinstance(value, (list, tuple)):
+        return tuple(_to_stable_value(v) for v in value)
+
+    return value
+
+
+_environment_fingerprint: str = ""
+
+
+def _get_environment_fingerprint() -> str:
+    """Returns fingerprint of this package and the python running it,
+    since both change the output"""
+    global _environment_fingerprint
+
+    if not _environment_fingerprint:
+        try:
+            package_version: str = version("personal-python-ast-optimizer")
+        except PackageNotFoundError:
+            package_version = _hash_package_source()
+
+        _environment_fingerprint = (
+            f"{_CACHE_FORMAT}:{package_version}:{sys.version_info[:2]}"
+        )
+
+    return _environment_fingerprint
+
+
+def _hash_package_source() -> str:
+    """Hashes this package's own code, used when it is not installed"""
+    package_dir: str = os.path.dirname(os.path.dirname(__file__))
+    source_hash = hashlib.sha256()
+
+    for dir_path, dir_names, file_names in os.walk(package_dir):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            if file_name.endswith(".py"):
+                with open(os.path.join(dir_path, file_name), "rb") as fp:
+                    source_hash.update(fp.read())
+
+    return source_hash.hexdigest()
+
+
+def _remove_if_exists(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
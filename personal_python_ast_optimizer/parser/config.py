@@ -1,36 +1,219 @@
+import copy
+import fnmatch
+import re
 from abc import ABC, abstractmethod
-from typing import Iterator
+from typing import Any, Iterable, Iterator
 
+# Levels of the logging module, by name
+LOGGING_LEVELS: dict[str, int] = {
+    "CRITICAL": 50,
+    "FATAL": 50,
+    "ERROR": 40,
+    "WARNING": 30,
+    "WARN": 30,
+    "INFO": 20,
+    "DEBUG": 10,
+    "NOTSET": 0,
+}
 
-class TokensToSkip(dict[str, int]):
+DEFAULT_LOGGER_NAMES: frozenset[str] = frozenset(
+    ("logging", "logger", "log", "_logger", "_log", "LOGGER", "LOG")
+)
 
-    __slots__ = ("token_type",)
 
-    def __init__(self, tokens_to_skip: set[str] | None, token_type: str) -> None:
-        tokens_and_counts: dict[str, int] = self._set_to_dict_of_counts(tokens_to_skip)
-        super().__init__(tokens_and_counts)
+class SkipUsage:
+    """Times each token to skip was found, by token type,
+    and imports moved into functions.
 
+    Skippers record into their own SkipUsage instead of into the config,
+    so one config can be used by many threads at once. Usage of separate
+    runs, like workers of a project, can be merged to report on all of them"""
+
+    __slots__ = ("found_counts", "moved_imports")
+
+    def __init__(
+        self,
+        found_counts: dict[str, dict[str, int]] | None = None,
+        moved_imports: list[str] | None = None,
+    ) -> None:
+        self.found_counts: dict[str, dict[str, int]] = (
+            {} if found_counts is None else found_counts
+        )
+        # Descriptions of imports moved, see ExtrasToSkipConfig.lazy_imports
+        self.moved_imports: list[str] = [] if moved_imports is None else moved_imports
+
+    def record(self, token_type: str, token: str) -> None:
+        counts: dict[str, int] = self.found_counts.setdefault(token_type, {})
+        counts[token] = counts.get(token, 0) + 1
+
+    def merge(self, other: "SkipUsage") -> None:
+        """Adds counts of other to this usage"""
+        for token_type, other_counts in other.found_counts.items():
+            counts: dict[str, int] = self.found_counts.setdefault(token_type, {})
+            for token, count in other_counts.items():
+                counts[token] = counts.get(token, 0) + count
+        self.moved_imports.extend(other.moved_imports)
+
+    def clear(self) -> None:
+        self.found_counts = {}
+        self.moved_imports = []
+
+    def get_not_found_tokens(
+        self, tokens_to_skip_config: "TokensToSkipConfig"
+    ) -> dict[str, list[str]]:
+        """Returns sorted tokens of the config never found, by token type.
+        Tokens in the config's no_warn are left out"""
+        not_found_tokens: dict[str, list[str]] = {}
+        for tokens_to_skip in tokens_to_skip_config:
+            found_counts: dict[str, int] = self.found_counts.get(
+                tokens_to_skip.token_type, {}
+            )
+            tokens: list[str] = sorted(
+                token
+                for token in tokens_to_skip
+                if token not in found_counts
+                and token not in tokens_to_skip_config.no_warn
+            )
+            if tokens:
+                not_found_tokens[tokens_to_skip.token_type] = tokens
+
+        return not_found_tokens
+
+
+# Tokens with these are globs, like test_*
+_GLOB_CHARACTERS: frozenset[str] = frozenset("*?[")
+
+# Prefix of tokens that are regular expressions, like re:_debug_.*
+_REGEX_PREFIX: str = "re:"
+
+
+class TokensToSkip:
+    """Tokens of one type to skip. Checking if a token is in it records the
+    token to usage when found, if there is one.
+
+    Tokens can be dotted, like "settings.debug" or "module.Class.method",
+    to match names only when they end with all of the token's parts.
+
+    Tokens can also be patterns: globs like "test_*", or regular expressions
+    after "re:" like "re:_debug_.*". Patterns match whole names looked up
+    with in, and the last part of dotted names. Usage records the pattern
+    a name matched, so each pattern is warned about if it never matches"""
+
+    __slots__ = ("tokens", "token_type", "usage", "pattern", "_trie", "_patterns")
+
+    def __init__(
+        self,
+        tokens_to_skip: Iterable[str] | None,
+        token_type: str,
+        usage: SkipUsage | None = None,
+    ) -> None:
+        self.tokens: frozenset[str] = frozenset(tokens_to_skip or ())
         self.token_type: str = token_type
+        self.usage: SkipUsage | None = usage
+
+        # Trie of the parts of each token from last to first, so the tokens a
+        # dotted name ends with are found in one walk over as many of its parts
+        # as needed. None holds the token ending at a node
+        self._trie: dict[str | None, Any] = {}
+        # Patterns by the name of their group in pattern
+        self._patterns: dict[str, str] = {}
+        regexes: list[str] = []
+
+        # Sorted so a name matching many patterns is always counted for the same
+        for token in sorted(self.tokens):
+            regex: str | None = _to_regex(token)
+            if regex is not None:
+                group_name: str = f"_p{len(regexes)}"
+                self._patterns[group_name] = token
+                regexes.append(f"(?P<{group_name}>{regex})")
+                continue
+
+            node: dict[str | None, Any] = self._trie
+            for part in reversed(token.split(".")):
+                node = node.setdefault(part, {})
+            node[None] = token
+
+        # All patterns in one expression, so a name is matched against them once
+        try:
+            self.pattern: re.Pattern | None = (
+                re.compile("|".join(regexes)) if regexes else None
+            )
+        except re.error as e:
+            raise ValueError(f"Invalid pattern of {token_type} to skip: {e}") from e
+
+    def __contains__(self, key: object) -> bool:
+        if key in self.tokens:
+            self._record(key)  # type: ignore
+            return True
+
+        return (
+            self.pattern is not None
+            and isinstance(key, str)
+            and self._matches_pattern(key)
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.tokens)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def matches_parts(self, parts: Iterable[str]) -> bool:
+        """Returns if a token is the end of the dotted name of parts, which go
+        from last to first. Bare tokens match any name with the same last part"""
+        parts = iter(parts)
+        first_part: str | None = next(parts, None)
+        if first_part is None:
+            return False
+
+        node: dict[str | None, Any] | None = self._trie.get(first_part)
+        while node is not None and None not in node:
+            part: str | None = next(parts, None)
+            node = None if part is None else node.get(part)
+
+        if node is not None:
+            self._record(node[None])
+            return True
+
+        return self.pattern is not None and self._matches_pattern(first_part)
+
+    def with_usage(self, usage: SkipUsage | None) -> "TokensToSkip":
+        """Returns the same tokens, recording to usage instead"""
+        tokens_to_skip: TokensToSkip = copy.copy(self)
+        tokens_to_skip.usage = usage
 
-    def __contains__(self, key: str) -> bool:  # type: ignore
-        """Returns if token is marked to skip and
-        increments internal counter when True is returned"""
-        contains: bool = super().__contains__(key)
+        return tokens_to_skip
 
-        if contains:
-            self[key] += 1
+    def _matches_pattern(self, name: str) -> bool:
+        match: re.Match | None = self.pattern.fullmatch(name)  # type: ignore
+        if match is None:
+            return False
 
-        return contains
+        self._record(self._patterns[match.lastgroup])  # type: ignore
+        return True
 
-    def get_not_found_tokens(self) -> set[str]:
-        return set(token for token, found_count in self.items() if found_count == 0)
+    def _record(self, token: str) -> None:
+        if self.usage is not None:
+            self.usage.record(self.token_type, token)
 
-    @staticmethod
-    def _set_to_dict_of_counts(input_set: set[str] | None) -> dict[str, int]:
-        if not input_set:
-            return {}
 
-        return {key: 0 for key in input_set}
+def _to_regex(token: str) -> str | None:
+    """Returns the regular expression of a pattern token,
+    or None if token is a name"""
+    if token.startswith(_REGEX_PREFIX):
+        return token[len(_REGEX_PREFIX) :]
+    if not _GLOB_CHARACTERS.isdisjoint(token):
+        return fnmatch.translate(token)
+
+    return None
+
+
+def _get_logging_level(name: str) -> int:
+    level: int | None = LOGGING_LEVELS.get(name.upper())
+    if level is None:
+        raise ValueError(f"Unknown logging level: {name}")
+
+    return level
 
 
 class Config(ABC):
@@ -92,6 +275,14 @@ class TokensToSkipConfig(Config):
         for attr in self.TOKEN_ATTRS:
             yield getattr(self, attr)
 
+    def with_usage(self, usage: SkipUsage | None) -> "TokensToSkipConfig":
+        """Returns a copy whose tokens record to usage when found"""
+        tokens_to_skip_config: TokensToSkipConfig = copy.copy(self)
+        for attr in self.TOKEN_ATTRS:
+            setattr(tokens_to_skip_config, attr, getattr(self, attr).with_usage(usage))
+
+        return tokens_to_skip_config
+
     def has_code_to_skip(self) -> bool:
         return any(self)  # type: ignore
 
@@ -104,17 +295,79 @@ class SectionsToSkipConfig(Config):
 
 
 class ExtrasToSkipConfig(Config):
-    __slots__ = ("skip_dangling_expressions", "skip_return_none", "skip_type_hints")
+    __slots__ = (
+        "skip_dangling_expressions",
+        "skip_return_none",
+        "skip_type_hints",
+        "skip_unused_code",
+        "skip_all_unused_imports",
+        "skip_constant_expressions",
+        "skip_unreachable_code",
+        "lazy_imports",
+        "skip_asserts",
+        "skip_logging_below",
+        "logger_names",
+        "expand_dataclasses",
+        "fold_enums",
+    )
 
     def __init__(
         self,
         skip_dangling_expressions: bool = True,
         skip_return_none: bool = True,
         skip_type_hints: bool = True,
+        skip_unused_code: bool = False,
+        skip_all_unused_imports: bool = False,
+        skip_constant_expressions: bool = False,
+        skip_unreachable_code: bool = False,
+        lazy_imports: bool = False,
+        skip_asserts: bool = False,
+        skip_logging_below: int | str | None = None,
+        logger_names: Iterable[str] | None = None,
+        expand_dataclasses: bool = False,
+        fold_enums: bool = False,
     ) -> None:
         self.skip_dangling_expressions: bool = skip_dangling_expressions
         self.skip_return_none: bool = skip_return_none
+        # Also removes code only type checkers use, see parser.type_hints
         self.skip_type_hints: bool = skip_type_hints
+        # Removes what autoflake would, see parser.unused
+        self.skip_unused_code: bool = skip_unused_code
+        # Also removes unused imports of modules not in the standard library
+        self.skip_all_unused_imports: bool = skip_all_unused_imports
+        # Replaces expressions of constants with their values and removes
+        # branches they decide, see parser.folding
+        self.skip_constant_expressions: bool = skip_constant_expressions
+        # Removes statements after return, raise, break, and continue
+        self.skip_unreachable_code: bool = skip_unreachable_code
+        # Moves imports only used in functions into them, see parser.lazy_imports
+        self.lazy_imports: bool = lazy_imports
+        # Removes assert statements, like running with -O
+        self.skip_asserts: bool = skip_asserts
+        # Removes logging calls of a lower level, like debug calls for "INFO".
+        # Their arguments are never evaluated, so any side effects are lost
+        self.skip_logging_below: int | None = (
+            _get_logging_level(skip_logging_below)
+            if isinstance(skip_logging_below, str)
+            else skip_logging_below
+        )
+        # Names of loggers logging calls are made on, which
+        # can be dotted like self.log or patterns like *_logger
+        self.logger_names = TokensToSkip(
+            DEFAULT_LOGGER_NAMES if logger_names is None else logger_names,
+            "logger names",
+        )
+        # Replaces @dataclass with the methods it adds, see parser.dataclass_expansion
+        self.expand_dataclasses: bool = expand_dataclasses
+        # Replaces members of IntEnum and StrEnum classes with their values
+        # and removes the classes, see parser.enums
+        self.fold_enums: bool = fold_enums
+
+    def has_code_to_skip(self) -> bool:
+        # Logger names only say which calls are skipped
+        return any(
+            getattr(self, attr) for attr in self.__slots__ if attr != "logger_names"
+        )
 
 
 class SkipConfig(Config):
@@ -126,6 +379,10 @@ class SkipConfig(Config):
         "sections_to_skip_config",
         "tokens_to_skip_config",
         "extras_to_skip_config",
+        "target_platform",
+        "definitions_to_skip",
+        "imports_to_keep",
+        "target_debug",
     )
 
     def __init__(
@@ -133,23 +390,89 @@ class SkipConfig(Config):
         module_name: str = "",
         target_python_version: tuple[int, int] | None = None,
         constant_vars_to_fold: dict[str, int | str] | None = None,
-        sections_to_skip_config: SectionsToSkipConfig = SectionsToSkipConfig(),
-        tokens_to_skip_config: TokensToSkipConfig = TokensToSkipConfig(),
-        extras_to_skip_config: ExtrasToSkipConfig = ExtrasToSkipConfig(),
+        sections_to_skip_config: SectionsToSkipConfig | None = None,
+        tokens_to_skip_config: TokensToSkipConfig | None = None,
+        extras_to_skip_config: ExtrasToSkipConfig | None = None,
+        target_platform: str | None = None,
+        definitions_to_skip: set[str] | None = None,
+        imports_to_keep: set[str] | None = None,
+        target_debug: bool | None = None,
     ) -> None:
         self.module_name: str = module_name
         self.target_python_version: tuple[int, int] | None = target_python_version
+        # Names replaced by their values, which can be dotted like Color.RED
         self.constant_vars_to_fold: dict[str, int | str] = (
             {} if constant_vars_to_fold is None else constant_vars_to_fold
         )
-        self.sections_to_skip_config: SectionsToSkipConfig = sections_to_skip_config
-        self.tokens_to_skip_config: TokensToSkipConfig = tokens_to_skip_config
-        self.extras_to_skip_config: ExtrasToSkipConfig = extras_to_skip_config
+        # Created here so configs never share a default instance
+        self.sections_to_skip_config: SectionsToSkipConfig = (
+            SectionsToSkipConfig()
+            if sections_to_skip_config is None
+            else sections_to_skip_config
+        )
+        self.tokens_to_skip_config: TokensToSkipConfig = (
+            TokensToSkipConfig()
+            if tokens_to_skip_config is None
+            else tokens_to_skip_config
+        )
+        self.extras_to_skip_config: ExtrasToSkipConfig = (
+            ExtrasToSkipConfig()
+            if extras_to_skip_config is None
+            else extras_to_skip_config
+        )
+        # Value of sys.platform where the code will run, like "linux" or "win32"
+        self.target_platform: str | None = target_platform
+        # Top level functions, classes, and assignments of this module to
+        # remove, like those parser.shaking.TreeShaker finds unreachable.
+        # From imports of them are removed too
+        self.definitions_to_skip: set[str] = (
+            set() if definitions_to_skip is None else definitions_to_skip
+        )
+        # Names bound by top level imports that lazy_imports leaves in place,
+        # like those other modules read from this one
+        self.imports_to_keep: set[str] = (
+            set() if imports_to_keep is None else imports_to_keep
+        )
+        # Value of __debug__ where the code will run, False when run with -O
+        self.target_debug: bool | None = target_debug
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "SkipConfig":
+        """Creates a config from JSON compatible data, with the same
+        keys as this class's arguments and lists in place of sets"""
+        unknown_keys: set[str] = set(data) - set(cls.__slots__)
+        if unknown_keys:
+            raise ValueError(f"Unknown config keys: {sorted(unknown_keys)}")
+
+        target_python_version: list[int] | None = data.get("target_python_version")
+        tokens_to_skip: dict[str, list[str]] = data.get("tokens_to_skip_config", {})
+
+        return cls(
+            data.get("module_name", ""),
+            (
+                None
+                if target_python_version is None
+                else (target_python_version[0], target_python_version[1])
+            ),
+            data.get("constant_vars_to_fold"),
+            SectionsToSkipConfig(**data.get("sections_to_skip_config", {})),
+            TokensToSkipConfig(
+                **{attr: set(tokens) for attr, tokens in tokens_to_skip.items()}
+            ),
+            ExtrasToSkipConfig(**data.get("extras_to_skip_config", {})),
+            data.get("target_platform"),
+            set(data.get("definitions_to_skip", ())),
+            set(data.get("imports_to_keep", ())),
+            data.get("target_debug"),
+        )
 
     def has_code_to_skip(self) -> bool:
         return (
             self.target_python_version is not None
+            or self.target_platform is not None
+            or self.target_debug is not None
             or len(self.constant_vars_to_fold) > 0
+            or len(self.definitions_to_skip) > 0
             or self.sections_to_skip_config.has_code_to_skip()
             or self.tokens_to_skip_config.has_code_to_skip()
             or self.extras_to_skip_config.has_code_to_skip()
@@ -0,0 +1,522 @@
+"""Expands @dataclass into the methods dataclasses would generate, so importing
+a module no longer imports dataclasses or builds those methods at runtime.
+Only dataclasses whose generated methods are known from their class body
+are expanded, others keep their decorator"""
+
+import ast
+
+from personal_python_ast_optimizer.parser.type_hints import ImportedNames
+from personal_python_ast_optimizer.parser.utils import get_node_name
+
+DATACLASS_MODULES: frozenset[str] = frozenset(("dataclasses",))
+
+# Names of dataclasses that expanded classes no longer need
+_EXPANDED_NAMES: frozenset[str] = frozenset(("dataclass", "field"))
+
+# Options of dataclass that can be expanded, with their defaults
+_OPTIONS: dict[str, bool] = {
+    "init": True,
+    "repr": True,
+    "eq": True,
+    "unsafe_hash": False,
+    "frozen": False,
+    "slots": False,
+    "match_args": True,
+}
+# Options of dataclass that can only be expanded when left as their defaults
+_DEFAULT_ONLY_OPTIONS: dict[str, bool] = {
+    "order": False,
+    "kw_only": False,
+    "weakref_slot": False,
+}
+
+# Options of field that can be expanded, besides default and default_factory
+_FIELD_OPTIONS: frozenset[str] = frozenset(("init", "repr", "compare"))
+
+# Annotations dataclasses treats specially, even within strings
+_SPECIAL_ANNOTATIONS: tuple[str, ...] = ("ClassVar", "InitVar", "KW_ONLY")
+
+# Names generated methods read, so fields can't be named them
+_GENERATED_NAMES: frozenset[str] = frozenset(
+    ("self", "object", "__class__", "__dataclass_missing__")
+)
+
+# Statements that can be in the body of an expanded dataclass
+_CLASS_BODY_NODES = (
+    ast.AnnAssign,
+    ast.Assign,
+    ast.FunctionDef,
+    ast.AsyncFunctionDef,
+    ast.ClassDef,
+    ast.Expr,
+    ast.Pass,
+)
+
+
+class _Field:
+    """A field of a dataclass being expanded"""
+
+    __slots__ = ("name", "default", "default_factory", "init", "repr", "compare")
+
+    def __init__(self, name: str) -> None:
+        self.name: str = name
+        self.default: ast.expr | None = None
+        # Name or attribute of what is called for the default of each instance
+        self.default_factory: ast.expr | None = None
+        self.init: bool = True
+        self.repr: bool = True
+        self.compare: bool = True
+
+
+def get_dataclass_names(module: ast.Module) -> ImportedNames:
+    """Returns names of dataclasses in module. Classes are only expanded
+    if the module uses nothing else of dataclasses, like asdict or fields,
+    that needs real dataclasses"""
+    dataclass_names = ImportedNames(module, DATACLASS_MODULES)
+    if not dataclass_names.names <= _EXPANDED_NAMES or any(
+        isinstance(node, ast.Attribute)
+        and dataclass_names.get_name(node)
+        and node.attr not in _EXPANDED_NAMES
+        for node in ast.walk(module)
+    ):
+        return ImportedNames()
+
+    return dataclass_names
+
+
+def get_base_class_names(module: ast.Module) -> set[str]:
+    """Returns names of classes that classes in module inherit from,
+    the last part of dotted names"""
+    return {
+        get_node_name(base)
+        for node in ast.walk(module)
+        if isinstance(node, ast.ClassDef)
+        for base in node.bases
+    }
+
+
+def expand_dataclass(
+    node: ast.ClassDef,
+    dataclass_names: ImportedNames,
+    base_class_names: set[str],
+    keep_annotations: bool,
+    python_version: tuple[int, int] | None,
+) -> list[ast.expr]:
+    """Replaces the @dataclass of node with the methods it would add, if
+    they are known. The class loses what only dataclasses reads, like
+    __dataclass_fields__ and, unless keep_annotations, its annotations.
+    Classes named in base_class_names are left as is, since dataclasses
+    inheriting from them read their fields.
+    Returns the expressions removed, empty if node was left as is"""
+    if (
+        not node.decorator_list
+        or node.name in base_class_names
+        or node.bases
+        or node.keywords
+        or getattr(node, "type_params", None)
+    ):
+        return []
+
+    decorator: ast.expr = node.decorator_list[-1]
+    options: dict[str, bool] | None = _get_options(decorator, dataclass_names)
+    if options is None:
+        return []
+    if python_version is not None and python_version < (3, 10):
+        if options["slots"]:
+            return []
+        options["match_args"] = False
+
+    fields: list[_Field] | None = _get_fields(node, dataclass_names)
+    if fields is None:
+        return []
+
+    field_names: set[str] = {field.name for field in fields}
+    bound_names: set[str] = set()
+    for statement in node.body:
+        if not isinstance(statement, ast.AnnAssign):
+            bound_names.update(_get_bound_names(statement))
+    if (
+        bound_names & field_names
+        or (options["frozen"] and {"__setattr__", "__delattr__"} & bound_names)
+        or (options["unsafe_hash"] and "__hash__" in bound_names)
+        or (options["slots"] and "__slots__" in bound_names)
+        # Versions differ in replacing these
+        or (
+            options["frozen"]
+            and options["slots"]
+            and {"__getstate__", "__setstate__"} & bound_names
+        )
+        or (options["slots"] and any(_is_class_default(field) for field in fields))
+    ):
+        return []
+
+    removed: list[ast.expr] = [decorator]
+    removed.extend(_replace_fields(node, dataclass_names, keep_annotations))
+    node.decorator_list.pop()
+    node.body.extend(
+        ast.parse(
+            _get_methods_source(fields, options, bound_names, python_version)
+        ).body
+    )
+
+    if options["slots"]:
+        class_defaults: list[ast.expr] = [
+            ast.Name(field.name, ast.Del())
+            for field in fields
+            if field.default is not None
+        ]
+        if class_defaults:
+            node.body.append(ast.Delete(class_defaults))
+
+    if not node.body:
+        node.body.append(ast.Pass())
+
+    return removed
+
+
+def _get_options(
+    decorator: ast.expr, dataclass_names: ImportedNames
+) -> dict[str, bool] | None:
+    """Returns options of a dataclass decorator, or None if
+    decorator is something else or has options that can't be expanded"""
+    options: dict[str, bool] = dict(_OPTIONS)
+    if dataclass_names.get_name(decorator) == "dataclass":
+        return options
+
+    if (
+        not isinstance(decorator, ast.Call)
+        or dataclass_names.get_name(decorator.func) != "dataclass"
+        or decorator.args
+    ):
+        return None
+
+    for keyword in decorator.keywords:
+        if not isinstance(keyword.value, ast.Constant) or not isinstance(
+            keyword.value.value, bool
+        ):
+            return None
+        if keyword.arg in _OPTIONS:
+            options[keyword.arg] = keyword.value.value
+        elif _DEFAULT_ONLY_OPTIONS.get(keyword.arg or "") is not keyword.value.value:
+            return None
+
+    return options
+
+
+def _get_fields(
+    node: ast.ClassDef, dataclass_names: ImportedNames
+) -> list[_Field] | None:
+    """Returns fields of a dataclass in order, or None if
+    its body has something dataclasses would handle specially"""
+    fields: list[_Field] = []
+    has_default: bool = False
+    for statement in node.body:
+        if not isinstance(statement, _CLASS_BODY_NODES):
+            return None
+        if not isinstance(statement, ast.AnnAssign):
+            continue
+
+        if (
+            not isinstance(statement.target, ast.Name)
+            or _is_special_annotation(statement.annotation)
+            or statement.target.id in _GENERATED_NAMES
+            # Private names are mangled
+            or (
+                statement.target.id.startswith("__")
+                and not statement.target.id.endswith("__")
+            )
+        ):
+            return None
+
+        field = _Field(statement.target.id)
+        value: ast.expr | None = statement.value
+        if isinstance(value, ast.Call) and dataclass_names.get_name(value.func):
+            if not _set_field_options(field, value, dataclass_names):
+                return None
+        elif value is not None:
+            if not _is_hashable_default(value):
+                return None
+            field.default = value
+
+        if field.init:
+            if field.default is not None or field.default_factory is not None:
+                has_default = True
+            elif has_default:
+                # Non-default argument follows default argument
+                return None
+        fields.append(field)
+
+    if len({field.name for field in fields}) < len(fields):
+        return None
+
+    factory_names: set[str] = {
+        _get_root_name(field.default_factory)
+        for field in fields
+        if field.default_factory is not None
+    }
+    if factory_names & {field.name for field in fields}:
+        # Parameters of __init__ would shadow them
+        return None
+
+    return fields
+
+
+def _set_field_options(
+    field: _Field, call: ast.Call, dataclass_names: ImportedNames
+) -> bool:
+    """Sets options of field from a field() call.
+    Returns False if they can't be expanded"""
+    if dataclass_names.get_name(call.func) != "field" or call.args:
+        return False
+
+    for keyword in call.keywords:
+        value: ast.expr = keyword.value
+        if keyword.arg == "default":
+            if not _is_hashable_default(value):
+                return False
+            field.default = value
+        elif keyword.arg == "default_factory":
+            if not _get_root_name(value):
+                return False
+            field.default_factory = value
+        elif (
+            keyword.arg in _FIELD_OPTIONS
+            and isinstance(value, ast.Constant)
+            and isinstance(value.value, bool)
+        ):
+            setattr(field, keyword.arg, value.value)
+        else:
+            return False
+
+    # Setting both raises an error
+    return field.default is None or field.default_factory is None
+
+
+def _replace_fields(
+    node: ast.ClassDef, dataclass_names: ImportedNames, keep_annotations: bool
+) -> list[ast.expr]:
+    """Replaces field() calls of the fields of node with their defaults
+    and removes annotations unless keep_annotations.
+    Returns the expressions removed"""
+    removed: list[ast.expr] = []
+    new_body: list[ast.stmt] = []
+    for statement in node.body:
+        if isinstance(statement, ast.Pass):
+            continue
+        if not isinstance(statement, ast.AnnAssign):
+            new_body.append(statement)
+            continue
+
+        value: ast.expr | None = statement.value
+        if isinstance(value, ast.Call) and dataclass_names.get_name(value.func):
+            # Only the default is stored in the class
+            removed.append(value.func)
+            removed.extend(
+                keyword.value for keyword in value.keywords if keyword.arg != "default"
+            )
+            value = next(
+                (
+                    keyword.value
+                    for keyword in value.keywords
+                    if keyword.arg == "default"
+                ),
+                None,
+            )
+
+        if keep_annotations:
+            statement.value = value
+            new_body.append(statement)
+        else:
+            removed.append(statement.annotation)
+            if value is not None:
+                new_body.append(ast.Assign([statement.target], value))
+
+    node.body = new_body
+    return removed
+
+
+def _get_methods_source(
+    fields: list[_Field],
+    options: dict[str, bool],
+    bound_names: set[str],
+    python_version: tuple[int, int] | None,
+) -> str:
+    """Returns source of what dataclass would add to a class
+    binding bound_names, in the order it adds them"""
+    lines: list[str] = []
+    frozen: bool = options["frozen"]
+    init_fields: list[_Field] = [field for field in fields if field.init]
+
+    if options["init"] and "__init__" not in bound_names:
+        parameters: list[str] = ["self"]
+        assigns: list[str] = []
+        for field in fields:
+            value: str = field.name
+            if field.default_factory is not None:
+                factory: str = ast.unparse(field.default_factory)
+                value = (
+                    f"{factory}() if {field.name} is "
+                    f"__class__.__dataclass_missing__ else {field.name}"
+                    if field.init
+                    else f"{factory}()"
+                )
+            elif not field.init:
+                # Read from the class instead
+                continue
+
+            if field.init:
+                parameters.append(
+                    f"{field.name}=__dataclass_missing__"
+                    if field.default_factory is not None
+                    else (
+                        f"{field.name}={field.name}"
+                        if field.default is not None
+                        else field.name
+                    )
+                )
+            assigns.append(
+                f"object.__setattr__(self,{field.name!r},{value})"
+                if frozen
+                else f"self.{field.name}={value}"
+            )
+
+        if "__post_init__" in bound_names:
+            assigns.append("self.__post_init__()")
+        if any(field.default_factory is not None for field in init_fields):
+            # Tells when no argument was passed for a field with a factory
+            lines.append("__dataclass_missing__=object()")
+        lines.append(f"def __init__({','.join(parameters)}):")
+        lines.extend(f" {assign}" for assign in assigns or ["pass"])
+
+    if options["repr"] and "__repr__" not in bound_names:
+        shown: str = ", ".join(
+            f"{field.name}={{self.{field.name}!r}}" for field in fields if field.repr
+        )
+        lines.append("def __repr__(self):")
+        lines.append(f' return f"{{self.__class__.__qualname__}}({shown})"')
+
+    compared: list[_Field] = [field for field in fields if field.compare]
+    if options["eq"] and "__eq__" not in bound_names:
+        lines.append("def __eq__(self,other):")
+        if python_version is not None and python_version >= (3, 13):
+            comparisons: str = (
+                " and ".join(
+                    f"self.{field.name}==other.{field.name}" for field in compared
+                )
+                or "True"
+            )
+            lines.append(" if self is other:return True")
+            lines.append(f" if other.__class__ is self.__class__:return {comparisons}")
+        else:
+            lines.append(
+                " if other.__class__ is self.__class__:return "
+                f"{_get_tuple_source('self', compared)}=="
+                f"{_get_tuple_source('other', compared)}"
+            )
+        lines.append(" return NotImplemented")
+
+    if options["unsafe_hash"] or (
+        options["eq"] and frozen and "__hash__" not in bound_names
+    ):
+        lines.append("def __hash__(self):")
+        lines.append(f" return hash({_get_tuple_source('self', compared)})")
+    elif options["eq"] and "__hash__" not in bound_names:
+        lines.append("__hash__=None")
+
+    if frozen:
+        condition: str = "type(self) is __class__"
+        if fields:
+            names: str = ",".join(repr(field.name) for field in fields)
+            condition += f" or name in {{{names}}}"
+        for method, parameters_source, action in (
+            ("__setattr__", "name,value", "assign to"),
+            ("__delattr__", "name", "delete"),
+        ):
+            lines.append(f"def {method}(self,{parameters_source}):")
+            lines.append(f" if {condition}:")
+            lines.append("  from dataclasses import FrozenInstanceError")
+            lines.append(
+                f'  raise FrozenInstanceError(f"cannot {action} field {{name!r}}")'
+            )
+            lines.append(f" super().{method}({parameters_source})")
+
+    if options["match_args"] and "__match_args__" not in bound_names:
+        lines.append(f"__match_args__={tuple(field.name for field in init_fields)!r}")
+
+    if options["slots"]:
+        field_names: tuple[str, ...] = tuple(field.name for field in fields)
+        lines.append(f"__slots__={field_names!r}")
+        if frozen:
+            # Pickling can't set frozen slots otherwise
+            lines.append("def __getstate__(self):")
+            lines.append(
+                f" return [{','.join(f'self.{name}' for name in field_names)}]"
+            )
+            lines.append("def __setstate__(self,state):")
+            lines.append(
+                f" for name,value in zip({field_names!r},state):"
+                "object.__setattr__(self,name,value)"
+            )
+
+    return "\n".join(lines)
+
+
+def _get_tuple_source(name: str, fields: list[_Field]) -> str:
+    return f"({''.join(f'{name}.{field.name},' for field in fields)})"
+
+
+def _get_bound_names(node: ast.stmt) -> set[str]:
+    """Returns names a statement in a class body binds in the class"""
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return {node.name}
+    if isinstance(node, ast.Assign):
+        return {
+            child.id
+            for target in node.targets
+            for child in ast.walk(target)
+            if isinstance(child, ast.Name)
+        }
+    return set()
+
+
+def _get_root_name(node: ast.expr | None) -> str:
+    """Returns the name a dotted name like a.b.c starts with,
+    or an empty string if node is something else"""
+    while isinstance(node, ast.Attribute):
+        node = node.value
+    return node.id if isinstance(node, ast.Name) else ""
+
+
+def _is_class_default(field: _Field) -> bool:
+    """Returns True if a field's default is only stored in the class"""
+    return not field.init and field.default is not None
+
+
+def _is_hashable_default(node: ast.expr) -> bool:
+    """Returns True if node is a default dataclasses accepts, unlike
+    a list. Names and attributes are assumed to be hashable"""
+    if isinstance(node, ast.Tuple):
+        return all(_is_hashable_default(element) for element in node.elts)
+    if isinstance(node, ast.UnaryOp):
+        return isinstance(node.operand, ast.Constant)
+    return isinstance(node, ast.Constant) or bool(_get_root_name(node))
+
+
+def _is_special_annotation(annotation: ast.expr) -> bool:
+    """Returns True if annotation may be a ClassVar or
+    something else dataclasses doesn't make a plain field"""
+    for node in ast.walk(annotation):
+        if isinstance(node, ast.Name):
+            name: str = node.id
+        elif isinstance(node, ast.Attribute):
+            name = node.attr
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+            if any(special in node.value for special in _SPECIAL_ANNOTATIONS):
+                return True
+            continue
+        else:
+            continue
+        if name in _SPECIAL_ANNOTATIONS:
+            return True
+
+    return False
@@ -0,0 +1,302 @@
+"""Finds IntEnum and StrEnum classes whose members can be replaced by their
+values, like ImageFormats.PNG by "PNG", so the classes can be removed.
+Members of these enums equal, hash, and format like their values, so reads
+that only compare or format a member can be replaced. Reads where a member
+could reach other code, like assigning or returning it, keep an enum"""
+
+import ast
+import string
+from collections import Counter
+from typing import Iterator
+
+from personal_python_ast_optimizer.parser.lazy_imports import get_bound_name
+from personal_python_ast_optimizer.parser.type_hints import ImportedNames
+from personal_python_ast_optimizer.parser.utils import get_dotted_name
+
+ENUM_MODULES: frozenset[str] = frozenset(("enum",))
+
+# Bases of enums whose members can be replaced, with the type of their values
+_VALUE_ENUMS: dict[str, type] = {"IntEnum": int, "StrEnum": str}
+
+# Attributes of a member that are folded to its value or name
+_VALUE_ATTRIBUTES: frozenset[str] = frozenset(("value", "_value_"))
+_NAME_ATTRIBUTES: frozenset[str] = frozenset(("name", "_name_"))
+
+# Functions that only use the value of a member
+_VALUE_FUNCTIONS: frozenset[str] = frozenset(("format", "int", "len", "print", "str"))
+
+
+def get_enum_members(
+    module: ast.Module, python_version: tuple[int, int] | None
+) -> dict[str, dict[str, int | str]]:
+    """Returns members of top level IntEnum and StrEnum classes of module by
+    class name, for classes with nothing but members assigned literals.
+    str() of IntEnum members gave their names before 3.11, so those are
+    only found if python_version is known to be 3.11 or later"""
+    enum_names = ImportedNames(module, ENUM_MODULES)
+    enums: dict[str, dict[str, int | str]] = {}
+    for statement in module.body:
+        if isinstance(statement, ast.ClassDef):
+            members: dict[str, int | str] | None = _get_members(
+                statement, enum_names, python_version
+            )
+            if members:
+                enums[statement.name] = members
+
+    return enums
+
+
+def get_member_constants(
+    path: str, members: dict[str, int | str]
+) -> dict[str, int | str]:
+    """Returns constants to fold for members of an enum read as path,
+    like ImageFormats or constants.ImageFormats, and for their values
+    and names, like ImageFormats.PNG.value"""
+    constants: dict[str, int | str] = {}
+    names_by_value: dict[int | str, str] = {}
+    for name, value in members.items():
+        # Members with the value of an earlier one are aliases of it
+        canonical_name: str = names_by_value.setdefault(value, name)
+        member_path: str = f"{path}.{name}"
+        constants[member_path] = value
+        for attribute in _VALUE_ATTRIBUTES:
+            constants[f"{member_path}.{attribute}"] = value
+        for attribute in _NAME_ATTRIBUTES:
+            constants[f"{member_path}.{attribute}"] = canonical_name
+
+    return constants
+
+
+def get_enums_read_otherwise(
+    module: ast.Module, members_by_path: dict[str, dict[str, int | str]]
+) -> set[str]:
+    """Returns paths of members_by_path, names or dotted names of enums, that
+    module reads other than to get a member's value, name, or a method of its
+    value, or to compare or format a member, see _is_member_read. Paths
+    starting with a name bound more than once in module are read otherwise"""
+    read_otherwise: set[str] = set()
+
+    root_names: dict[str, str] = {
+        path: path.partition(".")[0] for path in members_by_path
+    }
+    binding_counts: Counter[str] = Counter(
+        name for name in _iter_bindings(module) if name in root_names.values()
+    )
+    for path, root_name in root_names.items():
+        if binding_counts[root_name] > 1:
+            read_otherwise.add(path)
+
+    parents: dict[ast.AST, ast.AST] = {
+        child: parent
+        for parent in ast.walk(module)
+        for child in ast.iter_child_nodes(parent)
+    }
+    for node in ast.walk(module):
+        if not isinstance(node, (ast.Name, ast.Attribute)):
+            continue
+        path = get_dotted_name(node)
+        if path in members_by_path and not _is_member_read(
+            node, parents, members_by_path[path]
+        ):
+            read_otherwise.add(path)
+
+    return read_otherwise
+
+
+def get_private_enum_members(
+    module: ast.Module, python_version: tuple[int, int] | None
+) -> dict[str, dict[str, int | str]]:
+    """Returns what get_enum_members does for enums that are private
+    or left out of the __all__ of module"""
+    exported_names: set[str] | None = get_exported_names(module)
+    return {
+        name: members
+        for name, members in get_enum_members(module, python_version).items()
+        if not is_exported(name, exported_names)
+    }
+
+
+def get_private_enum_constants(
+    module: ast.Module, python_version: tuple[int, int] | None
+) -> tuple[dict[str, int | str], set[str]]:
+    """Returns constants to fold for members of enums only module reads, and
+    names of those enums. Other modules are assumed not to import enums that
+    are private or left out of the module's __all__"""
+    enums: dict[str, dict[str, int | str]] = get_private_enum_members(
+        module, python_version
+    )
+    enum_names: set[str] = enums.keys() - get_enums_read_otherwise(module, enums)
+
+    constants: dict[str, int | str] = {}
+    for name in enum_names:
+        constants.update(get_member_constants(name, enums[name]))
+
+    return constants, enum_names
+
+
+def get_exported_names(module: ast.Module) -> set[str] | None:
+    """Returns names in the __all__ of module, or None if it has none"""
+    exported_names: set[str] | None = None
+    for statement in module.body:
+        if isinstance(statement, (ast.Assign, ast.AugAssign, ast.AnnAssign)):
+            targets: list[ast.expr] = (
+                statement.targets
+                if isinstance(statement, ast.Assign)
+                else [statement.target]
+            )
+            if any(getattr(target, "id", "") == "__all__" for target in targets):
+                if exported_names is None:
+                    exported_names = set()
+                exported_names.update(
+                    child.value
+                    for child in ast.walk(statement)
+                    if isinstance(child, ast.Constant) and isinstance(child.value, str)
+                )
+
+    return exported_names
+
+
+def is_exported(name: str, exported_names: set[str] | None) -> bool:
+    """Returns True if other modules may import name from a module
+    with exported_names, the names from get_exported_names"""
+    return not name.startswith("_") and (
+        exported_names is None or name in exported_names
+    )
+
+
+def _get_members(
+    node: ast.ClassDef,
+    enum_names: ImportedNames,
+    python_version: tuple[int, int] | None,
+) -> dict[str, int | str] | None:
+    """Returns members of node if it is an enum whose members can be
+    replaced by their values, else None"""
+    if (
+        node.keywords
+        or node.decorator_list
+        or len(node.bases) != 1
+        or getattr(node, "type_params", None)
+    ):
+        return None
+
+    base: str = enum_names.get_name(node.bases[0])
+    value_type: type | None = _VALUE_ENUMS.get(base)
+    if value_type is None or (
+        base == "IntEnum" and (python_version is None or python_version < (3, 11))
+    ):
+        return None
+
+    members: dict[str, int | str] = {}
+    for statement in node.body:
+        if isinstance(statement, ast.Pass) or (
+            isinstance(statement, ast.Expr)
+            and isinstance(statement.value, ast.Constant)
+        ):
+            continue
+
+        if (
+            not isinstance(statement, ast.Assign)
+            or len(statement.targets) != 1
+            or not isinstance(statement.targets[0], ast.Name)
+            or not isinstance(statement.value, ast.Constant)
+            # Exact type, since bools are ints
+            or type(statement.value.value) is not value_type
+        ):
+            return None
+
+        name: str = statement.targets[0].id
+        # Names starting with _ are special to enums, and reusing one fails
+        if name.startswith("_") or name in members:
+            return None
+        members[name] = statement.value.value  # type: ignore
+
+    return members
+
+
+def _is_member_read(
+    node: ast.expr, parents: dict[ast.AST, ast.AST], members: dict[str, int | str]
+) -> bool:
+    """Returns True if node, an enum, is only read to get a member that can be
+    replaced by its value. Members that could reach other code, like by being
+    assigned, returned, or passed to a function, could be told from their
+    values there, so only reads using the value right away are replaced"""
+    member: ast.AST | None = parents.get(node)
+    if (
+        not isinstance(member, ast.Attribute)
+        or member.attr not in members
+        or not isinstance(member.ctx, ast.Load)
+    ):
+        return False
+
+    parent: ast.AST | None = parents.get(member)
+    if isinstance(parent, ast.Attribute):
+        if parent.attr in _VALUE_ATTRIBUTES or parent.attr in _NAME_ATTRIBUTES:
+            return True
+        # Methods of the value, which members inherit
+        return not parent.attr.startswith("_") and hasattr(
+            members[member.attr], parent.attr
+        )
+
+    if isinstance(parent, ast.Compare):
+        return not any(isinstance(op, (ast.Is, ast.IsNot)) for op in parent.ops)
+    if isinstance(parent, ast.Call) and member in parent.args:
+        return get_dotted_name(parent.func) in _VALUE_FUNCTIONS or (
+            # str.format of a literal
+            isinstance(parent.func, ast.Attribute)
+            and parent.func.attr == "format"
+            and isinstance(parent.func.value, ast.Constant)
+            and isinstance(parent.func.value.value, str)
+            and _only_formats_values(parent.func.value.value)
+        )
+    if isinstance(parent, ast.FormattedValue):
+        # repr() and ascii() of a member show its class
+        return parent.conversion in (-1, ord("s"))
+    if isinstance(parent, ast.Subscript):
+        # Looked up by, but not stored as a key
+        return parent.slice is member and isinstance(parent.ctx, ast.Load)
+
+    # Patterns compare with ==
+    return isinstance(parent, ast.MatchValue)
+
+
+def _only_formats_values(template: str) -> bool:
+    """Returns True if str.format of template only formats its arguments,
+    without converting them with !r or !a or reading their attributes or items"""
+    try:
+        fields = list(string.Formatter().parse(template))
+    except ValueError:
+        return False
+
+    for _, field_name, format_spec, conversion in fields:
+        if field_name is None:
+            continue
+        if (
+            conversion not in (None, "s")
+            or "." in field_name
+            or "[" in field_name
+            # Specs can have fields of their own
+            or (format_spec and not _only_formats_values(format_spec))
+        ):
+            return False
+
+    return True
+
+
+def _iter_bindings(module: ast.Module) -> Iterator[str]:
+    """Yields each name bound anywhere in module, once per binding"""
+    for node in ast.walk(module):
+        if isinstance(node, ast.Name):
+            if not isinstance(node.ctx, ast.Load):
+                yield node.id
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            yield node.name
+        elif isinstance(node, ast.arg):
+            yield node.arg
+        elif isinstance(node, ast.alias):
+            yield get_bound_name(node)
+        elif isinstance(node, (ast.ExceptHandler, ast.MatchAs, ast.MatchStar)):
+            if node.name is not None:
+                yield node.name
+        elif isinstance(node, ast.MatchMapping):
+            if node.rest is not None:
+                yield node.rest
@@ -0,0 +1,479 @@
+"""Evaluates expressions of constants ahead of time, like CPython's own
+AST optimizer, but also over names in a config's constant_vars_to_fold"""
+
+import ast
+import math
+import operator
+import re
+import sys
+from typing import Any, Callable
+
+from personal_python_ast_optimizer.parser.utils import get_dotted_name
+
+# Same limits as CPython's AST optimizer, so folding never creates
+# constants much larger than the expressions they replace
+_MAX_INT_SIZE: int = 128  # bits
+_MAX_COLLECTION_SIZE: int = 256
+_MAX_STR_SIZE: int = 4096
+
+_BINOPS: dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+    ast.LShift: operator.lshift,
+    ast.RShift: operator.rshift,
+    ast.BitOr: operator.or_,
+    ast.BitXor: operator.xor,
+    ast.BitAnd: operator.and_,
+}
+
+_UNARYOPS: dict[type, Callable[[Any], Any]] = {
+    ast.Not: operator.not_,
+    ast.Invert: operator.invert,
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+_CMPOPS: dict[type, Callable[[Any, Any], Any]] = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Is: operator.is_,
+    ast.IsNot: operator.is_not,
+    ast.In: lambda left, right: left in right,
+    ast.NotIn: lambda left, right: left not in right,
+}
+
+# Values whose identity does not depend on how they were created
+_SINGLETONS: tuple[Any, ...] = (None, True, False, Ellipsis)
+
+# Methods of constants that can be called without side effects
+_PURE_METHODS: dict[type, frozenset[str]] = {
+    str: frozenset(("startswith", "endswith")),
+}
+
+_CONVERSIONS: dict[int, Callable[[Any], str]] = {
+    ord("s"): str,
+    ord("r"): repr,
+    ord("a"): ascii,
+}
+
+# Standard format spec, capturing its width and precision
+_FORMAT_SPEC = re.compile(
+    r"(?:.?[<>=^])?[-+ ]?z?#?0?(\d*)[,_]?(?:\.(\d*))?[,_]?[a-zA-Z%]?", re.DOTALL
+)
+
+
+class _CanNotFold(Exception):
+    pass
+
+
+class _VersionRange:
+    """sys.version_info of any release of a python version,
+    which can only be compared when every release compares the same"""
+
+    __slots__ = ("lowest", "highest")
+
+    def __init__(self, python_version: tuple[int, int]) -> None:
+        self.lowest: tuple = (*python_version, 0, "alpha", 0)
+        self.highest: tuple = (*python_version, math.inf, "final", math.inf)
+
+
+class ConstantFolder:
+    """Evaluates expressions that only use constants and operators
+    without side effects, giving up on anything else"""
+
+    __slots__ = (
+        "constant_vars_to_fold",
+        "target_python_version",
+        "target_platform",
+        "can_fold_format_specs",
+    )
+
+    def __init__(
+        self,
+        constant_vars_to_fold: dict[str, int | str],
+        target_python_version: tuple[int, int] | None = None,
+        target_platform: str | None = None,
+    ) -> None:
+        self.constant_vars_to_fold: dict[str, int | str] = constant_vars_to_fold
+        # sys.version_info and sys.platform are folded when these are known
+        self.target_python_version: tuple[int, int] | None = target_python_version
+        self.target_platform: str | None = target_platform
+        # Format specs gain options between versions, so a spec that formats
+        # here could raise on an older target
+        self.can_fold_format_specs: bool = (
+            target_python_version is None
+            or target_python_version >= sys.version_info[:2]
+        )
+
+    def fold(self, node: ast.expr) -> ast.expr | None:
+        """Returns a constant node equal to node, or None if it can't be folded"""
+        if (
+            isinstance(node, ast.UnaryOp)
+            and isinstance(node.op, ast.USub)
+            and isinstance(node.operand, ast.Constant)
+        ):
+            # Already how a negative number is written
+            return None
+
+        try:
+            value: Any = self._evaluate(node)
+        except (_CanNotFold, ArithmeticError, TypeError, ValueError):
+            return None
+
+        folded: ast.expr | None = _value_to_node(value)
+        if folded is not None:
+            ast.copy_location(folded, node)
+
+        return folded
+
+    def simplify_bool_op(self, node: ast.BoolOp) -> ast.expr:
+        """Removes constant values that can't change the result,
+        and values after one that always ends evaluation"""
+        is_and: bool = isinstance(node.op, ast.And)
+        values: list[ast.expr] = []
+
+        for index, value_node in enumerate(node.values):
+            try:
+                value: Any = self._evaluate(value_node)
+            except (_CanNotFold, ArithmeticError, TypeError, ValueError):
+                values.append(value_node)
+                continue
+
+            if bool(value) != is_and:
+                # Evaluation stops here, and this is the result if reached
+                values.append(value_node)
+                break
+            if index == len(node.values) - 1:
+                # The last value is the result when reached
+                values.append(value_node)
+
+        if len(values) == len(node.values):
+            return node
+        if len(values) == 1:
+            return values[0]
+
+        return ast.copy_location(ast.BoolOp(node.op, values), node)
+
+    def get_truth(self, node: ast.expr) -> bool | None:
+        """Returns if node is always truthy or always falsy,
+        or None if that is not known before running it"""
+        try:
+            return bool(self._evaluate(node))
+        except (_CanNotFold, ArithmeticError, TypeError, ValueError):
+            return None
+
+    def simplify_if_exp(self, node: ast.IfExp) -> ast.expr:
+        """Returns the branch taken if the test is constant"""
+        test: bool | None = self.get_truth(node.test)
+        if test is None:
+            return node
+
+        return node.body if test else node.orelse
+
+    def simplify_joined_str(self, node: ast.JoinedStr) -> ast.JoinedStr:
+        """Writes constant values of an f-string into its text"""
+        values: list[ast.expr] = []
+        changed: bool = False
+
+        for value_node in node.values:
+            if isinstance(value_node, ast.FormattedValue):
+                try:
+                    value_node = ast.Constant(self._format(value_node))
+                    changed = True
+                except (_CanNotFold, ArithmeticError, TypeError, ValueError):
+                    pass
+
+            if (
+                values
+                and isinstance(value_node, ast.Constant)
+                and isinstance(values[-1], ast.Constant)
+            ):
+                values[-1] = ast.Constant(values[-1].value + value_node.value)
+            else:
+                values.append(value_node)
+
+        if not changed:
+            return node
+
+        return ast.copy_location(ast.JoinedStr(values), node)
+
+    def _evaluate(self, node: ast.expr) -> Any:
+        if isinstance(node, ast.Constant):
+            return node.value
+
+        if isinstance(node, ast.Name):
+            if node.id in self.constant_vars_to_fold:
+                return self.constant_vars_to_fold[node.id]
+            raise _CanNotFold
+
+        if isinstance(node, ast.Tuple):
+            return tuple(self._evaluate(element) for element in node.elts)
+
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINOPS:
+            left: Any = self._evaluate(node.left)
+            right: Any = self._evaluate(node.right)
+            _check_binop_size(node.op, left, right)
+            return _check_size(_BINOPS[type(node.op)](left, right))
+
+        if isinstance(node, ast.UnaryOp):
+            operand: Any = self._evaluate(node.operand)
+            if isinstance(node.op, ast.Invert) and isinstance(operand, bool):
+                # Deprecated since it gives an int, not the opposite bool
+                raise _CanNotFold
+            return _check_size(_UNARYOPS[type(node.op)](operand))
+
+        if isinstance(node, ast.BoolOp):
+            is_and: bool = isinstance(node.op, ast.And)
+            for value_node in node.values:
+                value: Any = self._evaluate(value_node)
+                if bool(value) != is_and:
+                    break
+            return value
+
+        if isinstance(node, ast.Compare):
+            left = self._evaluate_comparable(node.left)
+            for op, comparator in zip(node.ops, node.comparators):
+                right = self._evaluate_comparable(comparator)
+                if not _compare(op, left, right):
+                    return False
+                left = right
+            return True
+
+        if isinstance(node, ast.IfExp):
+            return self._evaluate(
+                node.body if self._evaluate(node.test) else node.orelse
+            )
+
+        if isinstance(node, ast.JoinedStr):
+            return _check_size(
+                "".join(
+                    (
+                        self._format(value_node)
+                        if isinstance(value_node, ast.FormattedValue)
+                        else self._evaluate(value_node)
+                    )
+                    for value_node in node.values
+                )
+            )
+
+        if isinstance(node, ast.Attribute):
+            return self._evaluate_attribute(node)
+
+        if isinstance(node, ast.Subscript) and _is_sys_attribute(
+            node.value, "version_info"
+        ):
+            return self._evaluate_version_subscript(node.slice)
+
+        if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute)
+            and not node.keywords
+        ):
+            owner: Any = self._evaluate(node.func.value)
+            if node.func.attr not in _PURE_METHODS.get(type(owner), ()):
+                raise _CanNotFold
+            args: list[Any] = [self._evaluate(arg) for arg in node.args]
+            return getattr(owner, node.func.attr)(*args)
+
+        raise _CanNotFold
+
+    def _evaluate_comparable(self, node: ast.expr) -> Any:
+        """Same as _evaluate, but sys.version_info is also known"""
+        if (
+            _is_sys_attribute(node, "version_info")
+            and self.target_python_version is not None
+        ):
+            return _VersionRange(self.target_python_version)
+
+        return self._evaluate(node)
+
+    def _evaluate_attribute(self, node: ast.Attribute) -> Any:
+        if self.target_platform is not None:
+            if _is_sys_attribute(node, "platform"):
+                return self.target_platform
+            if _is_module_attribute(node, "os", "name"):
+                return "nt" if self.target_platform == "win32" else "posix"
+
+        if (
+            self.target_python_version is not None
+            and node.attr in ("major", "minor")
+            and _is_sys_attribute(node.value, "version_info")
+        ):
+            return self.target_python_version[node.attr == "minor"]
+
+        name: str = get_dotted_name(node)
+        if name in self.constant_vars_to_fold:
+            return self.constant_vars_to_fold[name]
+
+        raise _CanNotFold
+
+    def _evaluate_version_subscript(self, node: ast.expr) -> Any:
+        """Returns major or minor version, or a tuple of them,
+        when only they are subscripted from sys.version_info"""
+        if self.target_python_version is None:
+            raise _CanNotFold
+
+        index: Any
+        if isinstance(node, ast.Slice):
+            lower: Any = None if node.lower is None else self._evaluate(node.lower)
+            upper: Any = None if node.upper is None else self._evaluate(node.upper)
+            if (
+                node.step is not None
+                or lower not in (None, 0, 1)
+                or upper not in (1, 2)
+                or isinstance(lower, bool)
+                or isinstance(upper, bool)
+            ):
+                raise _CanNotFold
+            index = slice(lower, upper)
+        else:
+            index = self._evaluate(node)
+            if index not in (0, 1) or isinstance(index, bool):
+                raise _CanNotFold
+
+        return self.target_python_version[index]
+
+    def _format(self, node: ast.FormattedValue) -> str:
+        value: Any = self._evaluate(node.value)
+        if not isinstance(value, (str, int, float)):
+            # Other types could be formatted differently between versions
+            raise _CanNotFold
+
+        if node.conversion != -1:
+            value = _CONVERSIONS[node.conversion](value)
+
+        if node.format_spec is None:
+            return format(value)
+        if not self.can_fold_format_specs:
+            raise _CanNotFold
+
+        format_spec: Any = self._evaluate(node.format_spec)
+        _check_format_spec(format_spec)
+
+        return _check_size(format(value, format_spec))
+
+
+def _compare(op: ast.cmpop, left: Any, right: Any) -> bool:
+    if isinstance(left, _VersionRange) or isinstance(right, _VersionRange):
+        if isinstance(op, (ast.Is, ast.IsNot, ast.In, ast.NotIn)):
+            raise _CanNotFold
+
+        results: set[bool] = {
+            bool(_CMPOPS[type(op)](left_value, right_value))
+            for left_value in _get_version_bounds(left)
+            for right_value in _get_version_bounds(right)
+        }
+        if len(results) != 1:
+            # Depends on the release of the target version
+            raise _CanNotFold
+        return results.pop()
+
+    if isinstance(op, (ast.Is, ast.IsNot)) and not (
+        _is_singleton(left) and _is_singleton(right)
+    ):
+        # Identity of other values is an implementation detail
+        raise _CanNotFold
+
+    return bool(_CMPOPS[type(op)](left, right))
+
+
+def _get_version_bounds(value: Any) -> tuple[Any, ...]:
+    if isinstance(value, _VersionRange):
+        return (value.lowest, value.highest)
+
+    return (value,)
+
+
+def _is_sys_attribute(node: ast.expr, attr: str) -> bool:
+    return _is_module_attribute(node, "sys", attr)
+
+
+def _is_module_attribute(node: ast.expr, module: str, attr: str) -> bool:
+    return (
+        isinstance(node, ast.Attribute)
+        and node.attr == attr
+        and isinstance(node.value, ast.Name)
+        and node.value.id == module
+    )
+
+
+def _check_binop_size(op: ast.operator, left: Any, right: Any) -> None:
+    """Raises if an operation would take too long or use too much memory"""
+    if isinstance(op, ast.Mult):
+        for sequence, count in ((left, right), (right, left)):
+            if isinstance(sequence, (str, bytes, tuple)) and isinstance(count, int):
+                if len(sequence) * count > _MAX_STR_SIZE:
+                    raise _CanNotFold
+
+    elif isinstance(op, ast.Pow):
+        if isinstance(left, int) and isinstance(right, int) and right > 0:
+            if left.bit_length() * right > _MAX_INT_SIZE:
+                raise _CanNotFold
+
+    elif isinstance(op, ast.LShift):
+        if isinstance(left, int) and isinstance(right, int):
+            if right > _MAX_INT_SIZE or left.bit_length() + right > _MAX_INT_SIZE:
+                raise _CanNotFold
+
+    elif isinstance(op, ast.Mod) and isinstance(left, (str, bytes)):
+        # printf style formatting can pad to any width
+        raise _CanNotFold
+
+
+def _check_size(value: Any) -> Any:
+    """Raises if value is too large to be written into source"""
+    if isinstance(value, int) and value.bit_length() > _MAX_INT_SIZE:
+        raise _CanNotFold
+    if isinstance(value, (str, bytes)) and len(value) > _MAX_STR_SIZE:
+        raise _CanNotFold
+    if isinstance(value, tuple) and len(value) > _MAX_COLLECTION_SIZE:
+        raise _CanNotFold
+
+    return value
+
+
+def _check_format_spec(format_spec: Any) -> None:
+    """Raises if formatting with format_spec could make a string too large
+    to be written into source, before it is made"""
+    match: re.Match | None = (
+        _FORMAT_SPEC.fullmatch(format_spec) if isinstance(format_spec, str) else None
+    )
+    if match is None:
+        raise _CanNotFold
+
+    for digits in match.groups():
+        # Checking the length first avoids converting huge numbers
+        if digits and (
+            len(digits) > len(str(_MAX_STR_SIZE)) or int(digits) > _MAX_STR_SIZE
+        ):
+            raise _CanNotFold
+
+
+def _is_singleton(value: Any) -> bool:
+    return any(value is singleton for singleton in _SINGLETONS)
+
+
+def _value_to_node(value: Any) -> ast.expr | None:
+    """Returns a node that evaluates to value, or None if there is no
+    node that unparses to it without needing parentheses"""
+    if value is None or isinstance(value, (bool, str, bytes)):
+        return ast.Constant(value)
+
+    if isinstance(value, (int, float)):
+        if isinstance(value, float) and not math.isfinite(value):
+            return None
+        if math.copysign(1, value) < 0:
+            return ast.UnaryOp(ast.USub(), ast.Constant(-value))
+        return ast.Constant(value)
+
+    # Tuples and complex numbers are written with parentheses
+    return None
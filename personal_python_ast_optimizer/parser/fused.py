@@ -0,0 +1,247 @@
+import ast
+from typing import Any, Callable, TextIO
+
+from personal_python_ast_optimizer.parser.config import SkipConfig, SkipUsage
+from personal_python_ast_optimizer.parser.minifier import MinifyUnparser
+from personal_python_ast_optimizer.parser.skipper import AstNodeSkipper
+from personal_python_ast_optimizer.parser.utils import (
+    TRY_NODES,
+    fill_empty_finally,
+    skip_dangling_expressions,
+)
+
+
+class ShallowNodeSkipper(AstNodeSkipper):
+    """AstNodeSkipper whose visitors only change the node given to them.
+    Children of a node are skipped when transform_children is called on it,
+    so a tree can be skipped top down while something else walks it"""
+
+    __slots__ = ("_visitors",)
+
+    def __init__(self, config: SkipConfig, skip_usage: SkipUsage | None = None) -> None:
+        super().__init__(config, skip_usage)
+
+        # Children of other types are left as is without a call to visit
+        self._visitors: dict[type, Callable[[Any], ast.AST | None]] = {
+            node_type: getattr(self, name)
+            for name in dir(self)
+            if name.startswith("visit_")
+            and isinstance(node_type := getattr(ast, name[6:], None), type)
+        }
+
+    def generic_visit(self, node: ast.AST) -> ast.AST:
+        return node
+
+    def transform_children(self, node: ast.AST) -> None:
+        """Visits direct children of node, removing or replacing them.
+        Same as AstNodeSkipper.generic_visit without recursing"""
+        irrelevant_nodes: set[ast.AST] = self._irrelevant_nodes
+        if node in irrelevant_nodes:
+            return
+
+        self.remove_unreachable_code(node)
+        visitors = self._visitors
+
+        for field in node._fields:
+            value = getattr(node, field, None)
+
+            if isinstance(value, list):
+                new_values: list | None = None
+                for index, item in enumerate(value):
+                    visitor = visitors.get(type(item))
+                    new_item: ast.AST | list[ast.AST] | None = (
+                        item
+                        if visitor is None or item in irrelevant_nodes
+                        else visitor(item)
+                    )
+
+                    # Only build a new list once something changes
+                    if new_item is not item and new_values is None:
+                        new_values = value[:index]
+                    if new_values is not None:
+                        if isinstance(new_item, list):
+                            new_values.extend(new_item)
+                        elif new_item is not None:
+                            new_values.append(new_item)
+
+                if new_values is not None:
+                    value[:] = new_values
+            elif isinstance(value, ast.AST):
+                visitor = visitors.get(type(value))
+                if visitor is not None and value not in irrelevant_nodes:
+                    new_node: ast.AST | None = visitor(value)
+                    if new_node is None:
+                        delattr(node, field)
+                    else:
+                        setattr(node, field, new_node)
+
+        if not isinstance(node, ast.Module) and hasattr(node, "body") and not node.body:
+            node.body.append(ast.Pass())
+        if isinstance(node, TRY_NODES):
+            fill_empty_finally(node)
+
+    def transform_subtree(self, node: ast.AST) -> None:
+        self.transform_children(node)
+        for child in ast.iter_child_nodes(node):
+            self.transform_subtree(child)
+
+    def start_module(self, node: ast.Module) -> bool:
+        """Skips what is needed on the module itself and returns
+        False if nothing in the module needs to be skipped"""
+        if not self._has_code_to_skip():
+            return False
+
+        if self.extras_to_skip_config.skip_dangling_expressions:
+            skip_dangling_expressions(node)
+
+        self.find_enums_to_fold(node)
+        self.skip_definitions(node)
+        self.index_module(node)
+
+        return True
+
+    def end_module(self) -> None:
+        self._irrelevant_nodes = set()
+        self.report_skip_usage()
+
+
+class FusedMinifyUnparser(MinifyUnparser):
+    """MinifyUnparser that skips nodes as configured while writing them.
+    Output is the same as AstNodeSkipper followed by MinifyUnparser, but the
+    tree is walked once and removed nodes are never visited.
+
+    Removing unused code and moving imports into functions need the whole
+    skipped tree, so when either is enabled the tree is skipped by an
+    AstNodeSkipper before being written.
+
+    Imports only used by removed code are found once the module is written,
+    which is then written again without them. So modules with imports are
+    not written to a stream until done, see MinifyUnparser.visit_to_stream"""
+
+    __slots__ = ("_skipper", "_tree_skipper")
+
+    _scope_nodes = (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+
+    # Nodes that never have children to skip
+    _leaf_nodes = frozenset((ast.Name, ast.Constant, ast.alias, ast.Pass))
+
+    def __init__(
+        self,
+        skip_config: SkipConfig | None = None,
+        skip_usage: SkipUsage | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+
+        self._skipper: ShallowNodeSkipper | None = None
+        self._tree_skipper: AstNodeSkipper | None = None
+        if skip_config is not None:
+            if (
+                skip_config.extras_to_skip_config.skip_unused_code
+                or skip_config.extras_to_skip_config.lazy_imports
+            ):
+                self._tree_skipper = AstNodeSkipper(skip_config, skip_usage)
+            else:
+                self._skipper = ShallowNodeSkipper(skip_config, skip_usage)
+
+    def visit(self, node: ast.AST) -> str:
+        if self._tree_skipper is not None and isinstance(node, ast.Module):
+            node = self._tree_skipper.visit(node)
+
+        skipper: ShallowNodeSkipper | None = self._skipper
+
+        if (
+            skipper is None
+            or not isinstance(node, ast.Module)
+            or not skipper.start_module(node)
+        ):
+            self._skipper = None
+            try:
+                return super().visit(node)
+            finally:
+                self._skipper = skipper
+
+        stream: TextIO | None = self._stream
+        if stream is not None and any(
+            isinstance(child, (ast.Import, ast.ImportFrom)) for child in ast.walk(node)
+        ):
+            # Written source can't be taken back if the module is written again
+            self._stream = None
+
+        try:
+            source: str = super().visit(node)
+        finally:
+            skipper.end_module()
+            self._stream = stream
+
+        removed_type_definitions: bool = skipper.remove_unused_type_definitions(node)
+        if skipper.remove_pruned_imports(node) or removed_type_definitions:
+            # Imports and type definitions were written before the code
+            # using them was removed
+            self._skipper = None
+            try:
+                return super().visit(node)
+            finally:
+                self._skipper = skipper
+
+        return source
+
+    def visit_node(
+        self,
+        node: ast.AST,
+        is_last_node_in_body: bool = False,
+        last_visited_node: ast.stmt | None = None,
+    ) -> None:
+        skipper: ShallowNodeSkipper | None = self._skipper
+
+        if skipper is None or type(node) in self._leaf_nodes:
+            return super().visit_node(node, is_last_node_in_body, last_visited_node)
+
+        if skipper.is_irrelevant(node):
+            # Nothing under node changes, so write it without the skipper
+            self._skipper = None
+            try:
+                return super().visit_node(node, is_last_node_in_body, last_visited_node)
+            finally:
+                self._skipper = skipper
+
+        if isinstance(node, self._scope_nodes):
+            with skipper.within_scope(node):
+                skipper.transform_children(node)
+                return super().visit_node(node, is_last_node_in_body, last_visited_node)
+
+        if isinstance(node, ast.JoinedStr):
+            # f-string parts are written by new unparsers without a skipper
+            skipper.transform_subtree(node)
+        else:
+            skipper.transform_children(node)
+
+        return super().visit_node(node, is_last_node_in_body, last_visited_node)
+
+    def get_raw_docstring(self, node: ast.AST) -> ast.Constant | None:
+        body: list[ast.stmt] | None = getattr(node, "body", None)
+        if self._skipper is not None and body and isinstance(body[0], ast.Expr):
+            # Base class checks the expression's value before visiting it.
+            # Transforming it early is fine since skipping a node is idempotent
+            self._skipper.transform_children(body[0])
+
+        return super().get_raw_docstring(node)
+
+    def visit_If(self, node: ast.If) -> None:
+        if self._skipper is not None:
+            # Base class writes elif nodes without visiting them
+            elif_node: ast.If = node
+            while len(elif_node.orelse) == 1 and isinstance(
+                elif_node.orelse[0], ast.If
+            ):
+                elif_node = elif_node.orelse[0]
+                self._skipper.transform_children(elif_node)
+
+        super().visit_If(node)
+
+    def visit_Subscript(self, node: ast.Subscript) -> None:
+        if self._skipper is not None and isinstance(node.slice, ast.Tuple):
+            # Base class writes elements of a tuple slice without visiting it
+            self._skipper.transform_children(node.slice)
+
+        super().visit_Subscript(node)
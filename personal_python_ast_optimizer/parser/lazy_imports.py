@@ -0,0 +1,279 @@
+"""Moves top level imports only read inside functions into those functions,
+so importing a module no longer imports what only some of its functions use.
+
+This is conservative: an import is only moved if every read of its name is
+in the body of a function, nothing else binds the name, it is not in __all__
+or re-exported with import x as x, and the module never reads its globals by
+name. Moving an import changes when the imported module runs, and its name
+is no longer an attribute of this module for other modules to import, so
+names other modules read need to be kept, like minify_project does"""
+
+import ast
+from typing import Container
+
+from personal_python_ast_optimizer.parser.unused import get_string_annotation_names
+
+# Importing these does something, so when they are imported is kept
+_IMPORTS_WITH_SIDE_EFFECTS: frozenset[str] = frozenset(
+    ("antigravity", "readline", "rlcompleter", "site", "this")
+)
+
+# Reading any of these lets a function read any global by name
+_DYNAMIC_NAMES: frozenset[str] = frozenset(
+    ("eval", "exec", "globals", "locals", "vars")
+)
+
+_FunctionNode = ast.FunctionDef | ast.AsyncFunctionDef
+
+
+class _ImportUseFinder(ast.NodeVisitor):
+    """Finds where names are read, and which names are bound anywhere
+    other than by the top level imports being moved"""
+
+    __slots__ = (
+        "_imports",
+        "_function",
+        "_scope_names",
+        "bound_names",
+        "import_time_names",
+        "function_uses",
+        "function_names",
+    )
+
+    def __init__(self, imports: set[ast.alias]) -> None:
+        self._imports: set[ast.alias] = imports
+        # Outermost function being visited, None at import time
+        self._function: _FunctionNode | None = None
+        self._scope_names: list[str] = []
+
+        self.bound_names: set[str] = set()
+        self.import_time_names: set[str] = set()
+        # Outermost functions reading each name, in order of first read
+        self.function_uses: dict[str, dict[_FunctionNode, None]] = {}
+        # Name of each outermost function within the module, like Class.method
+        self.function_names: dict[_FunctionNode, str] = {}
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if not isinstance(node.ctx, ast.Load):
+            self.bound_names.add(node.id)
+        elif self._function is None:
+            self.import_time_names.add(node.id)
+        else:
+            self.function_uses.setdefault(node.id, {})[self._function] = None
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self._visit_function(node)
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
+        self._visit_function(node)
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        # Class bodies run when the class is made, like other statements
+        self.bound_names.add(node.name)
+        self._scope_names.append(node.name)
+        self.generic_visit(node)
+        self._scope_names.pop()
+
+    def visit_arg(self, node: ast.arg) -> None:
+        self.bound_names.add(node.arg)
+        self.generic_visit(node)
+        self._visit_annotation(node.annotation)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign) -> None:
+        self.generic_visit(node)
+        self._visit_annotation(node.annotation)
+
+    def visit_alias(self, node: ast.alias) -> None:
+        if node not in self._imports:
+            self.bound_names.add(get_bound_name(node))
+
+    def visit_Global(self, node: ast.Global) -> None:
+        self.bound_names.update(node.names)
+
+    def visit_Nonlocal(self, node: ast.Nonlocal) -> None:
+        self.bound_names.update(node.names)
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler) -> None:
+        if node.name is not None:
+            self.bound_names.add(node.name)
+        self.generic_visit(node)
+
+    def visit_MatchAs(self, node: ast.MatchAs) -> None:
+        if node.name is not None:
+            self.bound_names.add(node.name)
+        self.generic_visit(node)
+
+    def visit_MatchStar(self, node: ast.MatchStar) -> None:
+        if node.name is not None:
+            self.bound_names.add(node.name)
+
+    def visit_MatchMapping(self, node: ast.MatchMapping) -> None:
+        if node.rest is not None:
+            self.bound_names.add(node.rest)
+        self.generic_visit(node)
+
+    def _visit_function(self, node: _FunctionNode) -> None:
+        self.bound_names.add(node.name)
+
+        # Decorators, defaults, and annotations run when the function is made.
+        # Type parameters run later, but read globals like annotations can
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+        for type_param in getattr(node, "type_params", ()):
+            self.visit(type_param)
+        self.visit(node.args)
+        if node.returns is not None:
+            self.visit(node.returns)
+            self._visit_annotation(node.returns)
+
+        previous_function: _FunctionNode | None = self._function
+        if previous_function is None:
+            self._function = node
+            self.function_names[node] = ".".join(self._scope_names + [node.name])
+
+        self._scope_names.append(node.name)
+        for statement in node.body:
+            self.visit(statement)
+        self._scope_names.pop()
+
+        self._function = previous_function
+
+    def _visit_annotation(self, annotation: ast.expr | None) -> None:
+        # String annotations are read from globals, like by typing.get_type_hints
+        self.import_time_names.update(get_string_annotation_names(annotation))
+
+
+def get_bound_name(node: ast.alias) -> str:
+    """Returns the name an alias of an import binds, like a for import a.b"""
+    return node.asname or node.name.split(".")[0]
+
+
+def move_imports_into_functions(
+    module: ast.Module, names_to_keep: Container[str] = ()
+) -> list[str]:
+    """Moves top level imports only read inside functions to the start of
+    the outermost functions reading them. Returns a description of each
+    import that was moved.
+
+    names_to_keep: names bound by imports that are never moved"""
+    imports: dict[str, tuple[ast.Import | ast.ImportFrom, ast.alias]] = {}
+    repeated_names: set[str] = set()
+    all_names: set[str] = set()
+
+    for statement in module.body:
+        if isinstance(statement, (ast.Import, ast.ImportFrom)):
+            for alias in statement.names:
+                if _can_move(statement, alias):
+                    bound_name: str = get_bound_name(alias)
+                    if bound_name in imports:
+                        repeated_names.add(bound_name)
+                    imports[bound_name] = (statement, alias)
+        elif _is_all_assign(statement):
+            all_names.update(
+                child.value
+                for child in ast.walk(statement)
+                if isinstance(child, ast.Constant) and isinstance(child.value, str)
+            )
+
+    if not imports:
+        return []
+
+    finder = _ImportUseFinder({alias for _, alias in imports.values()})
+    finder.visit(module)
+    if not _DYNAMIC_NAMES.isdisjoint(finder.import_time_names) or any(
+        name in finder.function_uses for name in _DYNAMIC_NAMES
+    ):
+        return []
+
+    # Aliases to move from each statement into each function, in module order
+    moves: dict[_FunctionNode, dict[ast.stmt, list[ast.alias]]] = {}
+    moved_imports: list[str] = []
+    for bound_name, (statement, alias) in imports.items():
+        functions: dict[_FunctionNode, None] | None = finder.function_uses.get(
+            bound_name
+        )
+        if (
+            functions is None
+            or bound_name in names_to_keep
+            or bound_name in repeated_names
+            or bound_name in all_names
+            or bound_name in finder.bound_names
+            or bound_name in finder.import_time_names
+        ):
+            continue
+
+        for function in functions:
+            moves.setdefault(function, {}).setdefault(statement, []).append(alias)
+        statement.names.remove(alias)
+        moved_imports.append(
+            f"moved {ast.unparse(_copy_import(statement, [alias]))} into "
+            + ", ".join(finder.function_names[function] for function in functions)
+        )
+
+    if not moved_imports:
+        return []
+
+    module.body = [
+        statement
+        for statement in module.body
+        if not isinstance(statement, (ast.Import, ast.ImportFrom)) or statement.names
+    ]
+
+    for function, statement_aliases in moves.items():
+        # After the docstring, if it was kept
+        index: int = (
+            1
+            if isinstance(function.body[0], ast.Expr)
+            and isinstance(function.body[0].value, ast.Constant)
+            and isinstance(function.body[0].value.value, str)
+            else 0
+        )
+        function.body[index:index] = [
+            _copy_import(statement, aliases)  # type: ignore
+            for statement, aliases in sorted(
+                statement_aliases.items(),
+                key=lambda item: getattr(item[0], "lineno", 0),
+            )
+        ]
+
+    return moved_imports
+
+
+def _can_move(node: ast.Import | ast.ImportFrom, alias: ast.alias) -> bool:
+    if alias.name == "*" or alias.asname == alias.name:
+        # Star imports and explicit re-exports
+        return False
+
+    module_name: str = alias.name if isinstance(node, ast.Import) else node.module or ""
+    return (
+        module_name != "__future__"
+        and module_name.split(".")[0] not in _IMPORTS_WITH_SIDE_EFFECTS
+    )
+
+
+def _is_all_assign(node: ast.stmt) -> bool:
+    targets: list[ast.expr]
+    if isinstance(node, ast.Assign):
+        targets = node.targets
+    elif isinstance(node, (ast.AugAssign, ast.AnnAssign)):
+        targets = [node.target]
+    else:
+        return False
+
+    return any(getattr(target, "id", "") == "__all__" for target in targets)
+
+
+def _copy_import(
+    node: ast.Import | ast.ImportFrom, aliases: list[ast.alias]
+) -> ast.Import | ast.ImportFrom:
+    new_aliases: list[ast.alias] = [
+        ast.copy_location(ast.alias(alias.name, alias.asname), alias)
+        for alias in aliases
+    ]
+    new_node: ast.Import | ast.ImportFrom = (
+        ast.Import(new_aliases)
+        if isinstance(node, ast.Import)
+        else ast.ImportFrom(node.module, new_aliases, node.level)
+    )
+
+    return ast.copy_location(new_node, node)
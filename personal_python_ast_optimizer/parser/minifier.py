@@ -1,24 +1,79 @@
 import ast
-from ast import _Unparser  # type: ignore
-from typing import Literal
+from ast import _Precedence, _Unparser  # type: ignore
+from types import MappingProxyType
+from typing import Any, Callable, Iterable, Literal, Mapping, TextIO
 
-from personal_python_ast_optimizer.python_info import (
-    comparison_and_conjunctions,
-    operators_and_separators,
-)
+# 3.10 parenthesizes walrus expressions at tuple precedence
+_NAMED_EXPR_PRECEDENCE = getattr(_Precedence, "NAMED_EXPR", _Precedence.TUPLE)
+
+
+def _get_binop_spelling(name: str) -> tuple[str, Any, Any]:
+    """Returns operator, left precedence, and right precedence of a BinOp"""
+    operator: str = _Unparser.binop[name]
+    precedence = _Unparser.binop_precedence[operator]
+    if operator in _Unparser.binop_rassoc:
+        return operator, precedence.next(), precedence
+
+    return operator, precedence, precedence.next()
 
 
 class MinifyUnparser(_Unparser):
+    """Unparser that writes the shortest spelling of each token.
+    Separators and operators are written without spaces and keywords only
+    get a space before them when the previous token needs one"""
+
+    __slots__ = ("is_last_node_in_body", "previous_node_in_body", "_stream")
+
+    # Read only since they are shared by instances on every thread
+    _binops: Mapping[type, tuple[str, Any, Any]] = MappingProxyType(
+        {getattr(ast, name): _get_binop_spelling(name) for name in _Unparser.binop}
+    )
 
-    __slots__ = ("is_last_node_in_body", "previous_node_in_body")
+    # Keyword comparisons are written like keywords, see _write_keyword
+    _cmpops: Mapping[type, tuple[str, bool]] = MappingProxyType(
+        {
+            getattr(ast, name): (
+                (f"{operator} ", True) if operator[0].isalpha() else (operator, False)
+            )
+            for name, operator in _Unparser.cmpops.items()
+        }
+    )
 
-    def __init__(self) -> None:
+    _boolops: Mapping[type, tuple[str, Any]] = MappingProxyType(
+        {
+            ast.And: ("and ", _Precedence.AND),
+            ast.Or: ("or ", _Precedence.OR),
+        }
+    )
+
+    def __init__(self, **kwargs) -> None:
+        """kwargs are passed to the base unparser, which creates new instances
+        of this class with its own keyword arguments when writing f-strings"""
         self._source: list[str]  # type: ignore
         self._indent: int  # type: ignore
-        super().__init__()
+        super().__init__(**kwargs)
 
         self.previous_node_in_body: ast.stmt | None = None
         self.is_last_node_in_body: bool = False
+        self._stream: TextIO | None = None
+
+    def visit_to_stream(self, node: ast.AST, stream: TextIO) -> None:
+        """Writes the same output as visit into stream. Source is written
+        after each top level statement instead of joined at the end, so only
+        one top level statement is held in memory at a time"""
+        self._stream = stream
+        try:
+            stream.write(self.visit(node))
+        finally:
+            self._stream = None
+
+    def _flush_to_stream(self) -> None:
+        """Writes source to the stream, keeping the last token
+        since what is written next depends on it"""
+        source: list[str] = self._source
+        if self._stream is not None and len(source) > 1:
+            self._stream.write("".join(source[:-1]))
+            del source[:-1]
 
     def fill(self, text: str = "", splitter: Literal["", "\n", ";"] = "\n") -> None:
         """Overrides super fill to use tabs over spaces and different line splitters"""
@@ -32,19 +87,27 @@ class MinifyUnparser(_Unparser):
                 self.write(f";{text}")
 
     def write(self, *text: str) -> None:
-        """Write text, with some mapping replacements"""
-        text = tuple(map(self._update_text_to_write, text))
         self._source.extend(text)
 
-    def _update_text_to_write(self, text: str) -> str:
-        """Give text to be written, replace some specific occurrences"""
-        if text in operators_and_separators:
-            return text.strip()
+    def _write_comma(self) -> None:
+        self.write(",")
+
+    def _write_keyword(self, keyword: str) -> None:
+        """Writes a keyword that ends in a space, like 'in ',
+        with a space before it only if the previous token needs one"""
+        self.write(self._get_space_before_write() + keyword)
 
-        if text in comparison_and_conjunctions:
-            return self._get_space_before_write() + text[1:]
+    def _write_comma_separated(
+        self, traverser: Callable[[Any], None], items: Iterable
+    ) -> None:
+        self.interleave(self._write_comma, traverser, items)
 
-        return text
+    def items_view(self, traverser: Callable[[Any], None], items: list) -> None:
+        if len(items) == 1:
+            traverser(items[0])
+            self.write(",")
+        else:
+            self._write_comma_separated(traverser, items)
 
     def maybe_newline(self) -> None:
         if self._source and self._source[-1] != "\n":
@@ -68,10 +131,13 @@ class MinifyUnparser(_Unparser):
         if isinstance(node, list):
             last_visited_node: ast.stmt | None = None
             last_index = len(node) - 1
+            is_top_level: bool = self._stream is not None and self._indent == 0
             for index, item in enumerate(node):
                 is_last_node_in_body: bool = index == last_index
                 self.visit_node(item, is_last_node_in_body, last_visited_node)
                 last_visited_node = item
+                if is_top_level:
+                    self._flush_to_stream()
         else:
             self.visit_node(node)
 
@@ -119,6 +185,341 @@ class MinifyUnparser(_Unparser):
         self.write(self.binop[node.op.__class__.__name__] + "=")
         self.traverse(node.value)
 
+    def visit_AnnAssign(self, node: ast.AnnAssign) -> None:
+        self.fill()
+        with self.delimit_if(
+            "(", ")", not node.simple and isinstance(node.target, ast.Name)
+        ):
+            self.traverse(node.target)
+        self.write(":")
+        self.traverse(node.annotation)
+        if node.value:
+            self.write("=")
+            self.traverse(node.value)
+
+    def visit_NamedExpr(self, node: ast.NamedExpr) -> None:
+        with self.require_parens(_NAMED_EXPR_PRECEDENCE, node):
+            self.set_precedence(_Precedence.ATOM, node.target, node.value)
+            self.traverse(node.target)
+            self.write(":=")
+            self.traverse(node.value)
+
+    def visit_Import(self, node: ast.Import) -> None:
+        self.fill("import ")
+        self._write_comma_separated(self.traverse, node.names)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        self.fill("from ")
+        self.write("." * (node.level or 0))
+        if node.module:
+            self.write(node.module)
+        self.write(" import ")
+        self._write_comma_separated(self.traverse, node.names)
+
+    def visit_Delete(self, node: ast.Delete) -> None:
+        self.fill("del ")
+        self._write_comma_separated(self.traverse, node.targets)
+
+    def visit_Assert(self, node: ast.Assert) -> None:
+        self.fill("assert ")
+        self.traverse(node.test)
+        if node.msg:
+            self.write(",")
+            self.traverse(node.msg)
+
+    def visit_Global(self, node: ast.Global) -> None:
+        self.fill("global ")
+        self._write_comma_separated(self.write, node.names)
+
+    def visit_Nonlocal(self, node: ast.Nonlocal) -> None:
+        self.fill("nonlocal ")
+        self._write_comma_separated(self.write, node.names)
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self.maybe_newline()
+        for decorator in node.decorator_list:
+            self.fill("@")
+            self.traverse(decorator)
+        self.fill("class " + node.name)
+        if hasattr(node, "type_params"):
+            self._type_params_helper(node.type_params)
+        with self.delimit_if("(", ")", condition=node.bases or node.keywords):
+            self._write_comma_separated(self.traverse, node.bases + node.keywords)
+
+        with self.block():
+            self._write_docstring_and_traverse_body(node)
+
+    def _type_params_helper(self, type_params: list | None) -> None:
+        if type_params:
+            with self.delimit("[", "]"):
+                self._write_comma_separated(self.traverse, type_params)
+
+    def visit_TypeVar(self, node: Any) -> None:
+        self.write(node.name)
+        if node.bound:
+            self.write(":")
+            self.traverse(node.bound)
+        self._write_type_param_default(node)
+
+    def visit_TypeVarTuple(self, node: Any) -> None:
+        self.write("*" + node.name)
+        self._write_type_param_default(node)
+
+    def visit_ParamSpec(self, node: Any) -> None:
+        self.write("**" + node.name)
+        self._write_type_param_default(node)
+
+    def _write_type_param_default(self, node: Any) -> None:
+        # Defaults were added in 3.13
+        default_value: ast.expr | None = getattr(node, "default_value", None)
+        if default_value:
+            self.write("=")
+            self.traverse(default_value)
+
+    def visit_TypeAlias(self, node: Any) -> None:
+        self.fill("type ")
+        self.traverse(node.name)
+        self._type_params_helper(node.type_params)
+        self.write("=")
+        self.traverse(node.value)
+
+    def _for_helper(self, fill: str, node: ast.For | ast.AsyncFor) -> None:
+        self.fill(fill)
+        self.set_precedence(_Precedence.TUPLE, node.target)
+        self.traverse(node.target)
+        self._write_keyword("in ")
+        self.traverse(node.iter)
+        with self.block(extra=self.get_type_comment(node)):
+            self.traverse(node.body)
+        if node.orelse:
+            self.fill("else")
+            with self.block():
+                self.traverse(node.orelse)
+
+    def visit_With(self, node: ast.With) -> None:
+        self._with_helper("with ", node)
+
+    def visit_AsyncWith(self, node: ast.AsyncWith) -> None:
+        self._with_helper("async with ", node)
+
+    def _with_helper(self, fill: str, node: ast.With | ast.AsyncWith) -> None:
+        self.fill(fill)
+        self._write_comma_separated(self.traverse, node.items)
+        with self.block(extra=self.get_type_comment(node)):
+            self.traverse(node.body)
+
+    def visit_List(self, node: ast.List) -> None:
+        with self.delimit("[", "]"):
+            self._write_comma_separated(self.traverse, node.elts)
+
+    def visit_Set(self, node: ast.Set) -> None:
+        if node.elts:
+            with self.delimit("{", "}"):
+                self._write_comma_separated(self.traverse, node.elts)
+        else:
+            self.write("{*()}")
+
+    def visit_Dict(self, node: ast.Dict) -> None:
+        def write_item(item: tuple[ast.expr | None, ast.expr]) -> None:
+            key, value = item
+            if key is None:
+                self.write("**")
+                self.set_precedence(_Precedence.EXPR, value)
+                self.traverse(value)
+            else:
+                self.traverse(key)
+                self.write(":")
+                self.traverse(value)
+
+        with self.delimit("{", "}"):
+            self._write_comma_separated(write_item, zip(node.keys, node.values))
+
+    def visit_DictComp(self, node: ast.DictComp) -> None:
+        with self.delimit("{", "}"):
+            self.traverse(node.key)
+            self.write(":")
+            self.traverse(node.value)
+            for generator in node.generators:
+                self.traverse(generator)
+
+    def visit_comprehension(self, node: ast.comprehension) -> None:
+        self._write_keyword("async for " if node.is_async else "for ")
+        self.set_precedence(_Precedence.TUPLE, node.target)
+        self.traverse(node.target)
+        self._write_keyword("in ")
+        self.set_precedence(_Precedence.TEST.next(), node.iter, *node.ifs)
+        self.traverse(node.iter)
+        for if_clause in node.ifs:
+            self._write_keyword("if ")
+            self.traverse(if_clause)
+
+    def visit_IfExp(self, node: ast.IfExp) -> None:
+        with self.require_parens(_Precedence.TEST, node):
+            self.set_precedence(_Precedence.TEST.next(), node.body, node.test)
+            self.traverse(node.body)
+            self._write_keyword("if ")
+            self.traverse(node.test)
+            self._write_keyword("else ")
+            self.set_precedence(_Precedence.TEST, node.orelse)
+            self.traverse(node.orelse)
+
+    def visit_BinOp(self, node: ast.BinOp) -> None:
+        operator, left_precedence, right_precedence = self._binops[type(node.op)]
+        with self.require_parens(self.binop_precedence[operator], node):
+            self.set_precedence(left_precedence, node.left)
+            self.traverse(node.left)
+            self.write(operator)
+            self.set_precedence(right_precedence, node.right)
+            self.traverse(node.right)
+
+    def visit_Compare(self, node: ast.Compare) -> None:
+        with self.require_parens(_Precedence.CMP, node):
+            self.set_precedence(_Precedence.CMP.next(), node.left, *node.comparators)
+            self.traverse(node.left)
+            for op, comparator in zip(node.ops, node.comparators):
+                operator, is_keyword = self._cmpops[type(op)]
+                if is_keyword:
+                    self._write_keyword(operator)
+                else:
+                    self.write(operator)
+                self.traverse(comparator)
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> None:
+        operator, operator_precedence = self._boolops[type(node.op)]
+
+        def increasing_level_traverse(value: ast.expr) -> None:
+            nonlocal operator_precedence
+            operator_precedence = operator_precedence.next()
+            self.set_precedence(operator_precedence, value)
+            self.traverse(value)
+
+        with self.require_parens(operator_precedence, node):
+            self.interleave(
+                lambda: self._write_keyword(operator),
+                increasing_level_traverse,
+                node.values,
+            )
+
+    def visit_Call(self, node: ast.Call) -> None:
+        self.set_precedence(_Precedence.ATOM, node.func)
+        self.traverse(node.func)
+        with self.delimit("(", ")"):
+            self._write_comma_separated(self.traverse, node.args + node.keywords)
+
+    def visit_arg(self, node: ast.arg) -> None:
+        self.write(node.arg)
+        if node.annotation:
+            self.write(":")
+            self.traverse(node.annotation)
+
+    def visit_arguments(self, node: ast.arguments) -> None:
+        first: bool = True
+        all_args: list[ast.arg] = node.posonlyargs + node.args
+        defaults: list[ast.expr | None] = [None] * (
+            len(all_args) - len(node.defaults)
+        ) + node.defaults
+        for index, (arg, default) in enumerate(zip(all_args, defaults), 1):
+            if first:
+                first = False
+            else:
+                self.write(",")
+            self.traverse(arg)
+            if default:
+                self.write("=")
+                self.traverse(default)
+            if index == len(node.posonlyargs):
+                self.write(",/")
+
+        if node.vararg or node.kwonlyargs:
+            if first:
+                first = False
+            else:
+                self.write(",")
+            self.write("*")
+            if node.vararg:
+                self.traverse(node.vararg)
+
+        for arg, kw_default in zip(node.kwonlyargs, node.kw_defaults):
+            self.write(",")
+            self.traverse(arg)
+            if kw_default:
+                self.write("=")
+                self.traverse(kw_default)
+
+        if node.kwarg:
+            if not first:
+                self.write(",")
+            self.write("**")
+            self.traverse(node.kwarg)
+
+    def visit_Lambda(self, node: ast.Lambda) -> None:
+        with self.require_parens(_Precedence.TEST, node):
+            self.write("lambda")
+            args_start: int = len(self._source)
+            self.traverse(node.args)
+            if len(self._source) > args_start:
+                self._source.insert(args_start, " ")
+            self.write(":")
+            self.set_precedence(_Precedence.TEST, node.body)
+            self.traverse(node.body)
+
+    def visit_match_case(self, node: ast.match_case) -> None:
+        self.fill("case ")
+        self.traverse(node.pattern)
+        if node.guard:
+            self._write_keyword("if ")
+            self.traverse(node.guard)
+        with self.block():
+            self.traverse(node.body)
+
+    def visit_MatchSequence(self, node: ast.MatchSequence) -> None:
+        with self.delimit("[", "]"):
+            self._write_comma_separated(self.traverse, node.patterns)
+
+    def visit_MatchMapping(self, node: ast.MatchMapping) -> None:
+        def write_key_pattern_pair(pair: tuple[ast.expr, ast.pattern]) -> None:
+            key, pattern = pair
+            self.traverse(key)
+            self.write(":")
+            self.traverse(pattern)
+
+        with self.delimit("{", "}"):
+            self._write_comma_separated(
+                write_key_pattern_pair, zip(node.keys, node.patterns)
+            )
+            if node.rest is not None:
+                if node.keys:
+                    self.write(",")
+                self.write(f"**{node.rest}")
+
+    def visit_MatchClass(self, node: ast.MatchClass) -> None:
+        def write_attr_pattern(pair: tuple[str, ast.pattern]) -> None:
+            attr, pattern = pair
+            self.write(f"{attr}=")
+            self.traverse(pattern)
+
+        self.set_precedence(_Precedence.ATOM, node.cls)
+        self.traverse(node.cls)
+        with self.delimit("(", ")"):
+            self._write_comma_separated(self.traverse, node.patterns)
+            if node.kwd_attrs:
+                if node.patterns:
+                    self.write(",")
+                self._write_comma_separated(
+                    write_attr_pattern, zip(node.kwd_attrs, node.kwd_patterns)
+                )
+
+    def visit_MatchOr(self, node: ast.MatchOr) -> None:
+        with self.require_parens(_Precedence.BOR, node):
+            self.set_precedence(_Precedence.BOR.next(), *node.patterns)
+            self.interleave(lambda: self.write("|"), self.traverse, node.patterns)
+
+    def visit_FunctionType(self, node: ast.FunctionType) -> None:
+        with self.delimit("(", ")"):
+            self._write_comma_separated(self.traverse, node.argtypes)
+        self.write(" -> ")
+        self.traverse(node.returns)
+
     def _get_space_before_write(self) -> str:
         if not self._source:
             return ""
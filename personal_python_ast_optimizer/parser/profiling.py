@@ -0,0 +1,200 @@
+import ast
+import marshal
+import time
+from typing import Any, Callable, Iterable
+
+from personal_python_ast_optimizer.parser.config import (
+    SkipConfig,
+    TokensToSkip,
+    TokensToSkipConfig,
+)
+from personal_python_ast_optimizer.parser.minifier import MinifyUnparser
+from personal_python_ast_optimizer.parser.skipper import AstNodeSkipper
+
+# (filename, line number, function name), same as keys of cProfile stats
+_FunctionKey = tuple[str, int, str]
+
+
+class _ProfiledTokensToSkip(TokensToSkip):
+    """TokensToSkip that also counts lookups and hits"""
+
+    __slots__ = ("lookups", "hits", "token_hits")
+
+    def __init__(self, tokens_to_skip: TokensToSkip) -> None:
+        super().__init__(
+            tokens_to_skip.tokens, tokens_to_skip.token_type, tokens_to_skip.usage
+        )
+
+        self.lookups: int = 0
+        self.hits: int = 0
+        self.token_hits: dict[str, int] = {token: 0 for token in self.tokens}
+
+    def __contains__(self, key: object) -> bool:
+        self.lookups += 1
+        return super().__contains__(key)
+
+    def matches_parts(self, parts: Iterable[str]) -> bool:
+        self.lookups += 1
+        return super().matches_parts(parts)
+
+    def _record(self, token: str) -> None:
+        self.hits += 1
+        self.token_hits[token] += 1
+        super()._record(token)
+
+
+class VisitorProfile:
+    """Calls and time of each visitor method of instrumented visitors,
+    and lookups of each kind of token to skip.
+
+    Nothing is measured unless a visitor is instrumented, so there is no cost
+    otherwise. Can be loaded by pstats.Stats like a cProfile.Profile"""
+
+    __slots__ = (
+        "function_stats",
+        "token_lookups",
+        "stats",
+        "_child_seconds",
+        "_depths",
+    )
+
+    def __init__(self) -> None:
+        # Primitive calls, calls, own seconds, and cumulative seconds
+        self.function_stats: dict[_FunctionKey, list] = {}
+        # Lookups, hits, and hits of each token, by token type
+        self.token_lookups: dict[str, dict[str, Any]] = {}
+        # Set by create_stats, in the format of cProfile.Profile.stats
+        self.stats: dict[_FunctionKey, tuple] = {}
+
+        # Time spent in children of each function on the call stack
+        self._child_seconds: list[float] = []
+        # Calls of each function on the call stack, to not time recursion twice
+        self._depths: dict[_FunctionKey, int] = {}
+
+    def instrument(self, visitor: ast.NodeVisitor) -> None:
+        """Times visitor's visit methods, and those of its TokensToSkip
+        if it is an AstNodeSkipper, by wrapping them on the instance"""
+        for name in dir(visitor):
+            if name.startswith("visit") or name == "generic_visit":
+                method = getattr(visitor, name)
+                if callable(method) and hasattr(method, "__func__"):
+                    setattr(visitor, name, self._wrap(method))
+
+        if isinstance(visitor, AstNodeSkipper):
+            self._instrument_tokens(visitor.tokens_to_skip_config)
+
+    def add_token_lookups(self, tokens_to_skip_config: TokensToSkipConfig) -> None:
+        """Adds counts of instrumented TokensToSkip to this profile"""
+        for tokens_to_skip in tokens_to_skip_config:
+            if not isinstance(tokens_to_skip, _ProfiledTokensToSkip):
+                continue
+
+            lookups: dict[str, Any] = self.token_lookups.setdefault(
+                tokens_to_skip.token_type, {"lookups": 0, "hits": 0, "tokens": {}}
+            )
+            lookups["lookups"] += tokens_to_skip.lookups
+            lookups["hits"] += tokens_to_skip.hits
+            for token, hits in tokens_to_skip.token_hits.items():
+                lookups["tokens"][token] = lookups["tokens"].get(token, 0) + hits
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns profile as JSON compatible data,
+        visitors sorted by time spent in them"""
+        visitors: list[dict[str, Any]] = [
+            {
+                "function": function_name,
+                "file": file_name,
+                "line": line,
+                "calls": calls,
+                "primitive_calls": primitive_calls,
+                "own_seconds": own_seconds,
+                "cumulative_seconds": cumulative_seconds,
+            }
+            for (file_name, line, function_name), (
+                primitive_calls,
+                calls,
+                own_seconds,
+                cumulative_seconds,
+            ) in self.function_stats.items()
+        ]
+        visitors.sort(key=lambda visitor: visitor["own_seconds"], reverse=True)
+
+        return {"visitors": visitors, "token_lookups": self.token_lookups}
+
+    def create_stats(self) -> None:
+        """Called by pstats.Stats to load this profile"""
+        self.stats = {
+            key: (primitive_calls, calls, own_seconds, cumulative_seconds, {})
+            for key, (
+                primitive_calls,
+                calls,
+                own_seconds,
+                cumulative_seconds,
+            ) in self.function_stats.items()
+        }
+
+    def dump_stats(self, path: str) -> None:
+        """Writes stats to a file that pstats and cProfile tools can read"""
+        self.create_stats()
+        with open(path, "wb") as fp:
+            marshal.dump(self.stats, fp)
+
+    def _instrument_tokens(self, tokens_to_skip_config: TokensToSkipConfig) -> None:
+        for attr in TokensToSkipConfig.TOKEN_ATTRS:
+            tokens_to_skip: TokensToSkip = getattr(tokens_to_skip_config, attr)
+            if not isinstance(tokens_to_skip, _ProfiledTokensToSkip):
+                setattr(
+                    tokens_to_skip_config, attr, _ProfiledTokensToSkip(tokens_to_skip)
+                )
+
+    def _wrap(self, method: Callable) -> Callable:
+        code = method.__func__.__code__  # type: ignore
+        key: _FunctionKey = (
+            code.co_filename,
+            code.co_firstlineno,
+            method.__func__.__qualname__,  # type: ignore
+        )
+        stats: list = self.function_stats.setdefault(key, [0, 0, 0.0, 0.0])
+        child_seconds: list[float] = self._child_seconds
+        depths: dict[_FunctionKey, int] = self._depths
+        perf_counter = time.perf_counter
+
+        def timed_method(*args, **kwargs):
+            depth: int = depths.get(key, 0)
+            depths[key] = depth + 1
+            child_seconds.append(0.0)
+            start: float = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                seconds: float = perf_counter() - start
+                stats[1] += 1
+                stats[2] += seconds - child_seconds.pop()
+                if depth == 0:
+                    stats[0] += 1
+                    stats[3] += seconds
+                depths[key] = depth
+                if child_seconds:
+                    child_seconds[-1] += seconds
+
+        return timed_method
+
+
+def run_profiled_minify_parser(
+    profile: VisitorProfile, source: str, skip_config: SkipConfig | None = None
+) -> str:
+    """Same as run_minify_parser with a MinifyUnparser,
+    adding calls and time of each visitor to profile"""
+    module: ast.Module = ast.parse(source)
+
+    if skip_config is not None:
+        skipper = AstNodeSkipper(skip_config)
+        profile.instrument(skipper)
+        module = skipper.visit(module)
+        # The skipper's own tokens, which instrumenting replaced
+        profile.add_token_lookups(skipper.tokens_to_skip_config)
+
+    unparser = MinifyUnparser()
+    profile.instrument(unparser)
+
+    return unparser.visit(module)
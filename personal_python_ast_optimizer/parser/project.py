@@ -0,0 +1,623 @@
+import ast
+import copy
+import fnmatch
+import os
+import sys
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterable
+
+from personal_python_ast_optimizer.parser.cache import (
+    CachedMinify,
+    MinifyCache,
+    get_config_fingerprint,
+)
+from personal_python_ast_optimizer.parser.config import SkipConfig, SkipUsage
+from personal_python_ast_optimizer.parser.enums import (
+    get_enum_members,
+    get_enums_read_otherwise,
+    get_exported_names,
+    get_member_constants,
+    get_private_enum_members,
+    is_exported,
+)
+from personal_python_ast_optimizer.parser.lazy_imports import get_bound_name
+from personal_python_ast_optimizer.parser.minifier import MinifyUnparser
+from personal_python_ast_optimizer.parser.run import (
+    run_fused_minify_parser,
+    run_minify_parser,
+)
+from personal_python_ast_optimizer.parser.shaking import TreeShaker, resolve_import_from
+from personal_python_ast_optimizer.parser.skipper import AstNodeSkipper
+from personal_python_ast_optimizer.parser.utils import get_dotted_name, get_node_name
+
+
+class MinifyResult:
+    """Outcome of minifying one file of a project"""
+
+    __slots__ = (
+        "source_path",
+        "output_path",
+        "module_name",
+        "error",
+        "warnings",
+        "from_cache",
+        "skip_usage",
+    )
+
+    def __init__(
+        self,
+        source_path: str,
+        output_path: str,
+        module_name: str,
+        error: str = "",
+        warnings: list[str] | None = None,
+    ) -> None:
+        self.source_path: str = source_path
+        self.output_path: str = output_path
+        self.module_name: str = module_name
+        self.error: str = error
+        self.warnings: list[str] = [] if warnings is None else warnings
+        self.from_cache: bool = False
+        # Tokens to skip found in the file
+        self.skip_usage: SkipUsage = SkipUsage()
+
+    def succeeded(self) -> bool:
+        return self.error == ""
+
+
+class _MinifyTask:
+    """A file to minify, sent to worker processes"""
+
+    __slots__ = (
+        "source_path",
+        "output_path",
+        "module_name",
+        "encoding",
+        "fused",
+        "definitions_to_skip",
+        "constant_vars_to_fold",
+        "imports_to_keep",
+        "record_warnings",
+    )
+
+    def __init__(
+        self,
+        source_path: str,
+        output_path: str,
+        module_name: str,
+        encoding: str,
+        fused: bool,
+    ) -> None:
+        self.source_path: str = source_path
+        self.output_path: str = output_path
+        self.module_name: str = module_name
+        self.encoding: str = encoding
+        self.fused: bool = fused
+        self.definitions_to_skip: set[str] = set()
+        # Members of enums, see _add_enum_constants
+        self.constant_vars_to_fold: dict[str, int | str] = {}
+        self.imports_to_keep: set[str] = set()
+        # Warnings are captured process wide, which other threads would see
+        self.record_warnings: bool = True
+
+
+def is_free_threaded() -> bool:
+    """Returns if threads can run python code at the same time,
+    which needs a free threaded build of 3.13+ run without the GIL"""
+    is_gil_enabled: Callable[[], bool] | None = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def minify_project(
+    source_dir: str,
+    output_dir: str,
+    skip_config: SkipConfig | None = None,
+    max_workers: int | None = None,
+    encoding: str = "utf-8",
+    cache: MinifyCache | None = None,
+    fused: bool = False,
+    entry_points: Iterable[str] | None = None,
+    keep: Iterable[str] = (),
+    use_threads: bool | None = None,
+) -> list[MinifyResult]:
+    """Minifies every .py file under source_dir into the same relative path
+    under output_dir and returns a result per file, sorted by source path.
+
+    skip_config: copied for each file with module_name set to the file's
+        module, relative to source_dir
+    max_workers: size of the pool, defaults to the number of cores.
+        1 runs every file in this thread
+    cache: unchanged files are read from it and the rest are added to it.
+        It is pruned to its max size after all files are done
+    fused: skip nodes while unparsing instead of in a separate pass
+    entry_points: names of modules run or imported from outside the project,
+        whose names are all kept. If provided, top level definitions nothing
+        reaches from them are removed, see parser.shaking.TreeShaker
+    keep: patterns of "module.name" to never remove since they are
+        reached in ways that can't be seen, like "app.plugins.*"
+    use_threads: minify in a thread pool instead of a process pool, which
+        skips sending files and results between processes. Defaults to
+        whether this is a free threaded build running without the GIL,
+        since otherwise threads minify one at a time. Warnings raised while
+        minifying, like a SyntaxWarning from parsing, are not recorded in
+        results from threads since warnings are captured process wide
+
+    If skip_config has lazy_imports, imports other modules of the project
+    read from a module are left in place, see _add_imports_to_keep. If it
+    has fold_enums, enums are folded across modules, see _add_enum_constants
+
+    A file that fails to minify is reported in its result and not written;
+    the rest of the project is still processed. Tokens to skip are warned
+    about once if no file has them, instead of for each file without them"""
+    tasks: list[_MinifyTask] = _get_tasks(source_dir, output_dir, encoding, fused)
+
+    if entry_points is not None:
+        _add_definitions_to_skip(tasks, entry_points, keep)
+    if skip_config is not None and skip_config.extras_to_skip_config.fold_enums:
+        _add_enum_constants(
+            tasks, skip_config.target_python_version, entry_points, keep
+        )
+    if skip_config is not None and skip_config.extras_to_skip_config.lazy_imports:
+        _add_imports_to_keep(tasks)
+
+    # Largest files first so one big module is not left running alone at the end
+    tasks.sort(key=lambda task: os.path.getsize(task.source_path), reverse=True)
+
+    if use_threads is None:
+        use_threads = is_free_threaded()
+
+    results: list[MinifyResult]
+    if max_workers == 1 or len(tasks) <= 1:
+        results = [_minify_file(task, skip_config, cache) for task in tasks]
+    elif use_threads:
+        for task in tasks:
+            task.record_warnings = False
+
+        # Each thread makes its own skipper and unparser for each file
+        # and skip_config is only read, so nothing is shared but the cache
+        with ThreadPoolExecutor(max_workers or os.cpu_count()) as executor:
+            results = list(
+                executor.map(lambda task: _minify_file(task, skip_config, cache), tasks)
+            )
+    else:
+        with ProcessPoolExecutor(
+            max_workers, initializer=_init_worker, initargs=(skip_config, cache)
+        ) as executor:
+            results = list(executor.map(_minify_file_in_worker, tasks))
+
+    if cache is not None:
+        cache.prune()
+
+    results.sort(key=lambda result: result.source_path)
+
+    for result in results:
+        for message in result.warnings:
+            warnings.warn(message)
+
+    if skip_config is not None:
+        for message in get_not_found_warnings(skip_config, results):
+            warnings.warn(message)
+
+    return results
+
+
+def get_not_found_warnings(
+    skip_config: SkipConfig, results: list[MinifyResult]
+) -> list[str]:
+    """Returns a warning for each type of token to skip that
+    was not found in any of the files of results"""
+    skip_usage = SkipUsage()
+    for result in results:
+        skip_usage.merge(result.skip_usage)
+
+    return [
+        f"requested to skip {token_type} {', '.join(tokens)}"
+        " but was not found in any module"
+        for token_type, tokens in skip_usage.get_not_found_tokens(
+            skip_config.tokens_to_skip_config
+        ).items()
+    ]
+
+
+def get_module_name(path: str, root_dir: str) -> str:
+    """Returns dotted module name of a .py file relative to root_dir"""
+    relative_path: str = os.path.splitext(os.path.relpath(path, root_dir))[0]
+    parts: list[str] = relative_path.split(os.sep)
+    if parts[-1] == "__init__":
+        parts.pop()
+
+    return ".".join(parts)
+
+
+def _get_tasks(
+    source_dir: str, output_dir: str, encoding: str, fused: bool
+) -> list[_MinifyTask]:
+    output_dir = os.path.abspath(output_dir)
+    tasks: list[_MinifyTask] = []
+
+    for dir_path, dir_names, file_names in os.walk(source_dir):
+        # Output may be nested in the source, don't minify it again
+        dir_names[:] = [
+            name
+            for name in dir_names
+            if os.path.abspath(os.path.join(dir_path, name)) != output_dir
+        ]
+
+        for file_name in file_names:
+            if not file_name.endswith(".py"):
+                continue
+
+            source_path: str = os.path.join(dir_path, file_name)
+            output_path: str = os.path.join(
+                output_dir, os.path.relpath(source_path, source_dir)
+            )
+            tasks.append(
+                _MinifyTask(
+                    source_path,
+                    output_path,
+                    get_module_name(source_path, source_dir),
+                    encoding,
+                    fused,
+                )
+            )
+
+    return tasks
+
+
+def _add_definitions_to_skip(
+    tasks: list[_MinifyTask], entry_points: Iterable[str], keep: Iterable[str]
+) -> None:
+    """Sets definitions nothing reaches on each task"""
+    tree_shaker = TreeShaker()
+    for task in tasks:
+        module: ast.Module | None = _parse_task(task)
+        if module is not None:
+            tree_shaker.add_module(task.module_name, module, _is_package(task))
+
+    unreachable_definitions: dict[str, set[str]] = (
+        tree_shaker.find_unreachable_definitions(entry_points, keep)
+    )
+    for task in tasks:
+        task.definitions_to_skip = unreachable_definitions.get(task.module_name, set())
+
+
+def _add_enum_constants(
+    tasks: list[_MinifyTask],
+    target_python_version: tuple[int, int] | None,
+    entry_points: Iterable[str] | None,
+    keep: Iterable[str],
+) -> None:
+    """Sets members of enums each task reads as constants to fold, and adds
+    the enums and from imports of them to definitions to skip, see parser.enums.
+    Enums are only folded if every module of the project just reads their
+    members, through imports that can be followed. Names outside the project
+    may import are kept, which are those of entry points, or of every module
+    if there are none, that are public and not left out of __all__. Imported
+    names are only taken as exported if in __all__, or from a package"""
+    modules: dict[_MinifyTask, ast.Module] = {}
+    for task in tasks:
+        module: ast.Module | None = _parse_task(task)
+        # What a file that can't be parsed reads is unknown
+        if module is None:
+            return
+        modules[task] = module
+
+    entry_point_names: set[str] | None = (
+        None if entry_points is None else set(entry_points)
+    )
+    public_tasks: set[_MinifyTask] = {
+        task
+        for task in tasks
+        if entry_point_names is None or task.module_name in entry_point_names
+    }
+
+    # Members of enums that may be folded by module and class name
+    enums: dict[str, dict[str, dict[str, int | str]]] = {}
+    for task, module in modules.items():
+        enums[task.module_name] = {
+            name: members
+            for name, members in (
+                get_private_enum_members(module, target_python_version)
+                if task in public_tasks
+                else get_enum_members(module, target_python_version)
+            ).items()
+            if not any(
+                fnmatch.fnmatchcase(f"{task.module_name}.{name}", pattern)
+                for pattern in keep
+            )
+        }
+    enum_keys: set[tuple[str, str]] = {
+        (module_name, name) for module_name, names in enums.items() for name in names
+    }
+    enum_names: set[str] = {name for _, name in enum_keys}
+    if not enum_names:
+        return
+
+    unfoldable: set[tuple[str, str]] = set()
+    # Names or dotted names each module reads enums as, and names its
+    # from imports bind them to, with the module and name of the enum
+    paths: dict[_MinifyTask, dict[str, tuple[str, str]]] = {}
+    imported_names: dict[_MinifyTask, dict[str, tuple[str, str]]] = {}
+
+    for task, module in modules.items():
+        module_paths: dict[str, tuple[str, str]] = {
+            name: (task.module_name, name) for name in enums[task.module_name]
+        }
+        module_imported_names: dict[str, tuple[str, str]] = {}
+        exported_names: set[str] | None = get_exported_names(module)
+        package: str = (
+            task.module_name
+            if _is_package(task)
+            else task.module_name.rpartition(".")[0]
+        )
+
+        for node in ast.walk(module):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    bound_path: str = alias.asname or alias.name
+                    for name in enums.get(alias.name, ()):
+                        module_paths[f"{bound_path}.{name}"] = (alias.name, name)
+            elif isinstance(node, ast.ImportFrom):
+                from_module: str = resolve_import_from(node, package)
+                from_enums: dict[str, dict[str, int | str]] = enums.get(from_module, {})
+                for alias in node.names:
+                    if alias.name == "*":
+                        unfoldable.update((from_module, name) for name in from_enums)
+                        continue
+
+                    bound_name: str = get_bound_name(alias)
+                    if alias.name in from_enums:
+                        key: tuple[str, str] = (from_module, alias.name)
+                        module_paths[bound_name] = key
+                        # Only top level imports are removed, and
+                        # names a module exports are kept
+                        if node in module.body and not (
+                            task in public_tasks
+                            and (exported_names is not None or _is_package(task))
+                            and is_exported(bound_name, exported_names)
+                        ):
+                            module_imported_names[bound_name] = key
+                        else:
+                            unfoldable.add(key)
+                    elif alias.name in enum_names:
+                        # Imported from a module that imported it, which
+                        # could be any enum of this name
+                        unfoldable.update(
+                            key for key in enum_keys if key[1] == alias.name
+                        )
+
+                    submodule: str = f"{from_module}.{alias.name}"
+                    for name in enums.get(submodule, ()):
+                        module_paths[f"{bound_name}.{name}"] = (submodule, name)
+
+        for node in ast.walk(module):
+            if (
+                isinstance(node, (ast.Name, ast.Attribute))
+                and get_node_name(node) in enum_names
+                and get_dotted_name(node) not in module_paths
+            ):
+                unfoldable.update(
+                    key for key in enum_keys if key[1] == get_node_name(node)
+                )
+
+        read_otherwise: set[str] = get_enums_read_otherwise(
+            module,
+            {
+                path: enums[module_name][name]
+                for path, (module_name, name) in module_paths.items()
+            },
+        )
+        unfoldable.update(module_paths[path] for path in read_otherwise)
+
+        paths[task] = module_paths
+        imported_names[task] = module_imported_names
+
+    for task in modules:
+        for path, (module_name, name) in paths[task].items():
+            if (module_name, name) not in unfoldable:
+                task.constant_vars_to_fold.update(
+                    get_member_constants(path, enums[module_name][name])
+                )
+
+        task.definitions_to_skip = task.definitions_to_skip | {
+            name for name, key in imported_names[task].items() if key not in unfoldable
+        }
+        task.definitions_to_skip.update(
+            name
+            for name in enums[task.module_name]
+            if (task.module_name, name) not in unfoldable
+        )
+
+
+def _add_imports_to_keep(tasks: list[_MinifyTask]) -> None:
+    """Sets names bound by top level imports of each task that other modules
+    may read from it, either as an attribute or with a from import. Names are
+    matched no matter which module they are read from, which keeps more than
+    needed but never misses a module bound to another name"""
+    imported_names: dict[_MinifyTask, set[str]] = {}
+    read_names: set[str] = set()
+    star_imported_modules: set[str] = set()
+
+    for task in tasks:
+        module: ast.Module | None = _parse_task(task)
+        if module is None:
+            continue
+
+        imported_names[task] = {
+            get_bound_name(alias)
+            for statement in module.body
+            if isinstance(statement, (ast.Import, ast.ImportFrom))
+            for alias in statement.names
+        }
+
+        package: str = (
+            task.module_name
+            if _is_package(task)
+            else task.module_name.rpartition(".")[0]
+        )
+        for node in ast.walk(module):
+            if isinstance(node, ast.Attribute):
+                read_names.add(node.attr)
+            elif isinstance(node, ast.ImportFrom):
+                for alias in node.names:
+                    if alias.name == "*":
+                        star_imported_modules.add(resolve_import_from(node, package))
+                    else:
+                        read_names.add(alias.name)
+
+    for task, names in imported_names.items():
+        task.imports_to_keep = (
+            names if task.module_name in star_imported_modules else names & read_names
+        )
+
+
+def _parse_task(task: _MinifyTask) -> ast.Module | None:
+    """Files that can't be read or parsed are None, they fail when minified"""
+    try:
+        with open(task.source_path, "r", encoding=task.encoding) as fp:
+            return ast.parse(fp.read())
+    except (OSError, SyntaxError, UnicodeDecodeError, ValueError):
+        return None
+
+
+def _is_package(task: _MinifyTask) -> bool:
+    return os.path.basename(task.source_path) == "__init__.py"
+
+
+_worker_skip_config: SkipConfig | None = None
+_worker_cache: MinifyCache | None = None
+
+
+def _init_worker(skip_config: SkipConfig | None, cache: MinifyCache | None) -> None:
+    """Receives the config once per worker process instead of once per file"""
+    global _worker_skip_config, _worker_cache
+    _worker_skip_config = skip_config
+    _worker_cache = cache
+
+
+def _minify_file_in_worker(task: _MinifyTask) -> MinifyResult:
+    return _minify_file(task, _worker_skip_config, _worker_cache)
+
+
+def _minify_file(
+    task: _MinifyTask, skip_config: SkipConfig | None, cache: MinifyCache | None
+) -> MinifyResult:
+    result = MinifyResult(task.source_path, task.output_path, task.module_name)
+
+    module_skip_config: SkipConfig | None = None
+    if skip_config is not None:
+        # Copied so each module gets its own name
+        module_skip_config = copy.copy(skip_config)
+        module_skip_config.module_name = task.module_name
+    # Without a config only definitions and imports they alone used are
+    # skipped, the rest is unparsed as is like files without definitions to skip
+    shaking_only: bool = skip_config is None and bool(task.definitions_to_skip)
+    if task.definitions_to_skip:
+        if module_skip_config is None:
+            module_skip_config = SkipConfig(task.module_name)
+        module_skip_config.definitions_to_skip = task.definitions_to_skip
+    if module_skip_config is not None and task.constant_vars_to_fold:
+        module_skip_config.constant_vars_to_fold = {
+            **module_skip_config.constant_vars_to_fold,
+            **task.constant_vars_to_fold,
+        }
+    if module_skip_config is not None and (
+        module_skip_config.extras_to_skip_config.fold_enums
+    ):
+        # Enums were already found across the project
+        module_skip_config.extras_to_skip_config = copy.copy(
+            module_skip_config.extras_to_skip_config
+        )
+        module_skip_config.extras_to_skip_config.fold_enums = False
+    if module_skip_config is not None and task.imports_to_keep:
+        module_skip_config.imports_to_keep = task.imports_to_keep
+
+    try:
+        with open(task.source_path, "r", encoding=task.encoding) as fp:
+            source: str = fp.read()
+
+        cache_key: str = ""
+        cached_minify: CachedMinify | None = None
+        if cache is not None:
+            config_fingerprint: str = get_config_fingerprint(module_skip_config)
+            cache_key = cache.get_key(
+                source,
+                f"shaking:{config_fingerprint}" if shaking_only else config_fingerprint,
+            )
+            cached_minify = cache.get(cache_key)
+
+        if cached_minify is None:
+            cached_minify = _run_minify_parser(
+                source,
+                module_skip_config,
+                task.fused,
+                task.record_warnings,
+                shaking_only,
+            )
+            if cache is not None:
+                cache.put(cache_key, cached_minify)
+        else:
+            result.from_cache = True
+
+        result.warnings = cached_minify.warnings
+        result.skip_usage = cached_minify.skip_usage
+
+        os.makedirs(os.path.dirname(task.output_path), exist_ok=True)
+        with open(task.output_path, "w", encoding=task.encoding) as fp:
+            fp.write(cached_minify.source)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+
+    return result
+
+
+def _run_minify_parser(
+    source: str,
+    skip_config: SkipConfig | None,
+    fused: bool,
+    record_warnings: bool,
+    shaking_only: bool = False,
+) -> CachedMinify:
+    """Minifies source, recording warnings instead of raising them
+    if record_warnings is set"""
+    skip_usage = SkipUsage()
+    if not record_warnings:
+        return CachedMinify(
+            _minify_source(source, skip_config, fused, skip_usage, shaking_only),
+            [],
+            skip_usage,
+        )
+
+    with warnings.catch_warnings(record=True) as caught_warnings:
+        warnings.simplefilter("always")
+        minified_source: str = _minify_source(
+            source, skip_config, fused, skip_usage, shaking_only
+        )
+
+    return CachedMinify(
+        minified_source,
+        [str(warning.message) for warning in caught_warnings],
+        skip_usage,
+    )
+
+
+def _minify_source(
+    source: str,
+    skip_config: SkipConfig | None,
+    fused: bool,
+    skip_usage: SkipUsage,
+    shaking_only: bool = False,
+) -> str:
+    if shaking_only and skip_config is not None:
+        module: ast.Module = ast.parse(source)
+        skipper = AstNodeSkipper(skip_config, skip_usage)
+        skipper.skip_definitions(module)
+        skipper.remove_pruned_imports(module)
+        return MinifyUnparser().visit(module)
+
+    return (
+        run_fused_minify_parser(source, skip_config, skip_usage)
+        if fused
+        else run_minify_parser(MinifyUnparser(), source, skip_config, skip_usage)
+    )
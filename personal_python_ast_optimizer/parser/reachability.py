@@ -0,0 +1,92 @@
+"""Finds statements that can never run since a statement before them
+never finishes, like return or an if whose branches both raise"""
+
+import ast
+from typing import Callable
+
+from personal_python_ast_optimizer.parser.utils import is_name_equals_main_node
+
+# Returns if a test is always truthy or always falsy, or None if not known
+GetTruth = Callable[[ast.expr], bool | None]
+
+_TERMINATING_NODES: tuple[type, ...] = (ast.Return, ast.Raise, ast.Break, ast.Continue)
+_SCOPE_NODES: tuple[type, ...] = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def get_reachable_length(body: list[ast.stmt], get_truth: GetTruth) -> int:
+    """Returns how many statements at the start of body can run"""
+    for index, node in enumerate(body):
+        if never_finishes(node, get_truth):
+            return index + 1
+
+    return len(body)
+
+
+def never_finishes(node: ast.stmt, get_truth: GetTruth) -> bool:
+    """Returns True if running node never continues to the next statement"""
+    if isinstance(node, _TERMINATING_NODES):
+        return True
+
+    if isinstance(node, ast.If):
+        if is_name_equals_main_node(node.test):
+            # Removed when skipping, whatever its branches do
+            return False
+        test: bool | None = get_truth(node.test)
+        if test is None:
+            return body_never_finishes(node.body, get_truth) and body_never_finishes(
+                node.orelse, get_truth
+            )
+        return body_never_finishes(node.body if test else node.orelse, get_truth)
+
+    if isinstance(node, ast.While):
+        test = get_truth(node.test)
+        if test is None:
+            return False
+        if test:
+            return not _has_break(node.body, get_truth)
+        return body_never_finishes(node.orelse, get_truth)
+
+    if isinstance(node, ast.Try):
+        if body_never_finishes(node.finalbody, get_truth):
+            return True
+        # Else is skipped when the body never finishes
+        return body_never_finishes(node.body, get_truth) and all(
+            body_never_finishes(handler.body, get_truth) for handler in node.handlers
+        )
+
+    return False
+
+
+def body_never_finishes(body: list[ast.stmt], get_truth: GetTruth) -> bool:
+    """Returns True if running body never continues past its end"""
+    return any(never_finishes(node, get_truth) for node in body)
+
+
+def _has_break(nodes: list, get_truth: GetTruth) -> bool:
+    """Returns True if nodes may break out of the loop they are in"""
+    for node in nodes:
+        if isinstance(node, ast.Break):
+            return True
+        if isinstance(node, _SCOPE_NODES):
+            continue
+
+        children: list
+        if isinstance(node, ast.If):
+            test: bool | None = get_truth(node.test)
+            children = (node.body if test is not False else []) + (
+                node.orelse if test is not True else []
+            )
+        elif isinstance(node, (ast.For, ast.AsyncFor, ast.While)):
+            # Breaks in a loop's body end that loop, but not those in its else
+            children = node.orelse
+        else:
+            children = [
+                child
+                for child in ast.iter_child_nodes(node)
+                if isinstance(child, (ast.stmt, ast.excepthandler, ast.match_case))
+            ]
+
+        if _has_break(children, get_truth):
+            return True
+
+    return False
@@ -0,0 +1,196 @@
+"""Finds subtrees that skipping can't change under a config,
+so skippers can leave them as is without visiting them"""
+
+import ast
+import re
+from typing import Iterable
+
+from personal_python_ast_optimizer.parser.config import SkipConfig
+
+# Nodes constant folding may replace or use the truth of
+_FOLDABLE_NODES: tuple[type, ...] = (
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.Compare,
+    ast.BoolOp,
+    ast.IfExp,
+    ast.JoinedStr,
+    ast.If,
+    ast.While,
+)
+
+# Nodes that can make statements after them unreachable
+_TERMINATING_NODES: tuple[type, ...] = (
+    ast.Return,
+    ast.Raise,
+    ast.Break,
+    ast.Continue,
+    ast.While,
+)
+
+# Names of typing whose uses are removed with type hints
+_TYPING_NAMES: frozenset[str] = frozenset(("TYPE_CHECKING", "cast", "overload"))
+
+# Methods of loggers that log, see ExtrasToSkipConfig.skip_logging_below
+_LOGGING_METHODS: frozenset[str] = frozenset(
+    (
+        "debug",
+        "info",
+        "warning",
+        "warn",
+        "error",
+        "exception",
+        "critical",
+        "fatal",
+        "log",
+    )
+)
+
+# Nodes changed when a target python version is known
+_VERSION_NODES: tuple[type, ...] = (ast.ClassDef, ast.ImportFrom, ast.Try)
+
+# Fields of nodes holding a name a skipper may look up
+_NAME_FIELDS: dict[type, str] = {
+    ast.Name: "id",
+    ast.Attribute: "attr",
+    ast.alias: "name",
+    ast.FunctionDef: "name",
+    ast.AsyncFunctionDef: "name",
+    ast.ClassDef: "name",
+}
+
+# Nodes with nothing to skip, which are not worth scanning
+_IGNORED_NODES: tuple[type, ...] = (
+    ast.expr_context,
+    ast.operator,
+    ast.boolop,
+    ast.unaryop,
+    ast.cmpop,
+)
+
+
+class RelevanceIndex:
+    """Node types and identifiers a skipper may act on under a config.
+    A subtree with none of them is left the same by skipping"""
+
+    __slots__ = (
+        "_node_types",
+        "_identifiers",
+        "_patterns",
+        "_skip_dangling_expressions",
+        "_skip_type_hints",
+    )
+
+    def __init__(self, config: SkipConfig) -> None:
+        extras_to_skip_config = config.extras_to_skip_config
+
+        node_types: set[type] = set()
+        if extras_to_skip_config.skip_type_hints:
+            node_types.add(ast.AnnAssign)
+        if extras_to_skip_config.skip_return_none:
+            node_types.add(ast.Return)
+        if extras_to_skip_config.skip_constant_expressions:
+            node_types.update(_FOLDABLE_NODES)
+        if extras_to_skip_config.skip_unreachable_code:
+            node_types.update(_TERMINATING_NODES)
+        if extras_to_skip_config.skip_asserts:
+            node_types.add(ast.Assert)
+        if config.target_python_version is not None:
+            node_types.update(_VERSION_NODES)
+        self._node_types: frozenset[type] = frozenset(node_types)
+
+        # if __name__ == "__main__" is always removed
+        identifiers: set[str] = {"__name__"}
+        for name in config.constant_vars_to_fold:
+            # Dotted names only match nodes named their last part
+            identifiers.add(name.rpartition(".")[2])
+        if config.target_debug is not None:
+            identifiers.add("__debug__")
+        if extras_to_skip_config.skip_logging_below is not None:
+            identifiers.update(_LOGGING_METHODS)
+        if extras_to_skip_config.skip_type_hints:
+            identifiers.update(_TYPING_NAMES)
+        if extras_to_skip_config.expand_dataclasses:
+            identifiers.add("dataclass")
+        patterns: list[re.Pattern] = []
+        for tokens_to_skip in config.tokens_to_skip_config:
+            for token in tokens_to_skip:
+                # Dotted names only match nodes named their last part
+                identifiers.add(token)
+                identifiers.add(token.rpartition(".")[2])
+            if tokens_to_skip.pattern is not None:
+                patterns.append(tokens_to_skip.pattern)
+        self._identifiers: frozenset[str] = frozenset(identifiers)
+        self._patterns: tuple[re.Pattern, ...] = tuple(patterns)
+
+        self._skip_dangling_expressions: bool = (
+            extras_to_skip_config.skip_dangling_expressions
+        )
+        self._skip_type_hints: bool = extras_to_skip_config.skip_type_hints
+
+    def add_identifiers(self, identifiers: Iterable[str]) -> None:
+        """Adds identifiers found in a module, like names of its constants"""
+        self._identifiers = self._identifiers.union(identifiers)
+
+    def find_irrelevant_nodes(self, node: ast.AST) -> set[ast.AST]:
+        """Returns the largest subtrees under node that skipping can't change"""
+        irrelevant_nodes: set[ast.AST] = set()
+        for child in ast.iter_child_nodes(node):
+            if not isinstance(child, _IGNORED_NODES) and not self._scan(
+                child, irrelevant_nodes
+            ):
+                irrelevant_nodes.add(child)
+
+        return irrelevant_nodes
+
+    def _scan(self, node: ast.AST, irrelevant_nodes: set[ast.AST]) -> bool:
+        """Returns if node or a descendant is relevant, adding irrelevant
+        children to irrelevant_nodes when it is"""
+        is_relevant: bool = self._is_relevant(node)
+        irrelevant_children: list[ast.AST] = []
+
+        # Same as ast.iter_child_nodes, which is slow enough to matter here
+        for field in node._fields:
+            value = getattr(node, field, None)
+            children: list = value if isinstance(value, list) else [value]
+            for child in children:
+                if not isinstance(child, ast.AST) or isinstance(child, _IGNORED_NODES):
+                    continue
+                if self._scan(child, irrelevant_nodes):
+                    is_relevant = True
+                else:
+                    irrelevant_children.append(child)
+
+        if is_relevant:
+            irrelevant_nodes.update(irrelevant_children)
+
+        return is_relevant
+
+    def _is_relevant(self, node: ast.AST) -> bool:
+        node_type: type = type(node)
+        if node_type in self._node_types:
+            return True
+
+        name_field: str | None = _NAME_FIELDS.get(node_type)
+        if name_field is not None and self._is_identifier(getattr(node, name_field)):
+            return True
+
+        if isinstance(node, ast.Constant):
+            return isinstance(node.value, str) and self._is_identifier(node.value)
+        if isinstance(node, ast.ImportFrom):
+            return self._is_identifier(node.module or "")
+        if isinstance(node, ast.Expr):
+            return self._skip_dangling_expressions and isinstance(
+                node.value, ast.Constant
+            )
+        if isinstance(node, ast.arg):
+            return self._skip_type_hints and node.annotation is not None
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            return self._skip_type_hints and node.returns is not None
+
+        return False
+
+    def _is_identifier(self, name: str) -> bool:
+        return name in self._identifiers or any(
+            pattern.fullmatch(name) for pattern in self._patterns
+        )
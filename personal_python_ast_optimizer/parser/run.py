@@ -1,16 +1,104 @@
 import ast
+import os
+from py_compile import PycInvalidationMode
+from typing import TextIO
 
-from personal_python_ast_optimizer.parser.config import SkipConfig
+from personal_python_ast_optimizer.parser.bytecode import (
+    check_target_python_version,
+    compile_to_pyc,
+    write_pyc,
+)
+from personal_python_ast_optimizer.parser.config import SkipConfig, SkipUsage
+from personal_python_ast_optimizer.parser.fused import FusedMinifyUnparser
 from personal_python_ast_optimizer.parser.minifier import MinifyUnparser
 from personal_python_ast_optimizer.parser.skipper import AstNodeSkipper
 
 
 def run_minify_parser(
-    parser: MinifyUnparser, source: str, skip_config: SkipConfig | None = None
+    parser: MinifyUnparser,
+    source: str,
+    skip_config: SkipConfig | None = None,
+    skip_usage: SkipUsage | None = None,
 ) -> str:
+    """skip_usage: tokens found are added to it instead of warning
+    about those not found, see AstNodeSkipper"""
     module: ast.Module = ast.parse(source)
 
     if skip_config is not None:
-        module = AstNodeSkipper(skip_config).visit(module)
+        module = AstNodeSkipper(skip_config, skip_usage).visit(module)
 
     return parser.visit(module)
+
+
+def run_minify_parser_to_stream(
+    parser: MinifyUnparser,
+    source: str,
+    stream: TextIO,
+    skip_config: SkipConfig | None = None,
+) -> None:
+    """Same as run_minify_parser, but output is written to stream
+    as it is unparsed instead of returned"""
+    module: ast.Module = ast.parse(source)
+
+    if skip_config is not None:
+        module = AstNodeSkipper(skip_config).visit(module)
+
+    parser.visit_to_stream(module, stream)
+
+
+def run_minify_parser_to_pyc(
+    source: str,
+    pyc_path: str,
+    skip_config: SkipConfig | None = None,
+    source_path: str | None = None,
+    invalidation_mode: PycInvalidationMode | None = None,
+    minified_path: str | None = None,
+) -> None:
+    """Compiles source, after skipping as configured, to a pyc at pyc_path
+    without unparsing and parsing it again. Line numbers in the bytecode are
+    those of source.
+
+    If minified_path is given, minified source is also written there and the
+    pyc is checked against it on import. Otherwise the pyc is checked against
+    the file at source_path, or can only be imported without a source file"""
+    module: ast.Module = ast.parse(source)
+
+    if skip_config is not None:
+        check_target_python_version(skip_config.target_python_version)
+        module = AstNodeSkipper(skip_config).visit(module)
+
+    if minified_path is not None:
+        with open(minified_path, "w", encoding="utf-8") as fp:
+            MinifyUnparser().visit_to_stream(module, fp)
+
+    checked_path: str | None = minified_path or source_path
+    source_bytes: bytes
+    source_mtime: float
+    if checked_path is not None:
+        with open(checked_path, "rb") as fp:
+            source_bytes = fp.read()
+        source_mtime = os.stat(checked_path).st_mtime
+    else:
+        source_bytes = source.encode("utf-8")
+        source_mtime = 0
+
+    pyc: bytes = compile_to_pyc(
+        module,
+        source_path or checked_path or "<unknown>",
+        source_bytes,
+        source_mtime,
+        invalidation_mode,
+    )
+    write_pyc(pyc_path, pyc)
+
+
+def run_fused_minify_parser(
+    source: str,
+    skip_config: SkipConfig | None = None,
+    skip_usage: SkipUsage | None = None,
+) -> str:
+    """Same output as run_minify_parser with a MinifyUnparser, but nodes are
+    skipped while being unparsed instead of in a separate pass over the tree"""
+    module: ast.Module = ast.parse(source)
+
+    return FusedMinifyUnparser(skip_config, skip_usage).visit(module)
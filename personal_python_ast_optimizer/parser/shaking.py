@@ -0,0 +1,477 @@
+"""Finds top level functions, classes, and assignments of a project that
+nothing reaches from its entry points, so they can be skipped.
+
+A module is reached when it is imported by reached code, which runs its top
+level statements other than definitions. A definition is reached when reached
+code reads its name, directly, through an import, or as an attribute of an
+imported module. Code that can't be seen, like getattr with a computed name
+or a registry filled by __init_subclass__, needs its names kept explicitly"""
+
+import ast
+import fnmatch
+from typing import Iterable, Iterator
+
+from personal_python_ast_optimizer.parser.utils import get_node_name
+
+# Reading any of these lets a module reach any of its own names
+_DYNAMIC_NAMES: frozenset[str] = frozenset(("eval", "exec", "globals", "vars"))
+
+# Decorators that only wrap or describe what they decorate
+_PURE_DECORATORS: frozenset[str] = frozenset(
+    (
+        "abstractmethod",
+        "cache",
+        "cached_property",
+        "classmethod",
+        "contextmanager",
+        "asynccontextmanager",
+        "dataclass",
+        "final",
+        "lru_cache",
+        "overload",
+        "override",
+        "property",
+        "staticmethod",
+        "total_ordering",
+        "wraps",
+    )
+)
+
+_EFFECT_NODES: tuple[type, ...] = (
+    ast.Call,
+    ast.Await,
+    ast.Yield,
+    ast.YieldFrom,
+    ast.NamedExpr,
+)
+
+# (module name, attribute name or None for the module itself)
+_ImportTarget = tuple[str, str | None]
+
+
+class _ModuleInfo:
+    """Top level statements of a module, split into definitions that can be
+    removed and statements that run whenever the module is imported"""
+
+    __slots__ = (
+        "name",
+        "package",
+        "definitions",
+        "roots",
+        "bindings",
+        "star_imports",
+        "is_dynamic",
+    )
+
+    def __init__(self, name: str, module: ast.Module, is_package: bool) -> None:
+        self.name: str = name
+        # Package relative imports in the module are resolved against
+        self.package: str = name if is_package else name.rpartition(".")[0]
+        self.definitions: dict[str, list[ast.stmt]] = {}
+        self.roots: list[ast.stmt] = []
+        # What each name bound by an import anywhere in the module refers to
+        self.bindings: dict[str, list[_ImportTarget]] = {}
+        self.star_imports: list[str] = []
+        self.is_dynamic: bool = False
+
+        for statement in module.body:
+            defined_names: list[str] | None = get_defined_names(statement)
+            if defined_names is None:
+                self.roots.append(statement)
+            else:
+                for defined_name in defined_names:
+                    self.definitions.setdefault(defined_name, []).append(statement)
+
+        for node in ast.walk(module):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.asname is None:
+                        top_name: str = alias.name.split(".")[0]
+                        self._bind(top_name, (top_name, None))
+                    else:
+                        self._bind(alias.asname, (alias.name, None))
+
+            elif isinstance(node, ast.ImportFrom):
+                from_module: str = resolve_import_from(node, self.package)
+                for alias in node.names:
+                    if alias.name == "*":
+                        self.star_imports.append(from_module)
+                    else:
+                        self._bind(
+                            alias.asname or alias.name, (from_module, alias.name)
+                        )
+
+            elif isinstance(node, ast.Name) and node.id in _DYNAMIC_NAMES:
+                self.is_dynamic = True
+
+    def _bind(self, name: str, target: _ImportTarget) -> None:
+        self.bindings.setdefault(name, []).append(target)
+
+
+class TreeShaker:
+    """Finds definitions of added modules that nothing reaches
+    from entry point modules"""
+
+    __slots__ = (
+        "_modules",
+        "_reached_modules",
+        "_reached_names",
+        "_escaped_modules",
+        "_to_visit",
+    )
+
+    def __init__(self) -> None:
+        self._modules: dict[str, _ModuleInfo] = {}
+
+        self._reached_modules: set[str] = set()
+        self._reached_names: set[tuple[str, str]] = set()
+        # Modules whose object is used as a value, so any name may be read
+        self._escaped_modules: set[str] = set()
+        self._to_visit: list[tuple[_ModuleInfo, ast.stmt]] = []
+
+    def add_module(
+        self, module_name: str, module: ast.Module, is_package: bool = False
+    ) -> None:
+        """Adds a module of the project. is_package is True for __init__ files"""
+        self._modules[module_name] = _ModuleInfo(module_name, module, is_package)
+
+    def find_unreachable_definitions(
+        self, entry_points: Iterable[str], keep: Iterable[str] = ()
+    ) -> dict[str, set[str]]:
+        """Returns names of top level definitions nothing reaches, by module.
+        Modules that are not reached are left out, since they could be
+        imported in ways that can't be seen, like importlib.import_module.
+
+        entry_points: names of modules that are run or imported by code
+            outside the project, whose names are all kept
+        keep: patterns of "module.name" that are reached by code that can't
+            be seen, matched with fnmatch, like "app.plugins.*"
+        """
+        for entry_point in entry_points:
+            if entry_point not in self._modules:
+                raise ValueError(f"Entry point {entry_point} is not a known module")
+            # Code outside the project may use any of its names
+            self._escape_module(entry_point)
+
+        keep_patterns: list[str] = list(keep)
+        if keep_patterns:
+            for module in self._modules.values():
+                for defined_name in module.definitions:
+                    qualified_name: str = f"{module.name}.{defined_name}"
+                    if any(
+                        fnmatch.fnmatchcase(qualified_name, pattern)
+                        for pattern in keep_patterns
+                    ):
+                        self._reach_name(module, defined_name)
+
+        while self._to_visit:
+            module, node = self._to_visit.pop()
+            self._visit(module, node)
+
+        return {
+            module_name: {
+                defined_name
+                for defined_name in module.definitions
+                if (module_name, defined_name) not in self._reached_names
+            }
+            for module_name, module in self._modules.items()
+            if module_name in self._reached_modules
+        }
+
+    def _reach_module(self, module_name: str) -> None:
+        module: _ModuleInfo | None = self._modules.get(module_name)
+        if module is None or module_name in self._reached_modules:
+            return
+
+        self._reached_modules.add(module_name)
+
+        # Importing a module imports the packages it is in first
+        parent_name: str = module_name.rpartition(".")[0]
+        if parent_name:
+            self._reach_module(parent_name)
+
+        self._to_visit.extend((module, statement) for statement in module.roots)
+
+        for defined_name in module.definitions:
+            # Names like __all__ and __getattr__ are read by python itself
+            if defined_name.startswith("__") and defined_name.endswith("__"):
+                self._reach_name(module, defined_name)
+
+        if module.is_dynamic:
+            self._escape_module(module_name)
+
+    def _escape_module(self, module_name: str) -> None:
+        module: _ModuleInfo | None = self._modules.get(module_name)
+        if module is None or module_name in self._escaped_modules:
+            return
+
+        self._escaped_modules.add(module_name)
+        self._reach_module(module_name)
+
+        for defined_name in module.definitions:
+            self._reach_name(module, defined_name)
+        # Imported names are reached, but not every name of imported modules
+        for target in (t for ts in module.bindings.values() for t in ts):
+            self._reach_import_target(target, False)
+        for star_import in module.star_imports:
+            self._escape_module(star_import)
+
+    def _reach_name(self, module: _ModuleInfo, name: str) -> None:
+        key: tuple[str, str] = (module.name, name)
+        if key in self._reached_names:
+            return
+
+        self._reached_names.add(key)
+        self._reach_module(module.name)
+
+        for statement in module.definitions.get(name, ()):
+            self._to_visit.append((module, statement))
+
+        for target in module.bindings.get(name, ()):
+            self._reach_import_target(target, True)
+
+        if name not in module.definitions and name not in module.bindings:
+            # May be defined by a module imported with *
+            for star_import in module.star_imports:
+                star_module: _ModuleInfo | None = self._modules.get(star_import)
+                if star_module is not None:
+                    self._reach_name(star_module, name)
+
+    def _reach_import_target(self, target: _ImportTarget, is_value: bool) -> None:
+        """Reaches what an imported name refers to. is_value is True
+        when the name is used as a value instead of to get an attribute"""
+        module_name, attr = target
+        self._reach_module(module_name)
+
+        if attr is None:
+            if is_value:
+                self._escape_module(module_name)
+            return
+
+        submodule_name: str = f"{module_name}.{attr}"
+        if submodule_name in self._modules:
+            if is_value:
+                self._escape_module(submodule_name)
+            else:
+                self._reach_module(submodule_name)
+            return
+
+        module: _ModuleInfo | None = self._modules.get(module_name)
+        if module is not None:
+            self._reach_name(module, attr)
+
+    def _reach_attributes(self, target: _ImportTarget, attrs: tuple[str, ...]) -> None:
+        """Reaches a chain of attributes of what an imported name refers to"""
+        module_name, target_attr = target
+        if target_attr is not None:
+            submodule_name: str = f"{module_name}.{target_attr}"
+            if submodule_name not in self._modules:
+                # Attribute of an imported class or value
+                self._reach_import_target(target, False)
+                return
+            module_name = submodule_name
+
+        self._reach_module(module_name)
+        for attr in attrs:
+            submodule_name = f"{module_name}.{attr}"
+            if submodule_name not in self._modules:
+                module: _ModuleInfo | None = self._modules.get(module_name)
+                if module is not None:
+                    self._reach_name(module, attr)
+                return
+
+            self._reach_module(submodule_name)
+            module_name = submodule_name
+
+        # Every attribute was a module, so the last one is used as a value
+        self._escape_module(module_name)
+
+    def _visit(self, module: _ModuleInfo, node: ast.stmt) -> None:
+        names, attributes, imports = _get_references(node, module)
+
+        for target in imports:
+            self._reach_import_target(target, False)
+
+        for name, attrs in attributes:
+            targets: list[_ImportTarget] | None = module.bindings.get(name)
+            for target in targets or ():
+                self._reach_attributes(target, attrs)
+            if not targets or name in module.definitions:
+                self._reach_name(module, name)
+
+        for name in names:
+            self._reach_name(module, name)
+
+        if _get_assigned_name(node) == "__all__":
+            # Names in __all__ are read by imports with *
+            for child in ast.walk(node):
+                if isinstance(child, ast.Constant) and isinstance(child.value, str):
+                    self._reach_name(module, child.value)
+
+
+def get_defined_names(node: ast.stmt) -> list[str] | None:
+    """Returns names a top level statement defines if that is all running
+    it does, so it can be removed when none of them are used, else None"""
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        if _function_has_effects(node):
+            return None
+        return [node.name]
+
+    if isinstance(node, ast.ClassDef):
+        if _class_has_effects(node):
+            return None
+        return [node.name]
+
+    if isinstance(node, ast.Assign):
+        if not all(isinstance(target, ast.Name) for target in node.targets):
+            return None
+        if _has_effects(node.value):
+            return None
+        return [target.id for target in node.targets]  # type: ignore
+
+    if isinstance(node, ast.AnnAssign):
+        if not isinstance(node.target, ast.Name) or not node.simple:
+            return None
+        if _has_effects(node.annotation) or _has_effects(node.value):
+            return None
+        return [node.target.id]
+
+    return None
+
+
+def resolve_import_from(node: ast.ImportFrom, package: str) -> str:
+    """Returns the absolute name of the module imported from"""
+    if not node.level:
+        return node.module or ""
+
+    base: str = package
+    for _ in range(node.level - 1):
+        base = base.rpartition(".")[0]
+
+    if node.module is None:
+        return base
+
+    return f"{base}.{node.module}" if base else node.module
+
+
+def _get_references(
+    node: ast.AST, module: _ModuleInfo
+) -> tuple[set[str], set[tuple[str, tuple[str, ...]]], list[_ImportTarget]]:
+    """Returns names read in node, names with the chains of
+    attributes used on them, and what imports in node import"""
+    names: set[str] = set()
+    attributes: set[tuple[str, tuple[str, ...]]] = set()
+    imports: list[_ImportTarget] = []
+    # Attributes and names already part of a chain
+    chain_nodes: set[int] = set()
+
+    # Attributes are walked before their values, so chains are known
+    for child in ast.walk(node):
+        if isinstance(child, ast.Attribute):
+            if id(child) in chain_nodes:
+                continue
+            attrs: list[str] = []
+            value: ast.expr = child
+            while isinstance(value, ast.Attribute):
+                chain_nodes.add(id(value))
+                attrs.append(value.attr)
+                value = value.value
+            if isinstance(value, ast.Name):
+                chain_nodes.add(id(value))
+                attributes.add((value.id, tuple(reversed(attrs))))
+
+        elif isinstance(child, ast.Name):
+            if not isinstance(child.ctx, ast.Store) and id(child) not in chain_nodes:
+                names.add(child.id)
+
+        elif isinstance(child, ast.AugAssign) and isinstance(child.target, ast.Name):
+            # Reads the name before storing to it
+            names.add(child.target.id)
+
+        elif isinstance(child, ast.Import):
+            imports.extend((alias.name, None) for alias in child.names)
+
+        elif isinstance(child, ast.ImportFrom):
+            from_module: str = resolve_import_from(child, module.package)
+            imports.append((from_module, None))
+            # Fails if a name it imports is removed, even if unused
+            imports.extend(
+                (from_module, alias.name) for alias in child.names if alias.name != "*"
+            )
+
+    return names, attributes, imports
+
+
+def _get_assigned_name(node: ast.stmt) -> str | None:
+    """Returns the name node assigns to if it assigns to a single name"""
+    target: ast.expr
+    if isinstance(node, ast.Assign) and len(node.targets) == 1:
+        target = node.targets[0]
+    elif isinstance(node, (ast.AnnAssign, ast.AugAssign)):
+        target = node.target
+    else:
+        return None
+
+    return target.id if isinstance(target, ast.Name) else None
+
+
+def _iter_effect_nodes(node: ast.AST | None) -> Iterator[ast.AST]:
+    """Yields nodes evaluated when node is, without entering lambda bodies"""
+    if node is None:
+        return
+
+    to_check: list[ast.AST] = [node]
+    while to_check:
+        child: ast.AST = to_check.pop()
+        yield child
+        if isinstance(child, ast.Lambda):
+            to_check.append(child.args)
+        else:
+            to_check.extend(ast.iter_child_nodes(child))
+
+
+def _has_effects(node: ast.AST | None) -> bool:
+    return any(isinstance(child, _EFFECT_NODES) for child in _iter_effect_nodes(node))
+
+
+def _has_impure_decorators(decorators: list[ast.expr]) -> bool:
+    for decorator in decorators:
+        if get_node_name(decorator) not in _PURE_DECORATORS:
+            return True
+        if isinstance(decorator, ast.Call):
+            if any(_has_effects(arg) for arg in decorator.args) or any(
+                _has_effects(keyword.value) for keyword in decorator.keywords
+            ):
+                return True
+
+    return False
+
+
+def _function_has_effects(node: ast.FunctionDef | ast.AsyncFunctionDef) -> bool:
+    """Returns True if defining node runs more than its
+    decorators, defaults, and annotations"""
+    return (
+        _has_impure_decorators(node.decorator_list)
+        or _has_effects(node.args)
+        or _has_effects(node.returns)
+    )
+
+
+def _class_has_effects(node: ast.ClassDef) -> bool:
+    """Returns True if defining node could do more than create a class.
+    Keywords are for metaclasses, which can do anything"""
+    if node.keywords or _has_impure_decorators(node.decorator_list):
+        return True
+    if any(_has_effects(base) for base in node.bases):
+        return True
+
+    for statement in node.body:
+        if isinstance(statement, ast.Pass) or (
+            isinstance(statement, ast.Expr)
+            and isinstance(statement.value, ast.Constant)
+        ):
+            continue
+        if get_defined_names(statement) is None:
+            return True
+
+    return False
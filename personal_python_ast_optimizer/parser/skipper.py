@@ -1,19 +1,59 @@
 import ast
 import warnings
+from contextlib import contextmanager
+from typing import Any, Iterator
 
 from personal_python_ast_optimizer.futures import get_unneeded_futures
 from personal_python_ast_optimizer.parser.config import (
     ExtrasToSkipConfig,
     SectionsToSkipConfig,
     SkipConfig,
+    SkipUsage,
+    TokensToSkip,
     TokensToSkipConfig,
 )
+from personal_python_ast_optimizer.parser.dataclass_expansion import (
+    expand_dataclass,
+    get_base_class_names,
+    get_dataclass_names,
+)
+from personal_python_ast_optimizer.parser.enums import get_private_enum_constants
+from personal_python_ast_optimizer.parser.folding import ConstantFolder
+from personal_python_ast_optimizer.parser.lazy_imports import (
+    get_bound_name,
+    move_imports_into_functions,
+)
+from personal_python_ast_optimizer.parser.reachability import (
+    body_never_finishes,
+    get_reachable_length,
+)
+from personal_python_ast_optimizer.parser.relevance import RelevanceIndex
+from personal_python_ast_optimizer.parser.shaking import get_defined_names
+from personal_python_ast_optimizer.parser.type_hints import (
+    ImportedNames,
+    is_cast,
+    is_overload,
+    remove_unused_type_definitions,
+)
+from personal_python_ast_optimizer.parser.unused import (
+    get_string_annotation_names,
+    remove_newly_unused_imports,
+    remove_unused_code,
+)
 from personal_python_ast_optimizer.parser.utils import (
+    TRY_NODES,
     can_skip_annotation_assign,
+    fill_empty_finally,
     first_occurrence_of_type,
-    get_node_name,
+    get_dotted_name,
+    get_logging_call_level,
+    get_names_read,
+    has_binding_effects,
+    has_scope_effects,
+    is_import_fallback,
     is_name_equals_main_node,
     is_return_none,
+    iter_name_parts,
     skip_base_classes,
     skip_dangling_expressions,
     skip_decorators,
@@ -25,56 +65,122 @@ class AstNodeSkipper(ast.NodeTransformer):
     __slots__ = (
         "_within_class",
         "_within_function",
+        "_scope_names",
         "module_name",
         "constant_vars_to_fold",
+        "_has_dotted_constants",
         "target_python_version",
+        "target_platform",
+        "definitions_to_skip",
+        "imports_to_keep",
         "extras_to_skip_config",
         "sections_to_skip_config",
         "tokens_to_skip_config",
+        "_constant_folder",
+        "_pruned_names",
+        "_relevance_index",
+        "_irrelevant_nodes",
+        "_typing_names",
+        "_dataclass_names",
+        "_base_class_names",
+        "_skip_usage",
+        "_module_skip_usage",
     )
 
-    def __init__(self, config: SkipConfig) -> None:
+    def __init__(self, config: SkipConfig, skip_usage: SkipUsage | None = None) -> None:
+        """skip_usage: tokens found are added to it after each module instead of
+        warning about those never found, so usage of many modules can be
+        reported together"""
         self.module_name: str = config.module_name
-        self.constant_vars_to_fold: dict[str, int | str] = config.constant_vars_to_fold
+        # __debug__ is folded like any other constant
+        self.constant_vars_to_fold: dict[str, int | str] = (
+            config.constant_vars_to_fold
+            if config.target_debug is None
+            else {**config.constant_vars_to_fold, "__debug__": config.target_debug}
+        )
+        # Names like Color.RED are folded where attributes are read
+        self._has_dotted_constants: bool = any(
+            "." in name for name in self.constant_vars_to_fold
+        )
         self.target_python_version: tuple[int, int] | None = (
             config.target_python_version
         )
+        self.target_platform: str | None = config.target_platform
+        self.definitions_to_skip: set[str] = config.definitions_to_skip
+        self.imports_to_keep: set[str] = config.imports_to_keep
         self.extras_to_skip_config: ExtrasToSkipConfig = config.extras_to_skip_config
         self.sections_to_skip_config: SectionsToSkipConfig = (
             config.sections_to_skip_config
         )
-        self.tokens_to_skip_config: TokensToSkipConfig = config.tokens_to_skip_config
+        self._skip_usage: SkipUsage | None = skip_usage
+        self._module_skip_usage = SkipUsage()
+        # Counts into this skipper's usage, so the config is never changed
+        self.tokens_to_skip_config: TokensToSkipConfig = (
+            config.tokens_to_skip_config.with_usage(self._module_skip_usage)
+        )
 
+        self._constant_folder: ConstantFolder | None = (
+            ConstantFolder(
+                self.constant_vars_to_fold,
+                self.target_python_version,
+                self.target_platform,
+            )
+            if self.extras_to_skip_config.skip_constant_expressions
+            else None
+        )
+        # Names read by code that was removed or folded, since imports
+        # of them may now be unused
+        self._pruned_names: set[str] = set()
+        self._relevance_index = RelevanceIndex(config)
+        # Subtrees of the module being skipped that skipping can't change
+        self._irrelevant_nodes: set[ast.AST] = set()
+        # Names of typing in the module being skipped
+        self._typing_names = ImportedNames()
+        # Names of dataclasses in the module being skipped
+        self._dataclass_names = ImportedNames()
+        # Names of classes that classes in the module being skipped inherit from
+        self._base_class_names: set[str] = set()
         self._within_class: bool = False
         self._within_function: bool = False
-
-    @staticmethod
-    def _within_class_node(function):
-        def wrapper(self: "AstNodeSkipper", *args, **kwargs) -> ast.AST | None:
+        # Names of the classes and functions being visited, outermost first
+        self._scope_names: list[str] = []
+
+    @contextmanager
+    def within_scope(
+        self, node: ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef
+    ) -> Iterator[None]:
+        """Marks descendants of node as within a class or function
+        for as long as node is being walked"""
+        previous_within_class: bool = self._within_class
+        previous_within_function: bool = self._within_function
+
+        if isinstance(node, ast.ClassDef):
             self._within_class = True
-            try:
-                return function(self, *args, **kwargs)
-            finally:
-                self._within_class = False
+        else:
+            self._within_function = True
+        self._scope_names.append(node.name)
 
-        return wrapper
+        try:
+            yield
+        finally:
+            self._within_class = previous_within_class
+            self._within_function = previous_within_function
+            self._scope_names.pop()
 
-    @staticmethod
-    def _within_function_node(function):
-        def wrapper(self: "AstNodeSkipper", *args, **kwargs) -> ast.AST | None:
-            self._within_function = True
-            try:
-                return function(self, *args, **kwargs)
-            finally:
-                self._within_function = False
+    def visit(self, node: ast.AST) -> Any:
+        if node in self._irrelevant_nodes:
+            return node
 
-        return wrapper
+        return super().visit(node)
 
     def generic_visit(self, node: ast.AST) -> ast.AST:
+        self.remove_unreachable_code(node)
         node_to_return: ast.AST = super().generic_visit(node)
 
         if not isinstance(node, ast.Module) and hasattr(node, "body") and not node.body:
             node.body.append(ast.Pass())
+        if isinstance(node, TRY_NODES):
+            fill_empty_finally(node)
 
         return node_to_return
 
@@ -85,14 +191,29 @@ class AstNodeSkipper(ast.NodeTransformer):
         if self.extras_to_skip_config.skip_dangling_expressions:
             skip_dangling_expressions(node)
 
+        self.find_enums_to_fold(node)
+        self.skip_definitions(node)
+        self.index_module(node)
+
         try:
-            return self.generic_visit(node)
+            self.generic_visit(node)
+            self.remove_unused_type_definitions(node)
+            self.remove_pruned_imports(node)
+            if self.extras_to_skip_config.skip_unused_code:
+                remove_unused_code(
+                    node, self.extras_to_skip_config.skip_all_unused_imports
+                )
+            if self.extras_to_skip_config.lazy_imports:
+                self._module_skip_usage.moved_imports.extend(
+                    move_imports_into_functions(node, self.imports_to_keep)
+                )
+            return node
         finally:
-            self._warn_unused_skips()
+            self._irrelevant_nodes = set()
+            self.report_skip_usage()
 
-    @_within_class_node
     def visit_ClassDef(self, node: ast.ClassDef) -> ast.AST | None:
-        if node.name in self.tokens_to_skip_config.classes:
+        if self._is_definition_to_skip(node, self.tokens_to_skip_config.classes):
             return None
 
         if self._use_version_optimization((3, 0)):
@@ -100,48 +221,69 @@ class AstNodeSkipper(ast.NodeTransformer):
 
         if self.extras_to_skip_config.skip_dangling_expressions:
             skip_dangling_expressions(node)
-        skip_base_classes(node, self.tokens_to_skip_config.classes)
+        node.bases = [base for base in node.bases if not self._is_base_to_skip(base)]
         skip_decorators(node, self.tokens_to_skip_config.decorators)
+        if self.extras_to_skip_config.expand_dataclasses:
+            for expression in expand_dataclass(
+                node,
+                self._dataclass_names,
+                self._base_class_names,
+                not self.extras_to_skip_config.skip_type_hints,
+                self.target_python_version,
+            ):
+                self._skip_annotation(expression)
 
-        return self.generic_visit(node)
+        with self.within_scope(node):
+            return self.generic_visit(node)
 
-    @_within_function_node
     def visit_FunctionDef(self, node: ast.FunctionDef) -> ast.AST | None:
-        if node.name in self.tokens_to_skip_config.functions:
+        if self._is_definition_to_skip(node, self.tokens_to_skip_config.functions):
             return None
 
         if self.extras_to_skip_config.skip_type_hints:
+            if is_overload(node, self._typing_names):
+                self._pruned_names.update(get_names_read([node]))
+                return None
+            self._skip_annotation(node.returns)
             node.returns = None
 
         if self.extras_to_skip_config.skip_dangling_expressions:
             skip_dangling_expressions(node)
         skip_decorators(node, self.tokens_to_skip_config.decorators)
 
-        return self.generic_visit(node)
+        with self.within_scope(node):
+            return self.generic_visit(node)
 
-    @_within_function_node
     def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> ast.AST | None:
-        if node.name in self.tokens_to_skip_config.functions:
+        if self._is_definition_to_skip(node, self.tokens_to_skip_config.functions):
             return None
 
+        if self.extras_to_skip_config.skip_type_hints:
+            if is_overload(node, self._typing_names):
+                self._pruned_names.update(get_names_read([node]))
+                return None
+            self._skip_annotation(node.returns)
+            node.returns = None
+
         if self.extras_to_skip_config.skip_dangling_expressions:
             skip_dangling_expressions(node)
         skip_decorators(node, self.tokens_to_skip_config.decorators)
 
-        return self.generic_visit(node)
+        with self.within_scope(node):
+            return self.generic_visit(node)
 
     def visit_Assign(self, node: ast.Assign) -> ast.AST | None:
         """Skips assign if it is an assignment to a constant that is being folded"""
         if self._should_skip_function_assign(node):
             return None
 
-        # TODO: Currently if a.b.c.d only "c" and "d" are checked
-        var_name: str = get_node_name(node.targets[0])
-        parent_var_name: str = get_node_name(getattr(node.targets[0], "value", object))
-
-        if (
-            var_name in self.tokens_to_skip_config.variables
-            or parent_var_name in self.tokens_to_skip_config.variables
+        # Assigning to part of a variable, like a.b.c = 1 or a.b[0] = 1,
+        # is skipped with it
+        variables: TokensToSkip = self.tokens_to_skip_config.variables
+        if variables.matches_parts(
+            iter_name_parts(node.targets[0])
+        ) or variables.matches_parts(
+            iter_name_parts(getattr(node.targets[0], "value", None))
         ):
             return None
 
@@ -196,25 +338,25 @@ class AstNodeSkipper(ast.NodeTransformer):
         """Skips assign if it is an assignment to a constant that is being folded"""
         if (
             self._should_skip_function_assign(node)
-            or get_node_name(node.target) in self.tokens_to_skip_config.variables
-            or self._is_assign_of_folded_constant(node.target, node.value)
-            or (
-                self.extras_to_skip_config.skip_type_hints
-                and can_skip_annotation_assign(
-                    node, self._within_class, self._within_function
-                )
+            or self.tokens_to_skip_config.variables.matches_parts(
+                iter_name_parts(node.target)
             )
+            or self._is_assign_of_folded_constant(node.target, node.value)
         ):
             return None
 
+        if self.extras_to_skip_config.skip_type_hints:
+            self._skip_annotation(node.annotation)
+            if can_skip_annotation_assign(
+                node, self._within_class, self._within_function
+            ):
+                return None
+
         parsed_node: ast.AnnAssign = self.generic_visit(node)  # type: ignore
 
         if self.extras_to_skip_config.skip_type_hints:
-            if (
-                not parsed_node.value
-                and self._within_class
-                and not self._within_function
-            ):
+            if self._within_class and not self._within_function:
+                # Keeps fields of classes like dataclasses and NamedTuples
                 parsed_node.annotation = ast.Constant("Any")
             elif parsed_node.value is None:
                 # This should be unreachable
@@ -225,7 +367,9 @@ class AstNodeSkipper(ast.NodeTransformer):
         return parsed_node
 
     def visit_AugAssign(self, node: ast.AugAssign) -> ast.AST | None:
-        if get_node_name(node.target) in self.tokens_to_skip_config.variables:
+        if self.tokens_to_skip_config.variables.matches_parts(
+            iter_name_parts(node.target)
+        ):
             return None
 
         return self.generic_visit(node)
@@ -286,21 +430,105 @@ class AstNodeSkipper(ast.NodeTransformer):
         else:
             return self.generic_visit(node)
 
+    def visit_Attribute(self, node: ast.Attribute) -> ast.AST:
+        if self._has_dotted_constants and isinstance(node.ctx, ast.Load):
+            name: str = get_dotted_name(node)
+            if name in self.constant_vars_to_fold:
+                self._pruned_names.update(get_names_read([node]))
+                return ast.Constant(self.constant_vars_to_fold[name])
+
+        return self.generic_visit(node)
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        return self._fold_or_generic_visit(node)
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:
+        return self._fold_or_generic_visit(node)
+
+    def visit_Compare(self, node: ast.Compare) -> ast.AST:
+        return self._fold_or_generic_visit(node)
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> ast.AST:
+        if self._constant_folder is not None:
+            simplified: ast.expr = self._constant_folder.simplify_bool_op(node)
+            if simplified is not node:
+                self._pruned_names.update(get_names_read([node]))
+                return self.visit(simplified)
+
+        return self._fold_or_generic_visit(node)
+
+    def visit_IfExp(self, node: ast.IfExp) -> ast.AST:
+        if self._constant_folder is not None:
+            simplified: ast.expr = self._constant_folder.simplify_if_exp(node)
+            if simplified is not node:
+                self._pruned_names.update(get_names_read([node]))
+                return self.visit(simplified)
+
+        return self.generic_visit(node)
+
+    def visit_JoinedStr(self, node: ast.JoinedStr) -> ast.AST:
+        if self._constant_folder is not None:
+            folded: ast.expr | None = self._constant_folder.fold(node)
+            if folded is not None:
+                self._pruned_names.update(get_names_read([node]))
+                return folded
+            node = self._constant_folder.simplify_joined_str(node)
+
+        return self.generic_visit(node)
+
     def visit_Dict(self, node: ast.Dict) -> ast.AST:
-        new_dict = {
-            k: v
+        # Kept as pairs since keys are None for each ** unpacking
+        new_items: list[tuple[ast.expr | None, ast.expr]] = [
+            (k, v)
             for k, v in zip(node.keys, node.values)
             if getattr(k, "value", "") not in self.tokens_to_skip_config.dict_keys
-        }
-        node.keys = list(new_dict.keys())
-        node.values = list(new_dict.values())
+        ]
+        node.keys = [k for k, _ in new_items]
+        node.values = [v for _, v in new_items]
 
         return self.generic_visit(node)
 
-    def visit_If(self, node: ast.If) -> ast.AST | None:
+    def visit_If(self, node: ast.If) -> ast.AST | list[ast.stmt] | None:
         if is_name_equals_main_node(node.test):
             return None
 
+        if (
+            self.extras_to_skip_config.skip_type_hints
+            and self._typing_names.get_name(node.test) == "TYPE_CHECKING"
+        ):
+            # Only true for type checkers
+            return self._replace_with_branch(node, node.orelse, node.body)
+
+        if self._constant_folder is not None:
+            test: bool | None = self._constant_folder.get_truth(node.test)
+            if test is not None:
+                return self._replace_with_branch(
+                    node,
+                    node.body if test else node.orelse,
+                    node.orelse if test else node.body,
+                )
+
+        return self.generic_visit(node)
+
+    def visit_While(self, node: ast.While) -> ast.AST | list[ast.stmt] | None:
+        if (
+            self._constant_folder is not None
+            and self._constant_folder.get_truth(node.test) is False
+        ):
+            return self._replace_with_branch(node, node.orelse, node.body)
+
+        return self.generic_visit(node)
+
+    def visit_Try(self, node: ast.Try) -> ast.AST | list[ast.stmt] | None:
+        if self.target_python_version is not None and is_import_fallback(
+            node, self.target_python_version
+        ):
+            return self._replace_with_branch(
+                node,
+                node.body + node.orelse,
+                [statement for handler in node.handlers for statement in handler.body],
+            )
+
         return self.generic_visit(node)
 
     def visit_Return(self, node: ast.Return) -> ast.AST:
@@ -310,28 +538,229 @@ class AstNodeSkipper(ast.NodeTransformer):
         return self.generic_visit(node)
 
     def visit_Expr(self, node: ast.Expr) -> ast.AST | None:
-        if (
-            isinstance(node.value, ast.Call)
-            and get_node_name(node.value.func) in self.tokens_to_skip_config.functions
-        ):
+        if isinstance(node.value, ast.Call):
+            if self.tokens_to_skip_config.functions.matches_parts(
+                iter_name_parts(node.value.func)
+            ):
+                return None
+
+            if self._is_logging_call_to_skip(node.value):
+                self._pruned_names.update(get_names_read([node]))
+                return None
+
+        return self.generic_visit(node)
+
+    def visit_Assert(self, node: ast.Assert) -> ast.AST | None:
+        if self.extras_to_skip_config.skip_asserts:
+            self._pruned_names.update(get_names_read([node]))
             return None
 
         return self.generic_visit(node)
 
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        if self.extras_to_skip_config.skip_type_hints and is_cast(
+            node, self._typing_names
+        ):
+            self._pruned_names.update(get_names_read([node.func, node.args[0]]))
+            return self.visit(node.args[1])
+
+        return self.generic_visit(node)
+
     def visit_arg(self, node: ast.arg) -> ast.AST:
         if self.extras_to_skip_config.skip_type_hints:
+            self._skip_annotation(node.annotation)
             node.annotation = None
         return self.generic_visit(node)
 
     def visit_arguments(self, node: ast.arguments) -> ast.AST:
         if self.extras_to_skip_config.skip_type_hints:
             if node.kwarg is not None:
+                self._skip_annotation(node.kwarg.annotation)
                 node.kwarg.annotation = None
             if node.vararg is not None:
+                self._skip_annotation(node.vararg.annotation)
                 node.vararg.annotation = None
 
         return self.generic_visit(node)
 
+    def index_module(self, node: ast.Module) -> None:
+        """Finds subtrees of node that skipping can't change, so they are
+        left as is without being visited"""
+        self._irrelevant_nodes = self._relevance_index.find_irrelevant_nodes(node)
+        if self.extras_to_skip_config.skip_type_hints:
+            self._typing_names = ImportedNames(node)
+        if self.extras_to_skip_config.expand_dataclasses:
+            self._dataclass_names = get_dataclass_names(node)
+            self._base_class_names = get_base_class_names(node)
+
+    def is_irrelevant(self, node: ast.AST) -> bool:
+        """Returns True if skipping can't change node or its descendants"""
+        return node in self._irrelevant_nodes
+
+    def find_enums_to_fold(self, node: ast.Module) -> None:
+        """Adds members of enums only node reads to the constants to fold,
+        and the enums to the definitions to skip"""
+        if not self.extras_to_skip_config.fold_enums:
+            return
+
+        constants, enum_names = get_private_enum_constants(
+            node, self.target_python_version
+        )
+        if not constants:
+            return
+
+        # Copied so the config is never changed
+        self.constant_vars_to_fold = {**self.constant_vars_to_fold, **constants}
+        self.definitions_to_skip = self.definitions_to_skip | enum_names
+        self._has_dotted_constants = True
+        if self._constant_folder is not None:
+            self._constant_folder.constant_vars_to_fold = self.constant_vars_to_fold
+        self._relevance_index.add_identifiers(
+            name.rpartition(".")[2] for name in constants
+        )
+
+    def skip_definitions(self, node: ast.Module) -> None:
+        """Removes top level definitions in definitions_to_skip, and from
+        imports of them. Statements defining several names are only
+        removed if all are"""
+        if not self.definitions_to_skip:
+            return
+
+        new_body: list[ast.stmt] = []
+        for statement in node.body:
+            if isinstance(statement, ast.ImportFrom):
+                statement.names = [
+                    alias
+                    for alias in statement.names
+                    if get_bound_name(alias) not in self.definitions_to_skip
+                ]
+                if statement.names:
+                    new_body.append(statement)
+                continue
+
+            defined_names: list[str] | None = get_defined_names(statement)
+            if defined_names and all(
+                name in self.definitions_to_skip for name in defined_names
+            ):
+                self._pruned_names.update(get_names_read([statement]))
+            else:
+                new_body.append(statement)
+
+        node.body = new_body
+
+    def remove_unused_type_definitions(self, node: ast.Module) -> bool:
+        """Removes TypeVar and Protocol definitions of node that only type
+        hints used, if they are being skipped. Returns True if any were"""
+        if not self.extras_to_skip_config.skip_type_hints:
+            return False
+
+        removed_statements: list[ast.stmt] = remove_unused_type_definitions(
+            node, self._typing_names
+        )
+        self._pruned_names.update(get_names_read(removed_statements))
+
+        return len(removed_statements) > 0
+
+    def remove_pruned_imports(self, node: ast.Module) -> bool:
+        """Removes imports only used by branches that were removed.
+        Returns True if any import was removed"""
+        if not self._pruned_names:
+            return False
+
+        try:
+            return remove_newly_unused_imports(
+                node,
+                self._pruned_names,
+                self.extras_to_skip_config.skip_all_unused_imports,
+            )
+        finally:
+            self._pruned_names = set()
+
+    def remove_unreachable_code(self, node: ast.AST) -> None:
+        """Removes statements of node's bodies that can never run.
+        Done before visiting children so a statement that is removed
+        is never visited"""
+        if not self.extras_to_skip_config.skip_unreachable_code:
+            return
+
+        for field in ("body", "orelse", "finalbody"):
+            body: list | ast.AST | None = getattr(node, field, None)
+            if isinstance(body, list) and body and isinstance(body[0], ast.stmt):
+                setattr(node, field, self._remove_unreachable_statements(body))
+
+        if (
+            isinstance(node, (ast.While, ast.Try))
+            and node.orelse
+            and not has_scope_effects(
+                node.orelse, node.body if self._within_function else None
+            )
+            and (
+                # Only a break leaves a loop that is always true, skipping its else
+                self._get_truth(node.test)
+                if isinstance(node, ast.While)
+                # A try's else runs only when its body finishes
+                else body_never_finishes(node.body, self._get_truth)
+            )
+        ):
+            self._pruned_names.update(get_names_read(node.orelse))
+            node.orelse = []
+
+    def _remove_unreachable_statements(self, body: list[ast.stmt]) -> list[ast.stmt]:
+        if not self.extras_to_skip_config.skip_unreachable_code:
+            return body
+
+        length: int = get_reachable_length(body, self._get_truth)
+        if length == len(body) or has_scope_effects(
+            body[length:], body[:length] if self._within_function else None
+        ):
+            return body
+
+        self._pruned_names.update(get_names_read(body[length:]))
+        return body[:length]
+
+    def _get_truth(self, node: ast.expr) -> bool | None:
+        if self._constant_folder is None:
+            return None
+
+        return self._constant_folder.get_truth(node)
+
+    def _replace_with_branch(
+        self, node: ast.stmt, branch: list[ast.stmt], removed_branch: list[ast.stmt]
+    ) -> ast.AST | list[ast.stmt] | None:
+        """Replaces a statement whose test is constant with the branch it takes"""
+        if has_scope_effects(removed_branch, branch if self._within_function else None):
+            return self.generic_visit(node)
+
+        # Names in the taken branch are still used, so only imports of those
+        # in the test or removed branch can become unused
+        self._pruned_names.update(get_names_read([node]))
+
+        statements: list[ast.stmt] = []
+        for statement in self._remove_unreachable_statements(branch):
+            new_statement: ast.AST | list[ast.stmt] | None = self.visit(statement)
+            if isinstance(new_statement, list):
+                statements.extend(new_statement)
+            elif new_statement is not None:
+                statements.append(new_statement)  # type: ignore
+
+        return statements or None
+
+    def _skip_annotation(self, annotation: ast.expr | None) -> None:
+        """Marks names read by an annotation being removed as
+        pruned, so imports only used in type hints are removed"""
+        if annotation is not None:
+            self._pruned_names.update(get_names_read([annotation]))
+            self._pruned_names.update(get_string_annotation_names(annotation))
+
+    def _fold_or_generic_visit(self, node: ast.expr) -> ast.AST:
+        if self._constant_folder is not None:
+            folded: ast.expr | None = self._constant_folder.fold(node)
+            if folded is not None:
+                self._pruned_names.update(get_names_read([node]))
+                return folded
+
+        return self.generic_visit(node)
+
     def _is_assign_of_folded_constant(
         self, target: ast.expr, value: ast.expr | None
     ) -> bool:
@@ -344,6 +773,20 @@ class AstNodeSkipper(ast.NodeTransformer):
             and isinstance(value, ast.Constant)
         )
 
+    def _is_logging_call_to_skip(self, node: ast.Call) -> bool:
+        skip_logging_below: int | None = self.extras_to_skip_config.skip_logging_below
+        if skip_logging_below is None:
+            return False
+
+        level: int | None = get_logging_call_level(
+            node, self.extras_to_skip_config.logger_names
+        )
+        return (
+            level is not None
+            and level < skip_logging_below
+            and not has_binding_effects(node)
+        )
+
     def _use_version_optimization(self, min_version: tuple[int, int]) -> bool:
         if self.target_python_version is None:
             return False
@@ -353,30 +796,76 @@ class AstNodeSkipper(ast.NodeTransformer):
     def _has_code_to_skip(self) -> bool:
         return (
             self.target_python_version is not None
+            or self.target_platform is not None
             or len(self.constant_vars_to_fold) > 0
+            or len(self.definitions_to_skip) > 0
             or self.extras_to_skip_config.has_code_to_skip()
             or self.tokens_to_skip_config.has_code_to_skip()
             or self.sections_to_skip_config.has_code_to_skip()
         )
 
     def _should_skip_function_assign(self, node: ast.Assign | ast.AnnAssign) -> bool:
-        return (
-            isinstance(node.value, ast.Call)
-            and get_node_name(node.value.func) in self.tokens_to_skip_config.functions
+        return isinstance(
+            node.value, ast.Call
+        ) and self.tokens_to_skip_config.functions.matches_parts(
+            iter_name_parts(node.value.func)
         )
 
-    def _warn_unused_skips(self):
-        for tokens_to_skip in self.tokens_to_skip_config:
-            not_found_tokens: list[str] = [
-                t
-                for t in tokens_to_skip.get_not_found_tokens()
-                if t not in self.tokens_to_skip_config.no_warn
-            ]
-            if not_found_tokens:
+    def _is_definition_to_skip(
+        self,
+        node: ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef,
+        tokens_to_skip: TokensToSkip,
+    ) -> bool:
+        return tokens_to_skip.matches_parts(self._iter_qualified_name_parts(node))
+
+    def _is_base_to_skip(self, base: ast.expr) -> bool:
+        """Returns True if base is a class to skip. Names are qualified
+        like definitions, and also by the module alone since a name
+        in a nested class or function may be from the module"""
+        if not isinstance(base, (ast.Name, ast.Attribute)):
+            return False
+
+        classes: TokensToSkip = self.tokens_to_skip_config.classes
+        name_parts: list[str] = list(iter_name_parts(base))
+        if isinstance(base, ast.Attribute):
+            return classes.matches_parts(name_parts)
+
+        module_parts: list[str] = (
+            self.module_name.split(".")[::-1] if self.module_name else []
+        )
+        return classes.matches_parts(
+            [*name_parts, *reversed(self._scope_names), *module_parts]
+        ) or (
+            len(self._scope_names) > 0
+            and classes.matches_parts([*name_parts, *module_parts])
+        )
+
+    def _iter_qualified_name_parts(
+        self, node: ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef
+    ) -> Iterator[str]:
+        """Yields parts of node's name within the module, like
+        module.Class.method, from last to first"""
+        yield node.name
+        yield from reversed(self._scope_names)
+        if self.module_name:
+            yield from reversed(self.module_name.split("."))
+
+    def report_skip_usage(self) -> None:
+        """Adds tokens found in the module and imports moved to skip_usage
+        if provided, else warns about tokens not found. Moving imports is
+        expected, so it is only recorded"""
+        if self._skip_usage is not None:
+            self._skip_usage.merge(self._module_skip_usage)
+        else:
+            for token_type, tokens in self._module_skip_usage.get_not_found_tokens(
+                self.tokens_to_skip_config
+            ).items():
                 warnings.warn(
                     (
                         f"{self.module_name}: requested to skip "
-                        f"{tokens_to_skip.token_type} {', '.join(not_found_tokens)}"
+                        f"{token_type} {', '.join(tokens)}"
                         " but was not found"
                     )
                 )
+
+        self._module_skip_usage.clear()
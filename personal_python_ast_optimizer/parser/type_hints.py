@@ -0,0 +1,194 @@
+"""Finds code only type checkers use, like typing.cast calls, @overload stubs,
+if TYPE_CHECKING blocks, and TypeVar and Protocol definitions, so it can be
+removed along with type hints"""
+
+import ast
+from typing import Iterator
+
+from personal_python_ast_optimizer.parser.lazy_imports import get_bound_name
+from personal_python_ast_optimizer.parser.unused import get_used_names
+
+TYPING_MODULES: frozenset[str] = frozenset(("typing", "typing_extensions"))
+
+# Calls of typing that make objects only used in type hints
+_TYPE_VARIABLE_FACTORIES: frozenset[str] = frozenset(
+    ("NewType", "ParamSpec", "TypeVar", "TypeVarTuple")
+)
+
+
+class ImportedNames:
+    """Top level names of a module bound to names of some modules, like typing,
+    and to those modules themselves. Only from module import name and, for
+    typing, TYPE_CHECKING = False are followed, not imports under another name
+    or names bound more than once"""
+
+    __slots__ = ("names", "module_names")
+
+    def __init__(
+        self,
+        module: ast.Module | None = None,
+        imported_modules: frozenset[str] = TYPING_MODULES,
+    ) -> None:
+        # Names bound to the same name in the modules, like cast
+        self.names: set[str] = set()
+        # Names bound to the modules, like typing or t for import typing as t
+        self.module_names: set[str] = set()
+
+        if module is None:
+            return
+
+        other_names: set[str] = set()
+        for statement in module.body:
+            if isinstance(statement, ast.ImportFrom):
+                for alias in statement.names:
+                    if (
+                        statement.module in imported_modules
+                        and not statement.level
+                        and alias.asname in (None, alias.name)
+                    ):
+                        self.names.add(alias.name)
+                    else:
+                        other_names.add(get_bound_name(alias))
+
+            elif isinstance(statement, ast.Import):
+                for alias in statement.names:
+                    if alias.name in imported_modules:
+                        self.module_names.add(get_bound_name(alias))
+                    else:
+                        other_names.add(get_bound_name(alias))
+
+            elif "typing" in imported_modules and _is_type_checking_assign(statement):
+                # Avoids importing typing, with the same meaning
+                self.names.add("TYPE_CHECKING")
+
+            else:
+                other_names.update(_iter_bound_names(statement))
+
+        self.names -= other_names
+        self.module_names -= other_names
+
+    def get_name(self, node: ast.AST) -> str:
+        """Returns the name in the modules node refers to, like cast
+        for cast or typing.cast, else an empty string"""
+        if isinstance(node, ast.Name):
+            return node.id if node.id in self.names else ""
+
+        if (
+            isinstance(node, ast.Attribute)
+            and isinstance(node.value, ast.Name)
+            and node.value.id in self.module_names
+        ):
+            return node.attr
+
+        return ""
+
+
+def is_cast(node: ast.Call, typing_names: ImportedNames) -> bool:
+    """Returns True if node is cast(type, value), which returns value"""
+    return (
+        typing_names.get_name(node.func) == "cast"
+        and len(node.args) == 2
+        and not node.keywords
+        and not any(isinstance(arg, ast.Starred) for arg in node.args)
+    )
+
+
+def is_overload(
+    node: ast.FunctionDef | ast.AsyncFunctionDef, typing_names: ImportedNames
+) -> bool:
+    """Returns True if node is a stub of an overloaded function,
+    which is replaced by the definition after it"""
+    return any(
+        typing_names.get_name(decorator) == "overload"
+        for decorator in node.decorator_list
+    )
+
+
+def remove_unused_type_definitions(
+    module: ast.Module, typing_names: ImportedNames
+) -> list[ast.stmt]:
+    """Removes top level TypeVar like assignments and Protocol classes that
+    nothing in the module reads. Other modules may import public names,
+    so those are only removed if the module has an __all__ without them.
+    Returns the statements removed"""
+    has_all: bool = any(
+        "__all__" in _iter_bound_names(statement) for statement in module.body
+    )
+    removed_statements: list[ast.stmt] = []
+
+    # Removing a Protocol can leave a TypeVar it used unused
+    while True:
+        used_names: set[str] = get_used_names(module)
+        new_body: list[ast.stmt] = []
+        for statement in module.body:
+            name: str = _get_type_definition_name(statement, typing_names)
+            if name and name not in used_names and (has_all or name.startswith("_")):
+                removed_statements.append(statement)
+            else:
+                new_body.append(statement)
+
+        if len(new_body) == len(module.body):
+            return removed_statements
+        module.body = new_body
+
+
+def _get_type_definition_name(node: ast.stmt, typing_names: ImportedNames) -> str:
+    """Returns the name node defines if it only makes something used
+    in type hints, else an empty string"""
+    if isinstance(node, ast.ClassDef):
+        return (
+            node.name
+            if not node.decorator_list
+            and any(
+                typing_names.get_name(_get_subscripted(base)) == "Protocol"
+                for base in node.bases
+            )
+            else ""
+        )
+
+    if (
+        isinstance(node, ast.Assign)
+        and len(node.targets) == 1
+        and isinstance(node.targets[0], ast.Name)
+        and isinstance(node.value, ast.Call)
+        and typing_names.get_name(node.value.func) in _TYPE_VARIABLE_FACTORIES
+    ):
+        return node.targets[0].id
+
+    return ""
+
+
+def _get_subscripted(node: ast.expr) -> ast.expr:
+    """Returns what is subscripted, like Protocol for Protocol[T]"""
+    return node.value if isinstance(node, ast.Subscript) else node
+
+
+def _is_type_checking_assign(node: ast.stmt) -> bool:
+    return (
+        isinstance(node, ast.Assign)
+        and len(node.targets) == 1
+        and getattr(node.targets[0], "id", "") == "TYPE_CHECKING"
+        and isinstance(node.value, ast.Constant)
+        and node.value.value is False
+    )
+
+
+def _iter_bound_names(node: ast.stmt) -> Iterator[str]:
+    """Yields names a top level statement that is not an import binds,
+    except for names bound within nested statements"""
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        yield node.name
+        return
+
+    targets: list[ast.expr]
+    if isinstance(node, ast.Assign):
+        targets = node.targets
+    elif isinstance(node, (ast.AnnAssign, ast.AugAssign)):
+        targets = [node.target]
+    else:
+        return
+
+    for target in targets:
+        for child in ast.walk(target):
+            if isinstance(child, ast.Name):
+                yield child.id
@@ -0,0 +1,356 @@
+"""Removes unused code from a module's AST, the same kinds of code
+flake_wrapper.run_autoflake removes from its source"""
+
+import ast
+import sys
+from typing import Container, Iterator
+
+# Importing these does something, so they are never removed
+_IMPORTS_WITH_SIDE_EFFECTS: frozenset[str] = frozenset(
+    ("antigravity", "rlcompleter", "this")
+)
+
+# Same modules autoflake removes unused imports of by default
+_SAFE_IMPORTS: frozenset[str] = (
+    frozenset(name for name in sys.stdlib_module_names if not name.startswith("_"))
+    - _IMPORTS_WITH_SIDE_EFFECTS
+)
+
+# Using these can read any local, so locals of functions using them are kept
+_LOCALS_READERS: frozenset[str] = frozenset(("eval", "exec", "locals", "vars"))
+
+_NEEDED_VALUE_NODES: tuple[type, ...] = (
+    ast.NamedExpr,
+    ast.Yield,
+    ast.YieldFrom,
+    ast.Await,
+)
+
+_PURE_NODES: tuple[type, ...] = (ast.Constant, ast.Name)
+
+
+class UnusedCodeRemover:
+    """Removes unused imports, duplicate dict keys, unused local variables
+    along with values that do nothing, and pass statements next to
+    other statements.
+
+    Like autoflake, unused imports are only removed from the standard library
+    unless remove_all_unused_imports is True, since another module may import
+    an import of this one. A name used anywhere in the module counts as used,
+    so less may be removed than autoflake would, but never more"""
+
+    __slots__ = ("remove_all_unused_imports", "_removed")
+
+    def __init__(self, remove_all_unused_imports: bool = False) -> None:
+        self.remove_all_unused_imports: bool = remove_all_unused_imports
+        self._removed: bool = False
+
+    def remove(self, module: ast.Module) -> ast.Module:
+        """Removes unused code until there is none left, since removing
+        an unused variable can leave what its value used unused"""
+        self._removed = True
+        while self._removed:
+            self._removed = False
+            self._remove_duplicate_dict_keys(module)
+            self._remove_unused_locals(module)
+            self._remove_unused_imports(module, get_used_names(module))
+            self._remove_useless_passes(module)
+
+        return module
+
+    def _remove_unused_imports(self, node: ast.AST, used_names: Container[str]) -> None:
+        for owner, field in _iter_bodies(node):
+            # Imports in a class are attributes of it
+            if isinstance(owner, ast.ClassDef):
+                continue
+
+            body: list[ast.stmt] = getattr(owner, field)
+            new_body: list[ast.stmt] = []
+            for statement in body:
+                if isinstance(statement, (ast.Import, ast.ImportFrom)):
+                    names: list[ast.alias] = [
+                        alias
+                        for alias in statement.names
+                        if not self._is_unused_import(statement, alias, used_names)
+                    ]
+                    if len(names) != len(statement.names):
+                        self._removed = True
+                        statement.names = names
+                    if not names:
+                        continue
+                new_body.append(statement)
+
+            _set_body(owner, field, new_body)
+
+        for child in ast.iter_child_nodes(node):
+            self._remove_unused_imports(child, used_names)
+
+    def _is_unused_import(
+        self,
+        node: ast.Import | ast.ImportFrom,
+        alias: ast.alias,
+        used_names: Container[str],
+    ) -> bool:
+        if alias.name == "*" or alias.asname == alias.name:
+            # Star imports and explicit re-exports
+            return False
+
+        if isinstance(node, ast.ImportFrom):
+            if node.module == "__future__":
+                return False
+            module_name: str = "" if node.level else node.module or ""
+            bound_name: str = alias.asname or alias.name
+        else:
+            module_name = alias.name
+            bound_name = alias.asname or alias.name.split(".")[0]
+
+        if bound_name in used_names:
+            return False
+
+        return (
+            self.remove_all_unused_imports or module_name.split(".")[0] in _SAFE_IMPORTS
+        )
+
+    def _remove_duplicate_dict_keys(self, module: ast.Module) -> None:
+        for node in ast.walk(module):
+            if isinstance(node, ast.Dict):
+                self._remove_duplicate_keys(node)
+
+    def _remove_duplicate_keys(self, node: ast.Dict) -> None:
+        """Moves the last value of a repeated key to its first entry,
+        keeping order of keys, if no evaluation order is changed"""
+        first_indexes: dict[str | bytes, int] = {}
+        indexes_to_remove: set[int] = set()
+
+        for index, key in enumerate(node.keys):
+            # Only equal to constants of the same type, unlike numbers
+            if not isinstance(key, ast.Constant) or not isinstance(
+                key.value, (str, bytes)
+            ):
+                continue
+
+            first_index: int | None = first_indexes.get(key.value)
+            if first_index is None:
+                first_indexes[key.value] = index
+                continue
+
+            between: range = range(first_index + 1, index)
+            if (
+                _is_pure(node.values[first_index])
+                # Other keys could be equal to this one or unpack it
+                and all(isinstance(node.keys[i], ast.Constant) for i in between)
+                and (
+                    _is_pure(node.values[index])
+                    or all(_is_pure(node.values[i]) for i in between)
+                )
+            ):
+                node.values[first_index] = node.values[index]
+                indexes_to_remove.add(index)
+            else:
+                first_indexes[key.value] = index
+
+        if indexes_to_remove:
+            self._removed = True
+            node.keys = [
+                key for i, key in enumerate(node.keys) if i not in indexes_to_remove
+            ]
+            node.values = [
+                value
+                for i, value in enumerate(node.values)
+                if i not in indexes_to_remove
+            ]
+
+    def _remove_unused_locals(self, module: ast.Module) -> None:
+        for node in ast.walk(module):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                used_names: set[str] = get_used_names(node)
+                if used_names.isdisjoint(_LOCALS_READERS):
+                    self._remove_unused_assigns(node, used_names)
+
+            elif isinstance(node, ast.ExceptHandler) and node.name is not None:
+                # The name is deleted at the end of the handler
+                used_names = get_used_names(node)
+                if node.name not in used_names and used_names.isdisjoint(
+                    _LOCALS_READERS
+                ):
+                    node.name = None
+                    self._removed = True
+
+    def _remove_unused_assigns(self, node: ast.AST, used_names: set[str]) -> None:
+        for owner, field in _iter_bodies(node):
+            body: list[ast.stmt] = getattr(owner, field)
+            removed: bool = False
+            new_body: list[ast.stmt] = []
+            for statement in body:
+                if not _is_unused_assign(statement, used_names):
+                    new_body.append(statement)
+                    continue
+
+                removed = True
+                value: ast.expr | None = getattr(statement, "value", None)
+                # Only the name is unused, evaluating the value may do something
+                if value is not None and not _is_pure(value):
+                    new_body.append(ast.Expr(value))
+
+            if removed:
+                self._removed = True
+                _set_body(owner, field, new_body)
+
+        for child in ast.iter_child_nodes(node):
+            # Nested scopes are handled on their own
+            if not isinstance(
+                child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+            ):
+                self._remove_unused_assigns(child, used_names)
+
+    def _remove_useless_passes(self, module: ast.Module) -> None:
+        for node in ast.walk(module):
+            for owner, field in _iter_bodies(node):
+                body: list[ast.stmt] = getattr(owner, field)
+                if len(body) > 1 and any(isinstance(s, ast.Pass) for s in body):
+                    new_body = [s for s in body if not isinstance(s, ast.Pass)]
+                    setattr(owner, field, new_body or body[:1])
+                    self._removed = True
+
+
+class _AllNamesExcept:
+    """Contains every name but the given ones"""
+
+    __slots__ = ("names",)
+
+    def __init__(self, names: set[str]) -> None:
+        self.names: set[str] = names
+
+    def __contains__(self, name: object) -> bool:
+        return name not in self.names
+
+
+def remove_unused_code(
+    module: ast.Module, remove_all_unused_imports: bool = False
+) -> ast.Module:
+    return UnusedCodeRemover(remove_all_unused_imports).remove(module)
+
+
+def remove_newly_unused_imports(
+    module: ast.Module, names: set[str], remove_all_unused_imports: bool = False
+) -> bool:
+    """Removes imports of names that are no longer used, like after the code
+    using them was removed. Other unused imports are left as they are.
+    Returns True if any import was removed"""
+    newly_unused_names: set[str] = names - get_used_names(module)
+    if not newly_unused_names:
+        return False
+
+    remover = UnusedCodeRemover(remove_all_unused_imports)
+    remover._remove_unused_imports(module, _AllNamesExcept(newly_unused_names))
+
+    return remover._removed
+
+
+def _iter_bodies(node: ast.AST) -> Iterator[tuple[ast.AST, str]]:
+    """Yields node and name of each of its fields that is a list of statements"""
+    for field in ("body", "orelse", "finalbody"):
+        value = getattr(node, field, None)
+        if isinstance(value, list) and value and isinstance(value[0], ast.stmt):
+            yield node, field
+
+
+def _set_body(owner: ast.AST, field: str, body: list[ast.stmt]) -> None:
+    """Sets a list of statements, keeping it valid if it is now empty"""
+    if not body and field != "orelse" and not isinstance(owner, ast.Module):
+        body = [ast.Pass()]
+    setattr(owner, field, body)
+
+
+def get_used_names(node: ast.AST) -> set[str]:
+    """Returns names read or deleted anywhere in node, names in __all__,
+    and names in string annotations"""
+    used_names: set[str] = set()
+
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name):
+            if not isinstance(child.ctx, ast.Store):
+                used_names.add(child.id)
+
+        elif isinstance(child, (ast.Global, ast.Nonlocal)):
+            # Assigning these changes another scope
+            used_names.update(child.names)
+
+        elif isinstance(child, (ast.Assign, ast.AugAssign, ast.AnnAssign)):
+            targets: list[ast.expr] = (
+                child.targets if isinstance(child, ast.Assign) else [child.target]
+            )
+            if any(getattr(target, "id", "") == "__all__" for target in targets):
+                used_names.update(_get_string_constants(child.value))
+
+            if isinstance(child, ast.AnnAssign):
+                used_names.update(get_string_annotation_names(child.annotation))
+            elif isinstance(child, ast.AugAssign) and isinstance(
+                child.target, ast.Name
+            ):
+                # Reads the name before assigning it
+                used_names.add(child.target.id)
+
+        elif isinstance(child, ast.arg):
+            used_names.update(get_string_annotation_names(child.annotation))
+
+        elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            used_names.update(get_string_annotation_names(child.returns))
+
+    return used_names
+
+
+def _get_string_constants(node: ast.AST | None) -> Iterator[str]:
+    if node is not None:
+        for child in ast.walk(node):
+            if isinstance(child, ast.Constant) and isinstance(child.value, str):
+                yield child.value
+
+
+def get_string_annotation_names(annotation: ast.AST | None) -> set[str]:
+    names: set[str] = set()
+
+    for value in _get_string_constants(annotation):
+        try:
+            parsed: ast.AST = ast.parse(value.strip(), mode="eval")
+        except (SyntaxError, ValueError):
+            continue
+        names.update(
+            child.id for child in ast.walk(parsed) if isinstance(child, ast.Name)
+        )
+
+    return names
+
+
+def _is_unused_assign(node: ast.stmt, used_names: set[str]) -> bool:
+    if isinstance(node, ast.Assign):
+        if len(node.targets) != 1:
+            return False
+        target: ast.expr = node.targets[0]
+    elif isinstance(node, ast.AnnAssign) and node.value is not None:
+        target = node.target
+    else:
+        return False
+
+    if (
+        not isinstance(target, ast.Name)
+        or target.id in used_names
+        or node.value is None
+    ):
+        return False
+
+    # Values that bind names or suspend the function are needed even if unused
+    return not any(
+        isinstance(child, _NEEDED_VALUE_NODES) for child in ast.walk(node.value)
+    )
+
+
+def _is_pure(node: ast.expr | None) -> bool:
+    """Returns True if evaluating node can't do anything but fail"""
+    if isinstance(node, _PURE_NODES):
+        return True
+
+    if isinstance(node, (ast.Tuple, ast.List, ast.Set)):
+        return all(_is_pure(element) for element in node.elts)
+
+    return False
@@ -1,7 +1,32 @@
 import ast
-from typing import Iterable
+from typing import Iterable, Iterator
 
-from personal_python_ast_optimizer.parser.config import TokensToSkip
+from personal_python_ast_optimizer.parser.config import LOGGING_LEVELS, TokensToSkip
+from personal_python_ast_optimizer.stdlib import is_module_available
+
+_IMPORT_ERRORS: frozenset[str] = frozenset(("ImportError", "ModuleNotFoundError"))
+
+# Level each method of a logger logs at, other than log
+_LOGGING_METHOD_LEVELS: dict[str, int] = {
+    name.lower(): level for name, level in LOGGING_LEVELS.items() if name != "NOTSET"
+} | {"exception": LOGGING_LEVELS["ERROR"]}
+
+# Nodes whose effects are needed even if what they are in is never used
+_BINDING_NODES: tuple[type, ...] = (
+    ast.NamedExpr,
+    ast.Yield,
+    ast.YieldFrom,
+    ast.Await,
+)
+
+TRY_NODES: tuple[type, ...] = (ast.Try, getattr(ast, "TryStar", ast.Try))
+
+_SCOPE_NODES: tuple[type, ...] = (
+    ast.FunctionDef,
+    ast.AsyncFunctionDef,
+    ast.ClassDef,
+    ast.Lambda,
+)
 
 
 def can_skip_annotation_assign(
@@ -19,6 +44,154 @@ def get_node_name(node: object) -> str:
     return getattr(node, "id", "") or getattr(node, "attr", "")
 
 
+def get_dotted_name(node: object) -> str:
+    """Returns a name or dotted name like a.b.c that node is,
+    else an empty string"""
+    parts: list[str] = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return ""
+    parts.append(node.id)
+
+    return ".".join(reversed(parts))
+
+
+def iter_name_parts(node: object) -> Iterator[str]:
+    """Yields parts of a dotted name like a.b.c from last to first, the
+    function's name for calls. Stops at anything other than a name or attribute"""
+    if isinstance(node, ast.Call):
+        node = node.func
+    while isinstance(node, ast.Attribute):
+        yield node.attr
+        node = node.value
+    if isinstance(node, ast.Name):
+        yield node.id
+
+
+def get_names_read(nodes: Iterable[ast.AST]) -> Iterator[str]:
+    for node in nodes:
+        for child in ast.walk(node):
+            if isinstance(child, ast.Name) and not isinstance(child.ctx, ast.Store):
+                yield child.id
+
+
+def get_names_bound(nodes: Iterable[ast.AST]) -> Iterator[str]:
+    """Yields names nodes bind in the scope they are in, not those
+    bound within functions, classes, or lambdas they define"""
+    to_check: list[ast.AST] = list(nodes)
+    while to_check:
+        node: ast.AST = to_check.pop()
+        if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+            yield node.id
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                yield alias.asname or alias.name.split(".")[0]
+        elif isinstance(node, (ast.ExceptHandler, ast.MatchAs, ast.MatchStar)):
+            if node.name is not None:
+                yield node.name
+        elif isinstance(node, ast.MatchMapping) and node.rest is not None:
+            yield node.rest
+
+        if not isinstance(node, _SCOPE_NODES):
+            to_check.extend(ast.iter_child_nodes(node))
+            continue
+
+        name: str | None = getattr(node, "name", None)
+        if name is not None:
+            yield name
+        # Decorators, defaults and bases are evaluated in this scope
+        for field, value in ast.iter_fields(node):
+            if field != "body":
+                values: list = value if isinstance(value, list) else [value]
+                to_check.extend(v for v in values if isinstance(v, ast.AST))
+
+
+def has_scope_effects(
+    nodes: list[ast.stmt], kept_nodes: list[ast.stmt] | None = None
+) -> bool:
+    """Returns True if nodes change the scope they are in even if never run.
+    yield makes a function a generator, global and nonlocal change where
+    names of the whole scope are stored.
+
+    kept_nodes: code of the same function that is kept when nodes are removed.
+    A name bound anywhere in a function is local to all of it, so binding
+    one not bound in kept_nodes is an effect. None outside of functions,
+    where names are only looked up when read"""
+    to_check: list[ast.AST] = list(nodes)
+    while to_check:
+        node: ast.AST = to_check.pop()
+        if isinstance(node, (ast.Yield, ast.YieldFrom, ast.Global, ast.Nonlocal)):
+            return True
+        if not isinstance(node, _SCOPE_NODES):
+            to_check.extend(ast.iter_child_nodes(node))
+
+    if kept_nodes is None:
+        return False
+
+    kept_names: set[str] = set(get_names_bound(kept_nodes))
+    return any(name not in kept_names for name in get_names_bound(nodes))
+
+
+def get_logging_call_level(node: ast.Call, logger_names: TokensToSkip) -> int | None:
+    """Returns the level a call like logger.debug(...) or logger.log(logging.DEBUG,
+    ...) logs at, or None if it is not one or its level is not known"""
+    func: ast.expr = node.func
+    if not isinstance(func, ast.Attribute):
+        return None
+
+    level: int | None
+    if func.attr == "log" and node.args:
+        level_node: ast.expr = node.args[0]
+        level = (
+            level_node.value
+            if isinstance(level_node, ast.Constant) and type(level_node.value) is int
+            else LOGGING_LEVELS.get(get_node_name(level_node))
+        )
+    else:
+        level = _LOGGING_METHOD_LEVELS.get(func.attr)
+
+    if level is None or not logger_names.matches_parts(iter_name_parts(func.value)):
+        return None
+
+    return level
+
+
+def has_binding_effects(node: ast.AST) -> bool:
+    """Returns True if node binds a name or suspends its
+    function, which removing it would change"""
+    return any(isinstance(child, _BINDING_NODES) for child in ast.walk(node))
+
+
+def is_import_fallback(node: ast.Try, python_version: tuple[int, int]) -> bool:
+    """Returns True if node only imports modules that python_version always
+    has, with handlers of ImportError for when they are missing"""
+    return (
+        not node.finalbody
+        and all(
+            isinstance(statement, ast.Import)
+            and all(
+                is_module_available(alias.name, python_version)
+                for alias in statement.names
+            )
+            for statement in node.body
+        )
+        and all(
+            handler.type is not None
+            and all(
+                get_node_name(exception) in _IMPORT_ERRORS
+                for exception in (
+                    handler.type.elts
+                    if isinstance(handler.type, ast.Tuple)
+                    else [handler.type]
+                )
+            )
+            for handler in node.handlers
+        )
+    )
+
+
 def is_name_equals_main_node(node: ast.expr) -> bool:
     if not isinstance(node, ast.Compare):
         return False
@@ -55,9 +228,7 @@ def remove_empty_annotations(node: ast.FunctionDef) -> None:
     ]
 
 
-def skip_base_classes(
-    node: ast.ClassDef, classes_to_ignore: Iterable[str] | TokensToSkip
-) -> None:
+def skip_base_classes(node: ast.ClassDef, classes_to_ignore: Iterable[str]) -> None:
     node.bases = [
         base for base in node.bases if getattr(base, "id", "") not in classes_to_ignore
     ]
@@ -65,13 +236,22 @@ def skip_base_classes(
 
 def skip_decorators(
     node: ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef,
-    decorators_to_ignore: Iterable[str] | TokensToSkip,
+    decorators_to_ignore: TokensToSkip,
 ) -> None:
     node.decorator_list = [
-        n for n in node.decorator_list if get_node_name(n) not in decorators_to_ignore
+        n
+        for n in node.decorator_list
+        if not decorators_to_ignore.matches_parts(iter_name_parts(n))
     ]
 
 
+def fill_empty_finally(node: ast.AST) -> None:
+    """Adds pass to the finally of a try without handlers if skipping
+    left it empty, so the try is still valid"""
+    if not node.finalbody and not node.handlers:  # type: ignore
+        node.finalbody.append(ast.Pass())  # type: ignore
+
+
 def first_occurrence_of_type(data: list, target_type) -> int:
     for index, element in enumerate(data):
         if isinstance(element, target_type):
@@ -1,50 +0,0 @@
-"""Various tokens in Python that the ast module writes"""
-
-comparison_and_conjunctions: list[str] = [
-    " if ",
-    " else ",
-    " and ",
-    " or ",
-    " is ",
-    " is not ",
-    " in ",
-    " not in ",
-    " for ",
-    " async for ",
-]
-
-operators_and_separators: list[str] = [
-    ", ",
-    " = ",
-    " += ",
-    " -= ",
-    " *= ",
-    " **= ",
-    " /= ",
-    " //= ",
-    " %= ",
-    " <<= ",
-    " >>= ",
-    " |= ",
-    " &= ",
-    " := ",
-    ": ",
-    " == ",
-    " != ",
-    " < ",
-    " <= ",
-    " > ",
-    " >= ",
-    " + ",
-    " - ",
-    " * ",
-    " ** ",
-    " / ",
-    " // ",
-    " % ",
-    " << ",
-    " >> ",
-    " | ",
-    " & ",
-    " ^ ",
-]
@@ -0,0 +1,186 @@
+"""Long running minifier that answers requests of newline delimited JSON,
+so a build system pays for interpreter startup and imports only once.
+
+Each request is a JSON object on one line:
+    {"id": 1, "source": "a = 1", "config": {...}, "autoflake": false}
+config is optional and is either a dict of SkipConfig.from_dict arguments
+or the path of a JSON file of them. module_name may be given to override
+the config's module name. Each response is one line with the request's id
+and either "source" and "warnings" or "error".
+
+Run with python -m personal_python_ast_optimizer.server --help"""
+
+import argparse
+import copy
+import json
+import os
+import socketserver
+import sys
+import threading
+import warnings
+from typing import Any, TextIO
+
+from personal_python_ast_optimizer.flake_wrapper import run_autoflake
+from personal_python_ast_optimizer.parser.config import SkipConfig, SkipUsage
+from personal_python_ast_optimizer.parser.minifier import MinifyUnparser
+from personal_python_ast_optimizer.parser.run import run_minify_parser
+
+# Parsed configs kept before the least recently added is dropped
+_MAX_CACHED_CONFIGS: int = 128
+
+
+class MinifyServer:
+    """Answers minify requests, keeping configs parsed between requests.
+    Safe to call from many threads, though minifying is done one request
+    at a time since warnings are captured process wide"""
+
+    __slots__ = ("_configs", "_config_lock", "_minify_lock")
+
+    def __init__(self) -> None:
+        self._configs: dict[Any, SkipConfig] = {}
+        self._config_lock = threading.Lock()
+        self._minify_lock = threading.Lock()
+
+    def handle_line(self, line: str) -> str:
+        """Returns the response line to a request line"""
+        try:
+            request: Any = json.loads(line)
+        except ValueError as e:
+            return json.dumps({"id": None, "error": f"Invalid request: {e}"})
+
+        if not isinstance(request, dict):
+            return json.dumps({"id": None, "error": "Request must be an object"})
+
+        return json.dumps(self.handle_request(request))
+
+    def handle_request(self, request: dict[str, Any]) -> dict[str, Any]:
+        response: dict[str, Any] = {"id": request.get("id")}
+
+        try:
+            skip_config: SkipConfig | None = self.get_config(request.get("config"))
+            if skip_config is not None and "module_name" in request:
+                # Cached configs are shared by requests, so only read
+                skip_config = copy.copy(skip_config)
+                skip_config.module_name = request["module_name"]
+
+            skip_usage = SkipUsage()
+            with self._minify_lock, warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                source: str = run_minify_parser(
+                    MinifyUnparser(), request["source"], skip_config, skip_usage
+                )
+                if request.get("autoflake"):
+                    source = run_autoflake(
+                        source, request.get("remove_unused_imports", False)
+                    )
+        except Exception as e:
+            response["error"] = f"{type(e).__name__}: {e}"
+            return response
+
+        response["source"] = source
+        response["warnings"] = [str(warning.message) for warning in caught]
+        if skip_config is not None:
+            response["warnings"].extend(
+                f"{skip_config.module_name}: requested to skip "
+                f"{token_type} {', '.join(tokens)} but was not found"
+                for token_type, tokens in skip_usage.get_not_found_tokens(
+                    skip_config.tokens_to_skip_config
+                ).items()
+            )
+        return response
+
+    def get_config(self, reference: dict | str | None) -> SkipConfig | None:
+        """Returns the config a request refers to, parsing it only
+        the first time it is seen or after its file changed"""
+        if reference is None:
+            return None
+
+        key: Any
+        if isinstance(reference, str):
+            path: str = os.path.abspath(reference)
+            key = (path, os.stat(path).st_mtime_ns)
+        else:
+            key = json.dumps(reference, sort_keys=True)
+
+        with self._config_lock:
+            skip_config: SkipConfig | None = self._configs.get(key)
+        if skip_config is not None:
+            return skip_config
+
+        if isinstance(reference, str):
+            with open(reference, "r", encoding="utf-8") as fp:
+                skip_config = SkipConfig.from_dict(json.load(fp))
+        else:
+            skip_config = SkipConfig.from_dict(reference)
+
+        with self._config_lock:
+            if len(self._configs) >= _MAX_CACHED_CONFIGS:
+                del self._configs[next(iter(self._configs))]
+            self._configs[key] = skip_config
+
+        return skip_config
+
+
+def serve_stream(server: MinifyServer, input_stream: TextIO, output: TextIO) -> None:
+    """Answers each line of input_stream until it is closed"""
+    for line in input_stream:
+        if line.strip():
+            output.write(server.handle_line(line) + "\n")
+            output.flush()
+
+
+def create_unix_socket_server(
+    server: MinifyServer, path: str
+) -> socketserver.ThreadingUnixStreamServer:
+    """Returns a server listening on a Unix socket at path that answers
+    each client on its own thread once served"""
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            for line in self.rfile:
+                if line.strip():
+                    response: str = server.handle_line(line.decode("utf-8"))
+                    self.wfile.write(response.encode("utf-8") + b"\n")
+
+    if os.path.exists(path):
+        os.remove(path)
+
+    socket_server = socketserver.ThreadingUnixStreamServer(path, Handler)
+    socket_server.daemon_threads = True
+
+    return socket_server
+
+
+def serve_unix_socket(server: MinifyServer, path: str) -> None:
+    """Answers clients of a Unix socket at path, each on its own thread,
+    until interrupted"""
+    with create_unix_socket_server(server, path) as socket_server:
+        try:
+            socket_server.serve_forever()
+        finally:
+            os.remove(path)
+
+
+def main(argv: list[str] | None = None) -> int:
+    arg_parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    arg_parser.add_argument(
+        "--socket", help="path of a Unix socket to listen on instead of stdin"
+    )
+    args = arg_parser.parse_args(argv)
+
+    server = MinifyServer()
+    if args.socket:
+        try:
+            serve_unix_socket(server, args.socket)
+        except KeyboardInterrupt:
+            pass
+    else:
+        serve_stream(server, sys.stdin, sys.stdout)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
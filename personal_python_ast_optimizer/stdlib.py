@@ -0,0 +1,31 @@
+modules_to_added_version: dict[str, tuple[int, int]] = {
+    "concurrent.futures": (3, 2),
+    "faulthandler": (3, 3),
+    "ipaddress": (3, 3),
+    "unittest.mock": (3, 3),
+    "asyncio": (3, 4),
+    "enum": (3, 4),
+    "pathlib": (3, 4),
+    "selectors": (3, 4),
+    "statistics": (3, 4),
+    "tracemalloc": (3, 4),
+    "typing": (3, 5),
+    "zipapp": (3, 5),
+    "secrets": (3, 6),
+    "contextvars": (3, 7),
+    "dataclasses": (3, 7),
+    "importlib.resources": (3, 7),
+    "importlib.metadata": (3, 8),
+    "graphlib": (3, 9),
+    "zoneinfo": (3, 9),
+    "tomllib": (3, 11),
+}
+
+
+def is_module_available(module_name: str, python_version: tuple[int, int]) -> bool:
+    """Returns if module is always importable in provided python version.
+    Only modules added to the standard library since python 3.0, that are
+    not optional when building python, and were not removed are known"""
+    added_version: tuple[int, int] | None = modules_to_added_version.get(module_name)
+
+    return added_version is not None and python_version >= added_version
@@ -0,0 +1,88 @@
+import importlib.util
+import sys
+from importlib.machinery import SourceFileLoader, SourcelessFileLoader
+from py_compile import PycInvalidationMode
+from types import ModuleType
+
+import pytest
+from personal_python_ast_optimizer.parser.config import SkipConfig, TokensToSkipConfig
+from personal_python_ast_optimizer.parser.run import run_minify_parser_to_pyc
+
+_source: str = """
+def foo():
+    return 1
+
+def bar():
+    return 2
+"""
+
+
+def _get_skip_config() -> SkipConfig:
+    return SkipConfig(tokens_to_skip_config=TokensToSkipConfig(functions={"foo"}))
+
+
+def _load_module(loader) -> ModuleType:
+    spec = importlib.util.spec_from_loader("minified", loader)
+    assert spec is not None
+    module: ModuleType = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize(
+    "invalidation_mode",
+    [PycInvalidationMode.TIMESTAMP, PycInvalidationMode.CHECKED_HASH],
+)
+def test_pyc_used_over_source(tmp_path, invalidation_mode: PycInvalidationMode):
+    source_path: str = str(tmp_path / "minified.py")
+    with open(source_path, "w") as fp:
+        fp.write(_source)
+
+    run_minify_parser_to_pyc(
+        _source,
+        importlib.util.cache_from_source(source_path),
+        _get_skip_config(),
+        source_path=source_path,
+        invalidation_mode=invalidation_mode,
+    )
+    module: ModuleType = _load_module(SourceFileLoader("minified", source_path))
+
+    assert not hasattr(module, "foo")
+    assert module.bar() == 2
+
+
+def test_pyc_without_source(tmp_path):
+    pyc_path: str = str(tmp_path / "minified.pyc")
+    run_minify_parser_to_pyc(
+        _source,
+        pyc_path,
+        _get_skip_config(),
+        invalidation_mode=PycInvalidationMode.UNCHECKED_HASH,
+    )
+    module: ModuleType = _load_module(SourcelessFileLoader("minified", pyc_path))
+
+    assert not hasattr(module, "foo")
+    assert module.bar() == 2
+
+
+def test_pyc_with_minified_source(tmp_path):
+    minified_path: str = str(tmp_path / "minified.py")
+    run_minify_parser_to_pyc(
+        _source,
+        importlib.util.cache_from_source(minified_path),
+        _get_skip_config(),
+        minified_path=minified_path,
+    )
+
+    with open(minified_path) as fp:
+        assert fp.read() == "def bar():return 2"
+    assert _load_module(SourceFileLoader("minified", minified_path)).bar() == 2
+
+
+def test_pyc_for_other_python_version(tmp_path):
+    with pytest.raises(ValueError):
+        run_minify_parser_to_pyc(
+            _source,
+            str(tmp_path / "minified.pyc"),
+            SkipConfig(target_python_version=(3, sys.version_info[1] - 1)),
+        )
@@ -0,0 +1,81 @@
+import os
+
+from personal_python_ast_optimizer.parser.cache import (
+    CachedMinify,
+    MinifyCache,
+    get_config_fingerprint,
+)
+from personal_python_ast_optimizer.parser.config import SkipConfig, TokensToSkipConfig
+from personal_python_ast_optimizer.parser.project import minify_project
+
+
+def test_config_fingerprint():
+    fingerprint: str = get_config_fingerprint(
+        SkipConfig(
+            constant_vars_to_fold={"A": 1, "B": "1"},
+            tokens_to_skip_config=TokensToSkipConfig(functions={"foo", "bar"}),
+        )
+    )
+
+    assert fingerprint == get_config_fingerprint(
+        SkipConfig(
+            constant_vars_to_fold={"B": "1", "A": 1},
+            tokens_to_skip_config=TokensToSkipConfig(functions={"bar", "foo"}),
+        )
+    )
+    assert fingerprint != get_config_fingerprint(
+        SkipConfig(
+            constant_vars_to_fold={"A": "1", "B": "1"},
+            tokens_to_skip_config=TokensToSkipConfig(functions={"foo", "bar"}),
+        )
+    )
+    assert fingerprint != get_config_fingerprint(None)
+
+
+def test_get_and_put(tmp_path):
+    cache = MinifyCache(str(tmp_path))
+    key: str = cache.get_key("a = 1", get_config_fingerprint(None))
+
+    assert key != cache.get_key("a = 2", get_config_fingerprint(None))
+    assert cache.get(key) is None
+
+    cache.put(key, CachedMinify("a=1", ["some warning"]))
+    cached_minify: CachedMinify | None = cache.get(key)
+
+    assert cached_minify is not None
+    assert cached_minify.source == "a=1"
+    assert cached_minify.warnings == ["some warning"]
+
+
+def test_prune_least_recently_used(tmp_path):
+    cache = MinifyCache(str(tmp_path))
+    keys: list[str] = [cache.get_key(str(i), "") for i in range(3)]
+
+    for last_used, key in enumerate(keys):
+        cache.put(key, CachedMinify("", []))
+        path: str = os.path.join(str(tmp_path), key[:2], key)
+        os.utime(path, (last_used, last_used))
+
+    # Room for one entry, since all are the same size
+    cache.max_size = os.path.getsize(path) * 3 // 2
+    cache.prune()
+
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) is not None
+
+
+def test_minify_project_with_cache(tmp_path):
+    source_dir: str = str(tmp_path / "src")
+    os.makedirs(source_dir)
+    with open(os.path.join(source_dir, "a.py"), "w") as fp:
+        fp.write("a = 1")
+
+    cache = MinifyCache(str(tmp_path / "cache"))
+    first_results = minify_project(source_dir, str(tmp_path / "out"), cache=cache)
+    second_results = minify_project(source_dir, str(tmp_path / "out"), cache=cache)
+
+    assert not first_results[0].from_cache
+    assert second_results[0].from_cache
+    with open(os.path.join(str(tmp_path / "out"), "a.py")) as fp:
+        assert fp.read() == "a=1"
@@ -27,3 +27,21 @@ class SomeTuple:
 """.strip(),
     )
     run_minifiyer_and_assert_correct(before_and_after)
+
+
+def test_nested_class_annotations():
+    before_and_after = BeforeAndAfter(
+        """
+class Foo:
+    class Bar:
+        thing1: str
+    thing2: int
+""",
+        """
+class Foo:
+\tclass Bar:
+\t\tthing1:'Any'
+\tthing2:'Any'
+""".strip(),
+    )
+    run_minifiyer_and_assert_correct(before_and_after)
@@ -1,6 +1,7 @@
 import sys
 
 import pytest
+from personal_python_ast_optimizer.parser.config import ExtrasToSkipConfig
 
 from tests.utils import BeforeAndAfter, run_minifiyer_and_assert_correct
 
@@ -68,3 +69,56 @@ def test_exclude_name_equals_main(before_and_after: BeforeAndAfter):
         before_and_after,
         constant_vars_to_fold={"FAVORITE_NUMBER": 6, "TEST": "test"},
     )
+
+
+_constant_expression_cases = [
+    BeforeAndAfter("a = DEBUG and x", "a=False"),
+    BeforeAndAfter("a = not DEBUG and x", "a=x"),
+    BeforeAndAfter("a = x or DEBUG or y", "a=x or y"),
+    BeforeAndAfter("a = x and DEBUG and y", "a=x and False"),
+    BeforeAndAfter("a = SIZE * 4 + 1", "a=33"),
+    BeforeAndAfter("a = -SIZE - 1", "a=-9"),
+    BeforeAndAfter("a = x * -SIZE", "a=x*-8"),
+    BeforeAndAfter("a = (SIZE - 10) ** 2", "a=4"),
+    BeforeAndAfter("a = 'v' + VERSION", "a='v1.2'"),
+    BeforeAndAfter("a = MODE == 'prod'", "a=True"),
+    BeforeAndAfter("a = 0 < SIZE < 10 != x", "a=0<8<10!=x"),
+    BeforeAndAfter("a = 1 if MODE != 'prod' else x", "a=x"),
+    BeforeAndAfter("a = f'v{VERSION}'", "a='v1.2'"),
+    BeforeAndAfter("a = f'{SIZE:03d}-{x}-{VERSION!r}'", "a=f\"008-{x}-'1.2'\""),
+    BeforeAndAfter("a = f'{MODE:>8}{SIZE:.2f}'", "a='    prod8.00'"),
+    BeforeAndAfter("a = f'{SIZE:>300000000}'", "a=f'{8:>300000000}'"),
+    BeforeAndAfter("a = f'{SIZE:.3000000000f}'", "a=f'{8:.3000000000f}'"),
+    BeforeAndAfter("a = 1 / 0", "a=1/0"),
+    BeforeAndAfter("a = 'x' * 10 ** 9", "a='x'*1000000000"),
+    BeforeAndAfter("a = 2 ** 1000", "a=2**1000"),
+    BeforeAndAfter("a = 1 << 1000", "a=1<<1000"),
+    BeforeAndAfter("a = '%s' % MODE", "a='%s'%'prod'"),
+    BeforeAndAfter("a = (1, 2) + (3,)", "a=(1,2)+(3,)"),
+    BeforeAndAfter("a = MODE is 'prod'", "a='prod'is 'prod'"),
+]
+
+
+@pytest.mark.parametrize("before_and_after", _constant_expression_cases)
+def test_constant_expressions(before_and_after: BeforeAndAfter):
+    run_minifiyer_and_assert_correct(
+        before_and_after,
+        constant_vars_to_fold={
+            "DEBUG": False,
+            "SIZE": 8,
+            "VERSION": "1.2",
+            "MODE": "prod",
+        },
+        extras_to_skip_config=ExtrasToSkipConfig(skip_constant_expressions=True),
+    )
+
+
+def test_format_spec_not_folded_for_older_target():
+    before_and_after = BeforeAndAfter("a = f'{SIZE:03d}'", "a=f'{8:03d}'")
+
+    run_minifiyer_and_assert_correct(
+        before_and_after,
+        target_python_version=(3, 0),
+        constant_vars_to_fold={"SIZE": 8},
+        extras_to_skip_config=ExtrasToSkipConfig(skip_constant_expressions=True),
+    )
@@ -0,0 +1,236 @@
+import pytest
+from personal_python_ast_optimizer.parser.config import ExtrasToSkipConfig, SkipConfig
+from personal_python_ast_optimizer.parser.minifier import MinifyUnparser
+from personal_python_ast_optimizer.parser.run import (
+    run_fused_minify_parser,
+    run_minify_parser,
+)
+
+from tests.utils import BeforeAndAfter
+
+_expand_config = SkipConfig(
+    extras_to_skip_config=ExtrasToSkipConfig(expand_dataclasses=True)
+)
+
+_dataclass_source: str = """
+import dataclasses
+from dataclasses import dataclass, field
+
+@dataclass
+class Point:
+    x: int
+    y: int = 0
+    tags: list = field(default_factory=list)
+    seen: int = field(default=0, compare=False, repr=False)
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Frozen:
+    a: int
+    b: str = "b"
+
+@dataclass(unsafe_hash=True)
+class Hashed:
+    a: int
+    b: int = field(default=0, compare=False)
+
+@dataclass(slots=True)
+class Slotted:
+    a: int
+    b: tuple = (1, -2)
+    def __post_init__(self):
+        self.a += 1
+"""
+
+_expansion_cases = [
+    (
+        BeforeAndAfter(
+            """
+from dataclasses import dataclass, field
+@dataclass
+class A:
+    x: int
+    y: int = 1
+    z: list = field(default_factory=list, repr=False)
+""",
+            "class A:\n\ty=1;__dataclass_missing__=object()"
+            "\n\tdef __init__(self,x,y=y,z=__dataclass_missing__):"
+            "\n\t\tself.x=x;self.y=y"
+            ";self.z=list()if z is __class__.__dataclass_missing__ else z"
+            "\n\tdef __repr__(self):return "
+            "f'{self.__class__.__qualname__}(x={self.x!r}, y={self.y!r})'"
+            "\n\tdef __eq__(self,other):"
+            "\n\t\tif other.__class__ is self.__class__:"
+            "return (self.x,self.y,self.z)==(other.x,other.y,other.z)"
+            "\n\t\treturn NotImplemented"
+            "\n\t__hash__=None;__match_args__=('x','y','z')",
+        ),
+        _expand_config,
+    ),
+    (
+        BeforeAndAfter(
+            """
+import dataclasses
+@dataclasses.dataclass(eq=False, repr=False, match_args=False, slots=True)
+class A:
+    x: int = 1
+    def __init__(self):
+        pass
+""",
+            "class A:\n\tx=1\n\tdef __init__(self):pass\n\t__slots__=('x',)\n\tdel x",
+        ),
+        _expand_config,
+    ),
+    (
+        BeforeAndAfter(
+            """
+from dataclasses import dataclass
+@dataclass(init=False, repr=False, frozen=True)
+class A:
+    pass
+""",
+            "class A:\n\tdef __eq__(self,other):"
+            "\n\t\tif self is other:return True"
+            "\n\t\tif other.__class__ is self.__class__:return True"
+            "\n\t\treturn NotImplemented"
+            "\n\tdef __hash__(self):return hash(())"
+            "\n\tdef __setattr__(self,name,value):"
+            "\n\t\tif type(self)is __class__:"
+            "\n\t\t\tfrom dataclasses import FrozenInstanceError"
+            "\n\t\t\traise FrozenInstanceError(f'cannot assign to field {name!r}')"
+            "\n\t\tsuper().__setattr__(name,value)"
+            "\n\tdef __delattr__(self,name):"
+            "\n\t\tif type(self)is __class__:"
+            "\n\t\t\tfrom dataclasses import FrozenInstanceError"
+            "\n\t\t\traise FrozenInstanceError(f'cannot delete field {name!r}')"
+            "\n\t\tsuper().__delattr__(name)"
+            "\n\t__match_args__=()",
+        ),
+        SkipConfig(
+            target_python_version=(3, 13),
+            extras_to_skip_config=ExtrasToSkipConfig(expand_dataclasses=True),
+        ),
+    ),
+    # Left as is, but keeping fields
+    (
+        BeforeAndAfter(
+            """
+from dataclasses import dataclass, field
+from typing import ClassVar
+@dataclass(order=True)
+class A:
+    x: int = 1
+@dataclass
+class B(A):
+    y: int = 2
+@dataclass
+class C:
+    x: ClassVar[int] = 1
+@dataclass
+class D:
+    x: list = field(default_factory=lambda: [1])
+@dataclass
+class E:
+    x: int = 1
+    y: int
+""",
+            "from dataclasses import dataclass,field\n"
+            "@dataclass(order=True)\nclass A:\n\tx:'Any'=1\n"
+            "@dataclass\nclass B(A):\n\ty:'Any'=2\n"
+            "@dataclass\nclass C:\n\tx:'Any'=1\n"
+            "@dataclass\nclass D:\n\tx:'Any'=field(default_factory=lambda:[1])\n"
+            "@dataclass\nclass E:\n\tx:'Any'=1\n\ty:'Any'",
+        ),
+        _expand_config,
+    ),
+    # Subclasses read fields of dataclasses they inherit from
+    (
+        BeforeAndAfter(
+            """
+from dataclasses import dataclass
+@dataclass
+class A:
+    x: int
+@dataclass
+class B(A):
+    y: int = 0
+""",
+            "from dataclasses import dataclass\n"
+            "@dataclass\nclass A:\n\tx:'Any'\n"
+            "@dataclass\nclass B(A):\n\ty:'Any'=0",
+        ),
+        _expand_config,
+    ),
+    (
+        BeforeAndAfter(
+            """
+from dataclasses import asdict, dataclass
+@dataclass
+class A:
+    x: int = 1
+""",
+            "from dataclasses import asdict,dataclass\n"
+            "@dataclass\nclass A:\n\tx:'Any'=1",
+        ),
+        _expand_config,
+    ),
+]
+
+
+@pytest.mark.parametrize("fused", [False, True])
+@pytest.mark.parametrize("before_and_after,skip_config", _expansion_cases)
+def test_expand_dataclasses(
+    before_and_after: BeforeAndAfter, skip_config: SkipConfig, fused: bool
+):
+    minified: str = (
+        run_fused_minify_parser(before_and_after.before, skip_config)
+        if fused
+        else run_minify_parser(MinifyUnparser(), before_and_after.before, skip_config)
+    )
+
+    assert minified == before_and_after.after
+
+
+@pytest.mark.parametrize("skip_type_hints", [False, True])
+def test_expanded_dataclasses_behave_the_same(skip_type_hints: bool):
+    skip_config = SkipConfig(
+        extras_to_skip_config=ExtrasToSkipConfig(
+            skip_type_hints=skip_type_hints, expand_dataclasses=True
+        )
+    )
+    minified: str = run_minify_parser(MinifyUnparser(), _dataclass_source, skip_config)
+    assert "dataclass(" not in minified
+
+    original_globals: dict = {}
+    exec(_dataclass_source, original_globals)
+    minified_globals: dict = {}
+    exec(minified, minified_globals)
+
+    for name, args in (
+        ("Point", (1,)),
+        ("Point", (1, 2, [3], 4)),
+        ("Frozen", (1,)),
+        ("Hashed", (1, 2)),
+        ("Slotted", (1, (2,))),
+    ):
+        original = original_globals[name](*args)
+        expanded = minified_globals[name](*args)
+
+        assert repr(original) == repr(expanded)
+        assert original == original_globals[name](*args)
+        assert expanded == minified_globals[name](*args)
+        assert original_globals[name].__match_args__ == (
+            minified_globals[name].__match_args__
+        )
+
+    assert minified_globals["Point"](1).tags is not minified_globals["Point"](1).tags
+    assert minified_globals["Point"](1, seen=1) == minified_globals["Point"](1)
+    for name in ("Frozen", "Hashed"):
+        assert hash(original_globals[name](1)) == hash(minified_globals[name](1))
+    assert minified_globals["Slotted"].__slots__ == ("a", "b")
+
+    frozen = minified_globals["Frozen"](1)
+    with pytest.raises(AttributeError, match="cannot assign to field 'a'"):
+        frozen.a = 2
+    copied = minified_globals["Frozen"].__new__(minified_globals["Frozen"])
+    copied.__setstate__(frozen.__getstate__())
+    assert copied == frozen
@@ -0,0 +1,146 @@
+import pytest
+from personal_python_ast_optimizer.parser.config import ExtrasToSkipConfig, SkipConfig
+from personal_python_ast_optimizer.parser.run import run_fused_minify_parser
+
+from tests.utils import BeforeAndAfter, run_minifiyer_and_assert_correct
+
+_constant_vars_to_fold: dict[str, int | str] = {"DEBUG": False, "MODE": "prod"}
+
+_dead_branch_cases = [
+    BeforeAndAfter(
+        """
+if DEBUG:
+    a = 1
+b = 2
+""",
+        "b=2",
+    ),
+    BeforeAndAfter(
+        """
+if MODE == "prod":
+    a = 1
+    if not DEBUG:
+        b = 2
+else:
+    c = 3
+""",
+        "a=1;b=2",
+    ),
+    BeforeAndAfter(
+        """
+if x:
+    a = 1
+elif DEBUG:
+    b = 2
+elif y:
+    c = 3
+else:
+    d = 4
+""",
+        "if x:a=1\nelif y:c=3\nelse:d=4",
+    ),
+    BeforeAndAfter(
+        """
+def foo():
+    if DEBUG:
+        return 1
+""",
+        "def foo():pass",
+    ),
+    BeforeAndAfter(
+        """
+while 0:
+    a = 1
+else:
+    b = 2
+while DEBUG:
+    c = 3
+""",
+        "b=2",
+    ),
+    BeforeAndAfter(
+        """
+def foo():
+    if DEBUG:
+        yield 1
+    while False:
+        global a
+""",
+        "def foo():\n\tif False:\n\t\tyield 1\n\twhile False:\n\t\tglobal a",
+    ),
+    # Names bound anywhere in a function are local to all of it
+    BeforeAndAfter(
+        """
+def foo():
+    if DEBUG:
+        import os
+        a = 1
+    else:
+        a = 2
+    return os, a
+""",
+        "def foo():\n\tif False:\n\t\timport os\n\t\ta=1"
+        "\n\telse:a=2\n\treturn (os,a)",
+    ),
+    BeforeAndAfter(
+        """
+def foo():
+    if DEBUG:
+        a = 1
+    else:
+        a = 2
+    return a
+""",
+        "def foo():\n\ta=2;return a",
+    ),
+    BeforeAndAfter("a = 1 if DEBUG else 2", "a=2"),
+]
+
+
+@pytest.mark.parametrize("before_and_after", _dead_branch_cases)
+def test_dead_branches(before_and_after: BeforeAndAfter):
+    run_minifiyer_and_assert_correct(
+        before_and_after,
+        constant_vars_to_fold=_constant_vars_to_fold,
+        extras_to_skip_config=ExtrasToSkipConfig(skip_constant_expressions=True),
+    )
+
+
+_pruned_imports_source: str = """
+import os
+import json
+import numpy
+if DEBUG:
+    print(os.getcwd(), json, numpy)
+print(os.sep)
+"""
+
+
+@pytest.mark.parametrize(
+    "skip_all_unused_imports,expected",
+    [
+        (False, "import os\nimport numpy\nprint(os.sep)"),
+        (True, "import os\nprint(os.sep)"),
+    ],
+)
+def test_imports_of_dead_branches(skip_all_unused_imports: bool, expected: str):
+    run_minifiyer_and_assert_correct(
+        BeforeAndAfter(_pruned_imports_source, expected),
+        constant_vars_to_fold=_constant_vars_to_fold,
+        extras_to_skip_config=ExtrasToSkipConfig(
+            skip_constant_expressions=True,
+            skip_all_unused_imports=skip_all_unused_imports,
+        ),
+    )
+
+
+def test_imports_of_dead_branches_fused():
+    skip_config = SkipConfig(
+        constant_vars_to_fold=_constant_vars_to_fold,
+        extras_to_skip_config=ExtrasToSkipConfig(skip_constant_expressions=True),
+    )
+
+    assert (
+        run_fused_minify_parser(_pruned_imports_source, skip_config)
+        == "import os\nimport numpy\nprint(os.sep)"
+    )
@@ -0,0 +1,170 @@
+import pytest
+from personal_python_ast_optimizer.parser.config import ExtrasToSkipConfig, SkipConfig
+from personal_python_ast_optimizer.parser.minifier import MinifyUnparser
+from personal_python_ast_optimizer.parser.run import (
+    run_fused_minify_parser,
+    run_minify_parser,
+)
+
+from tests.utils import BeforeAndAfter
+
+_fold_config = SkipConfig(
+    target_python_version=(3, 11),
+    extras_to_skip_config=ExtrasToSkipConfig(fold_enums=True),
+)
+
+_enum_cases = [
+    (
+        BeforeAndAfter(
+            """
+from enum import StrEnum
+class _Formats(StrEnum):
+    \"\"\"Formats images are saved as\"\"\"
+    PNG = "png"
+    JPEG = "jpeg"
+    JPG = "jpeg"
+def save(path, image_format=_Formats.PNG.value):
+    if image_format == _Formats.JPG:
+        return path + _Formats.JPEG.value, _Formats.JPG.name
+    return f"{path}.{image_format.upper()}"
+""",
+            "def save(path,image_format='png'):"
+            "\n\tif image_format=='jpeg':return (path+'jpeg','JPEG')"
+            "\n\treturn f'{path}.{image_format.upper()}'",
+        ),
+        _fold_config,
+    ),
+    (
+        BeforeAndAfter(
+            """
+import enum
+class _Level(enum.IntEnum):
+    LOW = 1
+    HIGH = 2
+class _Listed(enum.IntEnum):
+    A = 1
+class _Same(enum.IntEnum):
+    A = 1
+__all__ = ["Public", "level"]
+class Public(enum.IntEnum):
+    A = 1
+def level(x):
+    return _Level.HIGH.bit_length(), list(_Listed), x is _Same.A, Public.A
+""",
+            "import enum\nclass _Listed(enum.IntEnum):A=1\n"
+            "class _Same(enum.IntEnum):A=1\n__all__=['Public','level']\n"
+            "class Public(enum.IntEnum):A=1\n"
+            "def level(x):return (2 .bit_length(),list(_Listed),x is _Same.A,Public.A)",
+        ),
+        _fold_config,
+    ),
+    # Members that reach other code could be told from their values there
+    (
+        BeforeAndAfter(
+            """
+from enum import StrEnum
+class _Color(StrEnum):
+    RED = "red"
+current = _Color.RED
+def describe(c):
+    return c.name
+print(describe(current))
+""",
+            "from enum import StrEnum\nclass _Color(StrEnum):RED='red'\n"
+            "current=_Color.RED\ndef describe(c):return c.name\n"
+            "print(describe(current))",
+        ),
+        _fold_config,
+    ),
+    # repr() and attributes of members differ from those of their values
+    (
+        BeforeAndAfter(
+            """
+from enum import StrEnum
+class _Color(StrEnum):
+    RED = "red"
+class _Shown(StrEnum):
+    RED = "red"
+class _Named(StrEnum):
+    RED = "red"
+print(f"{_Color.RED!a}", "{!r}".format(_Shown.RED), "{0.name}".format(_Named.RED))
+print(f"{_Color.RED!s}", "{:>5}".format(_Shown.RED))
+""",
+            "from enum import StrEnum\nclass _Color(StrEnum):RED='red'\n"
+            "class _Shown(StrEnum):RED='red'\nclass _Named(StrEnum):RED='red'\n"
+            "print(f'{_Color.RED!a}','{!r}'.format(_Shown.RED),"
+            "'{0.name}'.format(_Named.RED))\n"
+            "print(f'{_Color.RED!s}','{:>5}'.format(_Shown.RED))",
+        ),
+        _fold_config,
+    ),
+    (
+        BeforeAndAfter(
+            """
+from enum import IntEnum
+class _Level(IntEnum):
+    LOW = 1
+print(f"{_Level.LOW!s}", "{0:>{1}} {x}".format(_Level.LOW, 5, x=1))
+""",
+            "print(f'{1!s}','{0:>{1}} {x}'.format(1,5,x=1))",
+        ),
+        _fold_config,
+    ),
+    # Before 3.11 str() of IntEnum members gave their names
+    (
+        BeforeAndAfter(
+            """
+from enum import IntEnum
+class _Level(IntEnum):
+    LOW = 1
+print(_Level.LOW)
+""",
+            "from enum import IntEnum\nclass _Level(IntEnum):LOW=1\nprint(_Level.LOW)",
+        ),
+        SkipConfig(extras_to_skip_config=ExtrasToSkipConfig(fold_enums=True)),
+    ),
+    # Public enums may be imported by other modules
+    (
+        BeforeAndAfter(
+            """
+from enum import StrEnum
+class Formats(StrEnum):
+    PNG = "png"
+print(Formats.PNG)
+""",
+            "from enum import StrEnum\nclass Formats(StrEnum):PNG='png'\n"
+            "print(Formats.PNG)",
+        ),
+        _fold_config,
+    ),
+    (
+        BeforeAndAfter(
+            """
+from constants import Formats, other
+print(Formats.PNG, constants.Formats.PNG.value)
+""",
+            "from constants import other\nprint('png','png')",
+        ),
+        SkipConfig(
+            constant_vars_to_fold={
+                "Formats.PNG": "png",
+                "constants.Formats.PNG.value": "png",
+            },
+            definitions_to_skip={"Formats"},
+        ),
+    ),
+]
+
+
+@pytest.mark.parametrize("fused", [False, True])
+@pytest.mark.parametrize("before_and_after,skip_config", _enum_cases)
+def test_fold_enums(
+    before_and_after: BeforeAndAfter, skip_config: SkipConfig, fused: bool
+):
+    minified: str = (
+        run_fused_minify_parser(before_and_after.before, skip_config)
+        if fused
+        else run_minify_parser(MinifyUnparser(), before_and_after.before, skip_config)
+    )
+
+    assert minified == before_and_after.after
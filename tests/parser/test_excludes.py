@@ -1,8 +1,15 @@
 import pytest
 from personal_python_ast_optimizer.parser.config import (
     SectionsToSkipConfig,
+    SkipConfig,
+    SkipUsage,
     TokensToSkipConfig,
 )
+from personal_python_ast_optimizer.parser.minifier import MinifyUnparser
+from personal_python_ast_optimizer.parser.run import (
+    run_fused_minify_parser,
+    run_minify_parser,
+)
 
 from tests.utils import BeforeAndAfter, run_minifiyer_and_assert_correct
 
@@ -42,8 +49,8 @@ class B:
 
 def test_exclude_dict_keys():
     before_and_after = BeforeAndAfter(
-        "a = {'a': 1, 'b': 2}",
-        "a={'a':1}",
+        "a = {'a': 1, 'b': 2, **c, **d}",
+        "a={'a':1,**c,**d}",
     )
     run_minifiyer_and_assert_correct(
         before_and_after,
@@ -208,3 +215,168 @@ is_cid = re.compile('').match
             functions={"getLogger"}, variables={"TYPE_CHECKING"}
         ),
     )
+
+
+_exclude_dotted_name_cases = [
+    BeforeAndAfter(
+        """
+settings.debug.flag = True
+other.debug.flag = True
+self.settings.debug.flag = True
+settings.debug.flag.level = 1
+""",
+        "other.debug.flag=True",
+    ),
+    BeforeAndAfter(
+        """
+logging.Logger.debug('a')
+logger.debug('a')
+x = logging.Logger.debug('a')
+""",
+        "logger.debug('a')",
+    ),
+    BeforeAndAfter(
+        """
+class Class:
+    def method(self):
+        pass
+    def other(self):
+        pass
+class Other:
+    def method(self):
+        pass
+""",
+        "class Class:\n\tdef other(self):pass\nclass Other:\n\tdef method(self):pass",
+    ),
+    BeforeAndAfter(
+        """
+@app.route('/')
+@route('/')
+def foo():
+    pass
+""",
+        "@route('/')\ndef foo():pass",
+    ),
+]
+
+
+@pytest.mark.parametrize("before_and_after", _exclude_dotted_name_cases)
+def test_exclude_dotted_names(before_and_after: BeforeAndAfter):
+    run_minifiyer_and_assert_correct(
+        before_and_after,
+        tokens_to_skip_config=TokensToSkipConfig(
+            variables={"settings.debug.flag"},
+            functions={"logging.Logger.debug", "Class.method"},
+            decorators={"app.route"},
+            # Each case only has some of them
+            no_warn={
+                "settings.debug.flag",
+                "logging.Logger.debug",
+                "Class.method",
+                "app.route",
+            },
+        ),
+    )
+
+
+@pytest.mark.parametrize("fused", [False, True])
+def test_exclude_module_qualified_names(fused: bool):
+    source: str = """
+class Class:
+    def method(self):
+        pass
+def method():
+    pass
+"""
+    skip_config = SkipConfig(
+        "pkg.mod",
+        tokens_to_skip_config=TokensToSkipConfig(
+            functions={"pkg.mod.Class.method"}, classes={"other.Class"}
+        ),
+    )
+    skip_usage = SkipUsage()
+
+    minified: str = (
+        run_fused_minify_parser(source, skip_config, skip_usage)
+        if fused
+        else run_minify_parser(MinifyUnparser(), source, skip_config, skip_usage)
+    )
+
+    assert minified == "class Class:pass\ndef method():pass"
+    assert skip_usage.found_counts == {"functions": {"pkg.mod.Class.method": 1}}
+
+
+@pytest.mark.parametrize("fused", [False, True])
+def test_exclude_module_qualified_base_classes(fused: bool):
+    source: str = """
+class Base:
+    pass
+class Child(Base):
+    pass
+class Other(other.Base):
+    pass
+def f():
+    class Inner(Base):
+        pass
+"""
+    skip_config = SkipConfig(
+        "mod", tokens_to_skip_config=TokensToSkipConfig(classes={"mod.Base"})
+    )
+
+    minified: str = (
+        run_fused_minify_parser(source, skip_config)
+        if fused
+        else run_minify_parser(MinifyUnparser(), source, skip_config)
+    )
+
+    assert minified == (
+        "class Child:pass\nclass Other(other.Base):pass\n"
+        "def f():\n\tclass Inner:pass"
+    )
+
+
+@pytest.mark.parametrize("fused", [False, True])
+def test_exclude_patterns(fused: bool):
+    source: str = """
+import numpy.testing
+def test_foo():
+    pass
+def _debug_dump():
+    pass
+def _debug():
+    pass
+test_foo()
+log.test_bar()
+_debug_dump()
+d = {'_debug_key': 1, 'key': 2}
+"""
+    skip_config = SkipConfig(
+        tokens_to_skip_config=TokensToSkipConfig(
+            functions={"test_*", r"re:_debug_\w+", "unused_*"},
+            dict_keys={"_debug_*"},
+            module_imports={"numpy.*"},
+        ),
+    )
+    skip_usage = SkipUsage()
+
+    minified: str = (
+        run_fused_minify_parser(source, skip_config, skip_usage)
+        if fused
+        else run_minify_parser(MinifyUnparser(), source, skip_config, skip_usage)
+    )
+
+    assert minified == "def _debug():pass\nd={'key':2}"
+    # Names are counted for the pattern they matched
+    assert skip_usage.found_counts == {
+        "functions": {"test_*": 3, r"re:_debug_\w+": 2},
+        "dict keys": {"_debug_*": 1},
+        "module imports": {"numpy.*": 1},
+    }
+    assert skip_usage.get_not_found_tokens(skip_config.tokens_to_skip_config) == {
+        "functions": ["unused_*"]
+    }
+
+
+def test_exclude_invalid_pattern():
+    with pytest.raises(ValueError, match="Invalid pattern of functions to skip"):
+        TokensToSkipConfig(functions={"re:("})
@@ -0,0 +1,96 @@
+import pytest
+from personal_python_ast_optimizer.parser.config import (
+    ExtrasToSkipConfig,
+    SectionsToSkipConfig,
+    SkipConfig,
+    TokensToSkipConfig,
+)
+from personal_python_ast_optimizer.parser.minifier import MinifyUnparser
+from personal_python_ast_optimizer.parser.run import (
+    run_fused_minify_parser,
+    run_minify_parser,
+)
+
+_source: str = """
+'''Module doc'''
+from __future__ import annotations
+import os, numpy
+from foo import FAVORITE_NUMBER, bar
+
+def foo():
+    pass
+
+class A(object, B):
+    '''Class doc'''
+    x: int
+    class Inner:
+        y: int
+    z: int
+
+    @property
+    def method(self, *args: FAVORITE_NUMBER, **kwargs: int) -> None:
+        '''Method doc'''
+        a: int = FAVORITE_NUMBER
+        b = {'a': 1, 'b': FAVORITE_NUMBER}
+        c = b[FAVORITE_NUMBER, 1]
+        foo()
+        return None
+
+if a:
+    foo()
+elif FAVORITE_NUMBER:
+    b = FAVORITE_NUMBER
+elif __name__ == "__main__":
+    c = 1
+else:
+    d = f"{FAVORITE_NUMBER:>{FAVORITE_NUMBER}}"
+
+def g():
+    FAVORITE_NUMBER
+    e = FAVORITE_NUMBER.bit_length()
+
+if __name__ == "__main__":
+    foo()
+"""
+
+_skip_configs: list[SkipConfig] = [
+    SkipConfig(),
+    SkipConfig(
+        "module",
+        (3, 9),
+        {"FAVORITE_NUMBER": 6},
+        SectionsToSkipConfig(skip_name_equals_main=True),
+        TokensToSkipConfig(
+            functions={"foo"},
+            classes={"B"},
+            dict_keys={"b"},
+            decorators={"property"},
+            module_imports={"numpy"},
+        ),
+    ),
+    SkipConfig(
+        "module",
+        None,
+        {"FAVORITE_NUMBER": "doc"},
+        extras_to_skip_config=ExtrasToSkipConfig(False, False, False),
+    ),
+]
+
+
+@pytest.mark.parametrize("skip_config", _skip_configs)
+def test_fused_same_as_two_passes(skip_config: SkipConfig):
+    expected: str = run_minify_parser(MinifyUnparser(), _source, skip_config)
+
+    # Configs count skipped tokens, so give the fused run a fresh one
+    skip_config = SkipConfig(
+        skip_config.module_name,
+        skip_config.target_python_version,
+        skip_config.constant_vars_to_fold,
+        skip_config.sections_to_skip_config,
+        TokensToSkipConfig(
+            *(set(tokens) for tokens in skip_config.tokens_to_skip_config)
+        ),
+        skip_config.extras_to_skip_config,
+    )
+
+    assert run_fused_minify_parser(_source, skip_config) == expected
@@ -0,0 +1,132 @@
+import ast
+import warnings
+
+import pytest
+from personal_python_ast_optimizer.parser.config import (
+    ExtrasToSkipConfig,
+    SkipConfig,
+    SkipUsage,
+)
+from personal_python_ast_optimizer.parser.lazy_imports import (
+    move_imports_into_functions,
+)
+from personal_python_ast_optimizer.parser.minifier import MinifyUnparser
+from personal_python_ast_optimizer.parser.run import (
+    run_fused_minify_parser,
+    run_minify_parser,
+)
+
+
+def _move(
+    source: str, names_to_keep: frozenset[str] = frozenset()
+) -> tuple[str, list[str]]:
+    module: ast.Module = ast.parse(source)
+    moved_imports: list[str] = move_imports_into_functions(module, names_to_keep)
+    return MinifyUnparser().visit(module), moved_imports
+
+
+def test_move_imports_into_functions():
+    source, moved_imports = _move(
+        """
+import json, sys
+from os import path as p, sep
+def load(file):
+    '''Doc'''
+    return json.load(p.join(sep, file))
+class Cli:
+    def run(self):
+        def inner():
+            return json.dumps(sys.argv)
+        return inner
+print(sys.argv)
+"""
+    )
+
+    assert source == (
+        "import sys\n"
+        "def load(file):\n"
+        '\t"""Doc"""\n'
+        "\timport json\n"
+        "\tfrom os import path as p,sep\n"
+        "\treturn json.load(p.join(sep,file))\n"
+        "class Cli:\n"
+        "\tdef run(self):\n"
+        "\t\timport json\n"
+        "\t\tdef inner():return json.dumps(sys.argv)\n"
+        "\t\treturn inner\n"
+        "print(sys.argv)"
+    )
+    assert moved_imports == [
+        "moved import json into load, Cli.run",
+        "moved from os import path as p into load",
+        "moved from os import sep into load",
+    ]
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        # Read when the module or class is run
+        "import json\nclass A:\n    x = json.dumps(1)\n    def f(self):\n"
+        "        return json",
+        "import json\n@json.dumps\ndef f():\n    return json",
+        "import json\ndef f(a=json.dumps(1)):\n    return json",
+        "import json\ng = lambda: json\ndef f():\n    return json",
+        "import json\ndef f(a: 'json.JSONDecoder'):\n    return json",
+        # Re-exported
+        "import json\n__all__ = ['json']\ndef f():\n    return json",
+        "import json as json\ndef f():\n    return json",
+        # Bound by something else
+        "import json\ndef f(json):\n    return json",
+        "import json\ndef f():\n    global json\n    return json",
+        "import json\nimport simplejson as json\ndef f():\n    return json",
+        "import json\ndef f():\n    return json\ndef g():\n    json = 1",
+        # Globals are read by name
+        "import json\ndef f():\n    return json, globals()['x']",
+        # Never read, or runs something when imported
+        "import json\ndef f():\n    pass",
+        "import readline\ndef f():\n    return readline",
+        "from __future__ import annotations\ndef f():\n    return annotations",
+    ],
+)
+def test_move_imports_into_functions_keeps(source: str):
+    assert _move(source) == (MinifyUnparser().visit(ast.parse(source)), [])
+
+
+def test_move_imports_into_functions_names_to_keep():
+    source: str = "import json, os\ndef f():\n    return json, os"
+
+    assert _move(source, frozenset(("os",))) == (
+        "import os\ndef f():\n\timport json\n\treturn (json,os)",
+        ["moved import json into f"],
+    )
+
+
+@pytest.mark.parametrize("fused", [False, True])
+def test_lazy_imports_reported(fused: bool):
+    source: str = "import json\ndef f():\n    return json.dumps(1)"
+    skip_config = SkipConfig(
+        "module", extras_to_skip_config=ExtrasToSkipConfig(lazy_imports=True)
+    )
+    skip_usage = SkipUsage()
+
+    minified: str = (
+        run_fused_minify_parser(source, skip_config, skip_usage)
+        if fused
+        else run_minify_parser(MinifyUnparser(), source, skip_config, skip_usage)
+    )
+
+    assert minified == "def f():\n\timport json\n\treturn json.dumps(1)"
+    assert skip_usage.moved_imports == ["moved import json into f"]
+
+
+def test_lazy_imports_not_warned_without_skip_usage():
+    skip_config = SkipConfig(
+        "module", extras_to_skip_config=ExtrasToSkipConfig(lazy_imports=True)
+    )
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        run_minify_parser(
+            MinifyUnparser(), "import json\ndef f():\n    return json", skip_config
+        )
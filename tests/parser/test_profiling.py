@@ -0,0 +1,73 @@
+import json
+import pstats
+
+from personal_python_ast_optimizer.parser.config import (
+    SkipConfig,
+    TokensToSkip,
+    TokensToSkipConfig,
+)
+from personal_python_ast_optimizer.parser.minifier import MinifyUnparser
+from personal_python_ast_optimizer.parser.profiling import (
+    VisitorProfile,
+    run_profiled_minify_parser,
+)
+from personal_python_ast_optimizer.parser.run import run_minify_parser
+
+_source: str = """
+def foo():
+    return bar(1)
+
+def bar(a):
+    if a:
+        if a > 1:
+            return a
+    return foo()
+"""
+
+
+def _get_skip_config() -> SkipConfig:
+    return SkipConfig(
+        "module", tokens_to_skip_config=TokensToSkipConfig(functions={"foo"})
+    )
+
+
+def test_profiled_output_same():
+    assert run_profiled_minify_parser(
+        VisitorProfile(), _source, _get_skip_config()
+    ) == run_minify_parser(MinifyUnparser(), _source, _get_skip_config())
+
+
+def test_profile_counts():
+    profile = VisitorProfile()
+    skip_config: SkipConfig = _get_skip_config()
+    run_profiled_minify_parser(profile, _source, skip_config)
+    run_profiled_minify_parser(profile, _source, skip_config)
+
+    report: dict = json.loads(json.dumps(profile.to_dict()))
+    calls: dict[str, tuple[int, int]] = {
+        visitor["function"]: (visitor["calls"], visitor["primitive_calls"])
+        for visitor in report["visitors"]
+    }
+
+    assert calls["AstNodeSkipper.visit_If"] == (4, 2)
+    assert calls["_Unparser.visit_If"] == (4, 2)
+    assert report["token_lookups"]["functions"] == {
+        "lookups": 4,
+        "hits": 2,
+        "tokens": {"foo": 2},
+    }
+    # Original config is left as is
+    assert type(skip_config.tokens_to_skip_config.functions) is TokensToSkip
+    assert skip_config.tokens_to_skip_config.functions.usage is None
+
+
+def test_profile_as_pstats(tmp_path):
+    profile = VisitorProfile()
+    run_profiled_minify_parser(profile, _source)
+    path: str = str(tmp_path / "minify.prof")
+    profile.dump_stats(path)
+
+    stats = pstats.Stats(path)
+
+    assert stats.total_calls > 0  # type: ignore
+    assert stats.stats == pstats.Stats(profile).stats  # type: ignore
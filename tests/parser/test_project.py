@@ -0,0 +1,214 @@
+import os
+import sys
+import warnings
+
+import pytest
+from personal_python_ast_optimizer.parser.config import (
+    ExtrasToSkipConfig,
+    SkipConfig,
+    TokensToSkipConfig,
+)
+from personal_python_ast_optimizer.parser.project import (
+    MinifyResult,
+    get_module_name,
+    is_free_threaded,
+    minify_project,
+)
+
+
+def _write(path: str, source: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fp:
+        fp.write(source)
+
+
+def _read(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as fp:
+        return fp.read()
+
+
+@pytest.mark.parametrize(
+    "max_workers,fused,use_threads",
+    [(1, False, False), (2, False, False), (1, True, False), (2, True, True)],
+)
+def test_minify_project(tmp_path, max_workers: int, fused: bool, use_threads: bool):
+    source_dir: str = str(tmp_path / "src")
+    output_dir: str = str(tmp_path / "out")
+    _write(os.path.join(source_dir, "a.py"), "a = 1\ndef foo():\n    pass\n")
+    _write(os.path.join(source_dir, "pkg", "__init__.py"), "'''Doc'''\n")
+    _write(os.path.join(source_dir, "pkg", "bad.py"), "def (:\n")
+    _write(os.path.join(source_dir, "data.txt"), "a = 1\n")
+
+    skip_config = SkipConfig(
+        tokens_to_skip_config=TokensToSkipConfig(functions={"foo", "bar"})
+    )
+    with warnings.catch_warnings(record=True) as caught_warnings:
+        warnings.simplefilter("always")
+        results: list[MinifyResult] = minify_project(
+            source_dir,
+            output_dir,
+            skip_config,
+            max_workers,
+            fused=fused,
+            use_threads=use_threads,
+        )
+
+    assert [result.module_name for result in results] == ["a", "pkg", "pkg.bad"]
+    assert [result.succeeded() for result in results] == [True, True, False]
+    assert results[2].error.startswith("SyntaxError")
+
+    assert _read(os.path.join(output_dir, "a.py")) == "a=1"
+    assert _read(os.path.join(output_dir, "pkg", "__init__.py")) == ""
+    assert not os.path.exists(os.path.join(output_dir, "pkg", "bad.py"))
+    assert not os.path.exists(os.path.join(output_dir, "data.txt"))
+
+    # Found tokens are merged across files, even from other processes,
+    # so only tokens no module has are warned about, once
+    assert all(result.warnings == [] for result in results)
+    assert results[0].skip_usage.found_counts == {"functions": {"foo": 1}}
+    assert [str(w.message) for w in caught_warnings] == [
+        "requested to skip functions bar but was not found in any module"
+    ]
+
+
+def test_is_free_threaded(monkeypatch):
+    monkeypatch.setattr(sys, "_is_gil_enabled", lambda: True, raising=False)
+    assert not is_free_threaded()
+
+    monkeypatch.setattr(sys, "_is_gil_enabled", lambda: False, raising=False)
+    assert is_free_threaded()
+
+    monkeypatch.delattr(sys, "_is_gil_enabled")
+    assert not is_free_threaded()
+
+
+def test_get_module_name():
+    root: str = os.path.join("some", "root")
+    assert get_module_name(os.path.join(root, "a", "b.py"), root) == "a.b"
+    assert get_module_name(os.path.join(root, "a", "__init__.py"), root) == "a"
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_minify_project_tree_shaking(tmp_path, max_workers: int):
+    source_dir: str = str(tmp_path / "src")
+    output_dir: str = str(tmp_path / "out")
+    _write(
+        os.path.join(source_dir, "main.py"),
+        "from lib import used\nused()\n",
+    )
+    _write(
+        os.path.join(source_dir, "lib.py"),
+        "import os\ndef used():\n    pass\ndef unused():\n    return os.sep\n"
+        "def plugin():\n    pass\n",
+    )
+    _write(os.path.join(source_dir, "other.py"), "def unused():\n    pass\n")
+
+    results: list[MinifyResult] = minify_project(
+        source_dir,
+        output_dir,
+        max_workers=max_workers,
+        entry_points=["main"],
+        keep=["lib.plug*"],
+    )
+
+    assert all(result.succeeded() for result in results)
+    assert _read(os.path.join(output_dir, "main.py")) == "from lib import used\nused()"
+    assert _read(os.path.join(output_dir, "lib.py")) == (
+        "def used():pass\ndef plugin():pass"
+    )
+    # Never imported, so could be imported dynamically
+    assert _read(os.path.join(output_dir, "other.py")) == "def unused():pass"
+
+
+def test_minify_project_tree_shaking_only(tmp_path):
+    source_dir: str = str(tmp_path / "src")
+    output_dir: str = str(tmp_path / "out")
+    _write(
+        os.path.join(source_dir, "main.py"),
+        'from lib import used\ndef run(x: int) -> int:\n    """doc"""\n'
+        "    return used()\n",
+    )
+    _write(
+        os.path.join(source_dir, "lib.py"),
+        'def used() -> int:\n    """doc"""\n    return 1\n'
+        "def unused():\n    pass\n"
+        "if __name__ == '__main__':\n    print(used())\n",
+    )
+
+    results: list[MinifyResult] = minify_project(
+        source_dir, output_dir, max_workers=1, entry_points=["main"]
+    )
+
+    # Files with definitions to skip are minified the same as the rest
+    assert all(result.succeeded() for result in results)
+    assert _read(os.path.join(output_dir, "lib.py")) == (
+        'def used() -> int:\n\t"""doc"""\n\treturn 1\n'
+        "if __name__=='__main__':\n\tprint(used())"
+    )
+
+
+def test_minify_project_lazy_imports(tmp_path):
+    source_dir: str = str(tmp_path / "src")
+    output_dir: str = str(tmp_path / "out")
+    _write(
+        os.path.join(source_dir, "lib.py"),
+        "import json, os\nfrom sys import argv\ndef f():\n"
+        "    return json.dumps(argv), os.sep\n",
+    )
+    _write(
+        os.path.join(source_dir, "main.py"),
+        "import lib\nfrom lib import argv\nprint(lib.os, argv)\n",
+    )
+
+    results: list[MinifyResult] = minify_project(
+        source_dir,
+        output_dir,
+        SkipConfig(extras_to_skip_config=ExtrasToSkipConfig(lazy_imports=True)),
+        max_workers=1,
+    )
+
+    # Other modules read os and argv from lib, so only json is moved
+    assert [result.skip_usage.moved_imports for result in results] == [
+        ["moved import json into f"],
+        [],
+    ]
+    assert _read(os.path.join(output_dir, "lib.py")) == (
+        "import os\nfrom sys import argv\n"
+        "def f():\n\timport json\n\treturn (json.dumps(argv),os.sep)"
+    )
+
+
+@pytest.mark.parametrize("entry_points", [None, ["main"]])
+def test_minify_project_fold_enums(tmp_path, entry_points: list[str] | None):
+    source_dir: str = str(tmp_path / "src")
+    output_dir: str = str(tmp_path / "out")
+    _write(
+        os.path.join(source_dir, "constants.py"),
+        "from enum import StrEnum\n__all__ = []\nclass Formats(StrEnum):\n"
+        "    PNG = 'png'\nclass Kept(StrEnum):\n    A = 'a'\n",
+    )
+    _write(
+        os.path.join(source_dir, "main.py"),
+        "import constants\nfrom constants import Formats as F, Kept\n"
+        "print(F.PNG, constants.Formats.PNG.name, list(Kept))\n",
+    )
+
+    results: list[MinifyResult] = minify_project(
+        source_dir,
+        output_dir,
+        SkipConfig(
+            target_python_version=(3, 11),
+            extras_to_skip_config=ExtrasToSkipConfig(fold_enums=True),
+        ),
+        max_workers=1,
+        entry_points=entry_points,
+    )
+
+    assert all(result.succeeded() for result in results)
+    # Kept is iterated, so needs the class
+    assert _read(os.path.join(output_dir, "constants.py")) == (
+        "from enum import StrEnum\n__all__=[]\nclass Kept(StrEnum):A='a'"
+    )
+    assert _read(os.path.join(output_dir, "main.py")) == (
+        "import constants\nfrom constants import Kept\nprint('png','PNG',list(Kept))"
+    )
@@ -0,0 +1,117 @@
+import pytest
+from personal_python_ast_optimizer.parser.config import ExtrasToSkipConfig, SkipConfig
+from personal_python_ast_optimizer.parser.minifier import MinifyUnparser
+from personal_python_ast_optimizer.parser.run import (
+    run_fused_minify_parser,
+    run_minify_parser,
+)
+
+from tests.utils import BeforeAndAfter
+
+_release_cases = [
+    (
+        BeforeAndAfter(
+            """
+import pprint
+class A:
+    assert pprint.isreadable(1)
+def f(x):
+    assert x > 0, pprint.pformat(x)
+    return x
+def g():
+    try:
+        yield
+    finally:
+        assert done
+""",
+            "class A:pass\ndef f(x):return x\n"
+            "def g():\n\ttry:\n\t\tyield\n\tfinally:pass",
+        ),
+        SkipConfig(extras_to_skip_config=ExtrasToSkipConfig(skip_asserts=True)),
+    ),
+    (
+        BeforeAndAfter(
+            """
+if __debug__:
+    check()
+if not __debug__:
+    fast()
+x = __debug__
+""",
+            "fast()\nx=False",
+        ),
+        SkipConfig(
+            extras_to_skip_config=ExtrasToSkipConfig(skip_constant_expressions=True),
+            target_debug=False,
+        ),
+    ),
+    (
+        BeforeAndAfter(
+            """
+import logging
+import pprint
+log = logging.getLogger(__name__)
+def f(x):
+    log.debug(f"x is {pprint.pformat(x)}")
+    logging.log(logging.DEBUG, "a")
+    self.logger.info("b %s", x)
+    log.log(25, "c")
+    log.log(level, "kept")
+    log.warning("kept")
+    log.debug("kept %s", (y := 1))
+    other.debug("kept")
+    return log.debug("kept")
+""",
+            "import logging\nlog=logging.getLogger(__name__)\ndef f(x):"
+            "\n\tlog.log(level,'kept')\n\tlog.warning('kept')"
+            "\n\tlog.debug('kept %s',(y:=1))\n\tother.debug('kept')"
+            "\n\treturn log.debug('kept')",
+        ),
+        SkipConfig(
+            extras_to_skip_config=ExtrasToSkipConfig(skip_logging_below="warning")
+        ),
+    ),
+    (
+        BeforeAndAfter(
+            """
+logger.debug("kept")
+self.log.info("a")
+log.info("kept")
+request_logger.info("b")
+""",
+            "logger.debug('kept')\nlog.info('kept')",
+        ),
+        SkipConfig(
+            extras_to_skip_config=ExtrasToSkipConfig(
+                skip_logging_below=30, logger_names={"self.log", "*_logger"}
+            )
+        ),
+    ),
+]
+
+
+@pytest.mark.parametrize("fused", [False, True])
+@pytest.mark.parametrize("before_and_after,skip_config", _release_cases)
+def test_skip_release_code(
+    before_and_after: BeforeAndAfter, skip_config: SkipConfig, fused: bool
+):
+    minified: str = (
+        run_fused_minify_parser(before_and_after.before, skip_config)
+        if fused
+        else run_minify_parser(MinifyUnparser(), before_and_after.before, skip_config)
+    )
+
+    assert minified == before_and_after.after
+
+
+def test_release_code_kept_by_default():
+    source: str = "assert x\nif __debug__:\n    log.debug('a')"
+
+    assert run_minify_parser(MinifyUnparser(), source, SkipConfig()) == (
+        "assert x\nif __debug__:\n\tlog.debug('a')"
+    )
+
+
+def test_skip_logging_below_invalid_level():
+    with pytest.raises(ValueError, match="Unknown logging level: LOUD"):
+        ExtrasToSkipConfig(skip_logging_below="LOUD")
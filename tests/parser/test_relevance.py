@@ -0,0 +1,77 @@
+import ast
+
+from personal_python_ast_optimizer.parser.config import (
+    ExtrasToSkipConfig,
+    SkipConfig,
+    TokensToSkipConfig,
+)
+from personal_python_ast_optimizer.parser.relevance import RelevanceIndex
+
+_no_extras_config = ExtrasToSkipConfig(
+    skip_dangling_expressions=False,
+    skip_return_none=False,
+    skip_type_hints=False,
+    skip_constant_expressions=False,
+    skip_unreachable_code=False,
+)
+
+
+def test_find_irrelevant_nodes():
+    module: ast.Module = ast.parse(
+        """
+def foo():
+    a = 1 + 2
+    return bar(a)
+
+def baz():
+    a = 1 + 2
+    bar(a)
+"""
+    )
+    foo: ast.FunctionDef = module.body[0]  # type: ignore
+    baz: ast.FunctionDef = module.body[1]  # type: ignore
+    config = SkipConfig(
+        tokens_to_skip_config=TokensToSkipConfig(functions={"bar"}),
+        extras_to_skip_config=_no_extras_config,
+    )
+
+    irrelevant_nodes: set[ast.AST] = RelevanceIndex(config).find_irrelevant_nodes(
+        module
+    )
+
+    # Statements without bar are left out whole, the rest are searched
+    assert foo not in irrelevant_nodes and baz not in irrelevant_nodes
+    assert foo.body[0] in irrelevant_nodes and baz.body[0] in irrelevant_nodes
+    assert foo.body[1] not in irrelevant_nodes and baz.body[1] not in irrelevant_nodes
+    assert foo.args in irrelevant_nodes
+
+
+def test_find_irrelevant_nodes_by_node_type():
+    module: ast.Module = ast.parse("def foo(a: int):\n    return bar(a)")
+    function: ast.FunctionDef = module.body[0]  # type: ignore
+
+    irrelevant_nodes: set[ast.AST] = RelevanceIndex(
+        SkipConfig(extras_to_skip_config=_no_extras_config)
+    ).find_irrelevant_nodes(module)
+    assert function in irrelevant_nodes
+
+    irrelevant_nodes = RelevanceIndex(
+        SkipConfig(extras_to_skip_config=ExtrasToSkipConfig())
+    ).find_irrelevant_nodes(module)
+    assert function not in irrelevant_nodes
+    assert function.body[0].value in irrelevant_nodes  # type: ignore
+
+
+def test_find_irrelevant_nodes_by_pattern():
+    module: ast.Module = ast.parse("test_foo()\nfoo()")
+    config = SkipConfig(
+        tokens_to_skip_config=TokensToSkipConfig(functions={"test_*"}),
+        extras_to_skip_config=_no_extras_config,
+    )
+
+    irrelevant_nodes: set[ast.AST] = RelevanceIndex(config).find_irrelevant_nodes(
+        module
+    )
+
+    assert module.body[0] not in irrelevant_nodes
+    assert module.body[1] in irrelevant_nodes
@@ -33,3 +33,30 @@ foo = 5
         "foo=5",
     )
     run_minifiyer_and_assert_correct(before_and_after)
+
+
+def test_f_string():
+    before_and_after = BeforeAndAfter('f"{a}"', "f'{a}'")
+    run_minifiyer_and_assert_correct(before_and_after)
+
+
+def test_f_string_keeps_separators():
+    before_and_after = BeforeAndAfter(
+        'f"{a}, {b} = {c}: {d}"', "f'{a}, {b} = {c}: {d}'"
+    )
+    run_minifiyer_and_assert_correct(before_and_after)
+
+
+def test_operators():
+    before_and_after = BeforeAndAfter(
+        """
+a = b @ c + d ** e
+f = g is not h or 'i' not in j or k < l
+m = [n for o in p if o]
+q = lambda: (r := s)
+""",
+        """
+a=b@c+d**e;f=g is not h or 'i'not in j or k<l;m=[n for o in p if o];q=lambda:(r:=s)
+""".strip(),
+    )
+    run_minifiyer_and_assert_correct(before_and_after)
@@ -0,0 +1,141 @@
+import ast
+
+import pytest
+from personal_python_ast_optimizer.parser.config import SkipConfig
+from personal_python_ast_optimizer.parser.minifier import MinifyUnparser
+from personal_python_ast_optimizer.parser.run import (
+    run_fused_minify_parser,
+    run_minify_parser,
+)
+from personal_python_ast_optimizer.parser.shaking import TreeShaker
+
+
+def _find_unreachable_definitions(
+    modules: dict[str, str], entry_points: list[str], keep: list[str] | None = None
+) -> dict[str, set[str]]:
+    tree_shaker = TreeShaker()
+    for module_name, source in modules.items():
+        tree_shaker.add_module(
+            module_name.removesuffix(".__init__"),
+            ast.parse(source.strip()),
+            module_name.endswith("__init__"),
+        )
+
+    return tree_shaker.find_unreachable_definitions(entry_points, keep or ())
+
+
+def test_shaking_across_modules():
+    modules: dict[str, str] = {
+        "main": """
+import pkg.util
+from pkg import helpers as h
+from .pkg.models import Model
+def main():
+    pkg.util.used()
+    h.used()
+    return Model()
+if __name__ == "__main__":
+    main()
+""",
+        "pkg.__init__": "VERSION = '1'\n__all__ = []",
+        "pkg.util": """
+def used():
+    return _private()
+def _private():
+    pass
+def only_used_by_unused():
+    pass
+""",
+        "pkg.helpers": """
+def used():
+    pass
+def unused():
+    from . import util
+    util.only_used_by_unused()
+""",
+        "pkg.models": """
+import json
+class Base:
+    pass
+class Model(Base):
+    def method(self):
+        return json.dumps(CONSTANT)
+CONSTANT = 1
+OTHER: int = 2
+""",
+        "pkg.never_imported": "def foo():\n    pass",
+    }
+
+    assert _find_unreachable_definitions(modules, ["main"]) == {
+        "main": set(),
+        "pkg": {"VERSION"},
+        "pkg.util": {"only_used_by_unused"},
+        "pkg.helpers": {"unused"},
+        "pkg.models": {"OTHER"},
+    }
+
+
+def test_shaking_keeps_what_may_be_reached():
+    modules: dict[str, str] = {
+        "main": """
+import plugins
+import dynamic
+from star import *
+from registry import registered
+x = 1
+x += 1
+print(plugins, used_by_star)
+""",
+        "plugins": "def foo():\n    pass",
+        "dynamic": "def foo():\n    pass\nprint(globals())",
+        "star": "def used_by_star():\n    pass\ndef unused():\n    pass",
+        "registry": """
+registry = {}
+def register(function):
+    registry[function.__name__] = function
+    return function
+@register
+def registered():
+    pass
+@staticmethod
+def decorated():
+    pass
+class WithMeta(metaclass=type):
+    pass
+value = compute()
+def __getattr__(name):
+    pass
+""",
+    }
+
+    assert _find_unreachable_definitions(modules, ["main"], ["star.unu*"]) == {
+        "main": set(),
+        "plugins": set(),
+        "dynamic": set(),
+        "star": set(),
+        "registry": {"decorated"},
+    }
+
+
+def test_shaking_unknown_entry_point():
+    with pytest.raises(ValueError):
+        _find_unreachable_definitions({"main": ""}, ["missing"])
+
+
+def test_skip_definitions():
+    before: str = """
+import json
+import os
+def used():
+    return os.sep
+def unused():
+    return json.dumps(1)
+a = b = 1
+c = d = 2
+print(used(), a)
+"""
+    after: str = "import os\ndef used():return os.sep\na=b=1\nprint(used(),a)"
+    skip_config = SkipConfig(definitions_to_skip={"unused", "b", "c", "d"})
+
+    assert run_minify_parser(MinifyUnparser(), before, skip_config) == after
+    assert run_fused_minify_parser(before, skip_config) == after
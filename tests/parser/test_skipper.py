@@ -1,7 +1,14 @@
 import ast
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
-from personal_python_ast_optimizer.parser.config import SkipConfig, TokensToSkipConfig
+from personal_python_ast_optimizer.parser.config import (
+    SkipConfig,
+    SkipUsage,
+    TokensToSkipConfig,
+)
+from personal_python_ast_optimizer.parser.minifier import MinifyUnparser
+from personal_python_ast_optimizer.parser.run import run_minify_parser
 from personal_python_ast_optimizer.parser.skipper import AstNodeSkipper
 
 _MODULE_NAME: str = "personal_python_ast_optimizer.parser.skipper"
@@ -27,3 +34,33 @@ def test_warn_unused_skips():
         skipper = AstNodeSkipper(skip_config)
         skipper.visit(warn_module)
         mock_warn.assert_called_once()
+
+
+def test_skip_usage_merged_across_threads():
+    skip_config = SkipConfig(
+        tokens_to_skip_config=TokensToSkipConfig(functions={"foo", "bar"})
+    )
+    sources: list[str] = [f"foo({i})\nbaz()" for i in range(64)]
+
+    def minify(source: str) -> SkipUsage:
+        skip_usage = SkipUsage()
+        run_minify_parser(MinifyUnparser(), source, skip_config, skip_usage)
+        return skip_usage
+
+    total_usage = SkipUsage()
+    with ThreadPoolExecutor(8) as executor:
+        for skip_usage in executor.map(minify, sources):
+            assert skip_usage.found_counts == {"functions": {"foo": 1}}
+            total_usage.merge(skip_usage)
+
+    assert total_usage.found_counts == {"functions": {"foo": 64}}
+    assert total_usage.get_not_found_tokens(skip_config.tokens_to_skip_config) == {
+        "functions": ["bar"]
+    }
+    # The shared config is never changed by skipping
+    assert skip_config.tokens_to_skip_config.functions.usage is None
+
+
+def test_configs_do_not_share_defaults():
+    assert SkipConfig().tokens_to_skip_config is not SkipConfig().tokens_to_skip_config
+    assert SkipConfig().extras_to_skip_config is not SkipConfig().extras_to_skip_config
@@ -0,0 +1,73 @@
+import ast
+import io
+
+import pytest
+from personal_python_ast_optimizer.parser.config import SkipConfig
+from personal_python_ast_optimizer.parser.fused import FusedMinifyUnparser
+from personal_python_ast_optimizer.parser.minifier import MinifyUnparser
+from personal_python_ast_optimizer.parser.run import (
+    run_fused_minify_parser,
+    run_minify_parser,
+    run_minify_parser_to_stream,
+)
+
+_source: str = """
+'''Module doc'''
+import os
+a = 1
+b = 2
+if a:
+    c = 3
+def foo(d):
+    return d
+class A:
+    e: int = 4
+foo(a)
+"""
+
+
+class _RecordingStream(io.StringIO):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes: list[str] = []
+
+    def write(self, text: str) -> int:
+        self.writes.append(text)
+        return super().write(text)
+
+
+def test_stream_same_as_string():
+    stream = _RecordingStream()
+    run_minify_parser_to_stream(MinifyUnparser(), _source, stream, SkipConfig())
+
+    assert stream.getvalue() == run_minify_parser(
+        MinifyUnparser(), _source, SkipConfig()
+    )
+    # Flushed once per top level statement, not once at the end
+    assert len(stream.writes) > 1
+    assert not any("import" in text and "foo" in text for text in stream.writes)
+
+
+@pytest.mark.parametrize(
+    "source,expected",
+    [
+        (_source, run_minify_parser(MinifyUnparser(), _source, SkipConfig())),
+        # Imports only type hints use are removed after the module is written
+        (
+            "from typing import List\na = 1\ndef f(x: List):\n" "    return x\nb = 2\n",
+            "a=1\ndef f(x):return x\nb=2",
+        ),
+        (
+            "from typing import TypeVar\n__all__ = ['f']\n_T = TypeVar('_T')\n"
+            "def f(x: _T) -> _T:\n    return x\n",
+            "__all__=['f']\ndef f(x):return x",
+        ),
+    ],
+)
+def test_fused_stream_same_as_string(source: str, expected: str):
+    stream = io.StringIO()
+    FusedMinifyUnparser(SkipConfig()).visit_to_stream(ast.parse(source), stream)
+
+    assert stream.getvalue() == run_fused_minify_parser(source, SkipConfig())
+    assert stream.getvalue() == expected
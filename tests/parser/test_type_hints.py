@@ -0,0 +1,126 @@
+import pytest
+from personal_python_ast_optimizer.parser.config import ExtrasToSkipConfig, SkipConfig
+from personal_python_ast_optimizer.parser.minifier import MinifyUnparser
+from personal_python_ast_optimizer.parser.run import (
+    run_fused_minify_parser,
+    run_minify_parser,
+)
+
+from tests.utils import BeforeAndAfter
+
+_type_hint_cases = [
+    BeforeAndAfter(
+        """
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from os import PathLike
+else:
+    PathLike = str
+import typing
+if typing.TYPE_CHECKING:
+    import json
+""",
+        "PathLike=str",
+    ),
+    BeforeAndAfter(
+        """
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import json
+""",
+        "TYPE_CHECKING=False",
+    ),
+    BeforeAndAfter(
+        """
+import typing
+from typing import List, cast
+def f(x):
+    return cast(List[int], typing.cast("int", cast(int, x)))
+""",
+        "def f(x):return x",
+    ),
+    BeforeAndAfter(
+        """
+from typing import Any, overload
+@overload
+def f(x: int) -> int: ...
+@overload
+async def f(x: str) -> str: ...
+def f(x: Any) -> Any:
+    return x
+""",
+        "def f(x):return x",
+    ),
+    BeforeAndAfter(
+        """
+from collections.abc import Iterator
+from typing import Optional, Protocol, TypeVar
+_T = TypeVar("_T")
+_U = TypeVar("_U")
+class _Sized(Protocol[_U]):
+    def size(self) -> _U: ...
+class Public(Protocol):
+    pass
+async def g(a: Iterator[_T], b: "Optional[_Sized]") -> Optional[_T]:
+    return a
+""",
+        "from typing import Protocol\nclass Public(Protocol):pass\n"
+        "async def g(a,b):return a",
+    ),
+    BeforeAndAfter(
+        """
+from typing import Protocol, TypeVar
+__all__ = ["P"]
+T = TypeVar("T")
+class P(Protocol[T]):
+    pass
+class Unused(Protocol):
+    pass
+""",
+        "from typing import Protocol,TypeVar\n__all__=['P'];T=TypeVar('T')\n"
+        "class P(Protocol[T]):pass",
+    ),
+    # Names bound to something else, and imported under another name
+    BeforeAndAfter(
+        """
+from typing import cast
+from typing import TYPE_CHECKING as T
+def cast(a, b):
+    return a
+if T:
+    cast(int, 1)
+""",
+        "from typing import cast\nfrom typing import TYPE_CHECKING as T\n"
+        "def cast(a,b):return a\nif T:\n\tcast(int,1)",
+    ),
+]
+
+
+@pytest.mark.parametrize("fused", [False, True])
+@pytest.mark.parametrize("before_and_after", _type_hint_cases)
+def test_skip_typing_code(before_and_after: BeforeAndAfter, fused: bool):
+    skip_config = SkipConfig("module")
+
+    minified: str = (
+        run_fused_minify_parser(before_and_after.before, skip_config)
+        if fused
+        else run_minify_parser(MinifyUnparser(), before_and_after.before, skip_config)
+    )
+
+    assert minified == before_and_after.after
+
+
+def test_typing_code_kept_with_type_hints():
+    source: str = (
+        "from typing import TYPE_CHECKING, cast\n"
+        "if TYPE_CHECKING:\n    import json\n"
+        "x = cast(int, 1)"
+    )
+    skip_config = SkipConfig(
+        "module", extras_to_skip_config=ExtrasToSkipConfig(skip_type_hints=False)
+    )
+
+    assert run_minify_parser(MinifyUnparser(), source, skip_config) == (
+        "from typing import TYPE_CHECKING,cast\nif TYPE_CHECKING:\n\timport json\n"
+        "x=cast(int,1)"
+    )
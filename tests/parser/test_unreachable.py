@@ -0,0 +1,152 @@
+import pytest
+from personal_python_ast_optimizer.parser.config import ExtrasToSkipConfig, SkipConfig
+from personal_python_ast_optimizer.parser.run import run_fused_minify_parser
+
+from tests.utils import BeforeAndAfter, run_minifiyer_and_assert_correct
+
+# Folding decides which branches of if and while statements are taken
+_unreachable_config = ExtrasToSkipConfig(
+    skip_constant_expressions=True, skip_unreachable_code=True
+)
+
+_unreachable_cases = [
+    BeforeAndAfter(
+        """
+def foo():
+    return 1
+    print(2)
+""",
+        "def foo():return 1",
+    ),
+    BeforeAndAfter(
+        """
+for a in b:
+    if a:
+        continue
+        print(a)
+    else:
+        break
+    print(b)
+""",
+        "for a in b:\n\tif a:continue\n\telse:break",
+    ),
+    BeforeAndAfter(
+        """
+def foo():
+    if DEBUG:
+        return 1
+    else:
+        return 2
+    print(3)
+""",
+        "def foo():return 2",
+    ),
+    BeforeAndAfter(
+        """
+def foo(a):
+    if a:
+        raise ValueError
+    else:
+        return 2
+    print(3)
+""",
+        "def foo(a):\n\tif a:raise ValueError\n\telse:return 2",
+    ),
+    BeforeAndAfter(
+        """
+def foo():
+    try:
+        return 1
+    except ValueError:
+        raise
+    else:
+        print(2)
+    print(3)
+""",
+        "def foo():\n\ttry:return 1\n\texcept ValueError:raise",
+    ),
+    BeforeAndAfter(
+        """
+while True:
+    if a:
+        break
+else:
+    print(1)
+print(2)
+""",
+        "while True:\n\tif a:break\nprint(2)",
+    ),
+    BeforeAndAfter(
+        """
+def foo():
+    while True:
+        for a in b:
+            break
+        if DEBUG:
+            break
+    print(1)
+""",
+        "def foo():\n\twhile True:\n\t\tfor a in b:break",
+    ),
+    BeforeAndAfter(
+        """
+def foo():
+    return
+    yield
+""",
+        "def foo():\n\treturn\n\tyield",
+    ),
+    # Names bound anywhere in a function are local to all of it
+    BeforeAndAfter(
+        """
+x = 1
+def foo():
+    return x
+    x = 2
+""",
+        "x=1\ndef foo():\n\treturn x\n\tx=2",
+    ),
+    BeforeAndAfter(
+        """
+def foo():
+    def bar():
+        return x
+    x = 1
+    return bar
+    import x
+    for x in bar():
+        pass
+""",
+        "def foo():\n\tdef bar():return x\n\tx=1;return bar",
+    ),
+    BeforeAndAfter(
+        """
+while True:
+    pass
+x = 1
+""",
+        "while True:pass",
+    ),
+]
+
+
+@pytest.mark.parametrize("before_and_after", _unreachable_cases)
+def test_unreachable_code(before_and_after: BeforeAndAfter):
+    run_minifiyer_and_assert_correct(
+        before_and_after,
+        constant_vars_to_fold={"DEBUG": False},
+        extras_to_skip_config=_unreachable_config,
+    )
+
+
+@pytest.mark.parametrize("before_and_after", _unreachable_cases)
+def test_unreachable_code_fused(before_and_after: BeforeAndAfter):
+    skip_config = SkipConfig(
+        constant_vars_to_fold={"DEBUG": False},
+        extras_to_skip_config=_unreachable_config,
+    )
+
+    assert (
+        run_fused_minify_parser(before_and_after.before, skip_config)
+        == before_and_after.after
+    )
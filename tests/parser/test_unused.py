@@ -0,0 +1,161 @@
+import ast
+
+import pytest
+from personal_python_ast_optimizer.parser.config import ExtrasToSkipConfig, SkipConfig
+from personal_python_ast_optimizer.parser.run import run_fused_minify_parser
+from personal_python_ast_optimizer.parser.unused import remove_unused_code
+
+from tests.utils import BeforeAndAfter, run_minifiyer_and_assert_correct
+
+_unused_code_cases = [
+    BeforeAndAfter(
+        """
+import os, json
+import numpy
+from typing import List
+import collections.abc
+print(json.dumps([]))
+""",
+        "import json\nimport numpy\nprint(json.dumps([]))",
+    ),
+    BeforeAndAfter(
+        """
+import os as os
+from . import sibling
+from os import *
+from __future__ import annotations
+__all__ = ["path"]
+from os import path
+""",
+        "import os as os\nfrom . import sibling\nfrom os import *\n"
+        "from __future__ import annotations\n__all__=['path']\nfrom os import path",
+    ),
+    BeforeAndAfter(
+        """
+def foo():
+    import sys
+""",
+        "def foo():pass",
+    ),
+    BeforeAndAfter(
+        """
+class A:
+    import os
+""",
+        "class A:\n\timport os",
+    ),
+    BeforeAndAfter(
+        "a = {'b': 1, 'c': 2, 'b': 3, 'd': foo(), 'd': 4, 'e': foo(), 'e': bar()}",
+        "a={'b':3,'c':2,'d':foo(),'d':4,'e':foo(),'e':bar()}",
+    ),
+    BeforeAndAfter(
+        """
+import os
+def foo():
+    a = os.getcwd()
+    b: int = 1
+    c = d = 2
+    f = 3
+    try:
+        pass
+    except Exception as g:
+        pass
+    return f
+""",
+        "import os\ndef foo():\n\tos.getcwd()\n\tc=d=2;f=3"
+        "\n\ttry:pass\n\texcept Exception:pass\n\treturn f",
+    ),
+    BeforeAndAfter(
+        """
+def foo():
+    a = 1
+    a += 1
+    b: int = 1
+    b *= 2
+""",
+        "def foo():\n\ta=1\n\ta+=1\n\tb=1\n\tb*=2",
+    ),
+    BeforeAndAfter(
+        """
+def foo():
+    a = yield
+    b = (c := 1)
+    return c
+def bar():
+    a = 1
+    return locals()
+def baz():
+    a = 1
+    def inner():
+        return a
+    return inner
+""",
+        "def foo():\n\ta=(yield);b=(c:=1);return c\n"
+        "def bar():\n\ta=1;return locals()\n"
+        "def baz():\n\ta=1\n\tdef inner():return a\n\treturn inner",
+    ),
+]
+
+
+@pytest.mark.parametrize("before_and_after", _unused_code_cases)
+def test_unused_code(before_and_after: BeforeAndAfter):
+    run_minifiyer_and_assert_correct(
+        before_and_after,
+        extras_to_skip_config=ExtrasToSkipConfig(True, True, True, True),
+    )
+
+
+def test_all_unused_imports():
+    before_and_after = BeforeAndAfter(
+        """
+import numpy, json
+from . import sibling
+from .. import used
+print(used)
+""",
+        "from .. import used\nprint(used)",
+    )
+
+    run_minifiyer_and_assert_correct(
+        before_and_after,
+        extras_to_skip_config=ExtrasToSkipConfig(True, True, True, True, True),
+    )
+
+
+def test_unused_code_fused():
+    source: str = _unused_code_cases[5].before
+    skip_config = SkipConfig(
+        extras_to_skip_config=ExtrasToSkipConfig(skip_unused_code=True)
+    )
+
+    assert run_fused_minify_parser(source, skip_config) == _unused_code_cases[5].after
+
+
+def test_remove_unused_code_until_none_left():
+    module: ast.Module = remove_unused_code(
+        ast.parse(
+            """
+import os
+def foo():
+    a = os
+    b = a
+"""
+        )
+    )
+
+    assert ast.unparse(module) == "def foo():\n    pass"
+
+
+def test_string_annotations_use_imports():
+    module: ast.Module = remove_unused_code(
+        ast.parse(
+            """
+import os
+import sys
+def foo() -> "os.PathLike":
+    pass
+"""
+        )
+    )
+
+    assert ast.unparse(module) == "import os\n\ndef foo() -> 'os.PathLike':\n    pass"
@@ -1,7 +1,12 @@
 """Optimizations that should only be used on a specific version"""
 
+import pytest
+from personal_python_ast_optimizer.parser.config import ExtrasToSkipConfig
+
 from tests.utils import (
+    BeforeAndAfter,
     BeforeAndAfterBasedOnVersion,
+    run_minifiyer_and_assert_correct,
     run_minifiyer_and_assert_correct_multiple_versions,
 )
 
@@ -16,3 +21,118 @@ class Foo(object):
     )
 
     run_minifiyer_and_assert_correct_multiple_versions(before_and_after)
+
+
+def test_version_info_branches():
+    before_and_after = BeforeAndAfterBasedOnVersion(
+        """
+import sys
+if sys.version_info >= (3, 11):
+    a = 1
+else:
+    a = 2
+if sys.version_info[:2] < (3, 9) or sys.version_info.minor == 8:
+    b = 1
+if sys.version_info >= (3, 11, 2):
+    c = 1
+""",
+        {
+            "3.12": "a=1;c=1",
+            "3.11": "import sys\na=1\nif sys.version_info>=(3,11,2):c=1",
+            "3.8": "a=2;b=1",
+            None: """
+import sys
+if sys.version_info>=(3,11):a=1
+else:a=2
+if sys.version_info[:2]<(3,9)or sys.version_info.minor==8:b=1
+if sys.version_info>=(3,11,2):c=1
+""".strip(),
+        },
+    )
+
+    run_minifiyer_and_assert_correct_multiple_versions(
+        before_and_after,
+        extras_to_skip_config=ExtrasToSkipConfig(skip_constant_expressions=True),
+    )
+
+
+def test_import_fallbacks():
+    before_and_after = BeforeAndAfterBasedOnVersion(
+        """
+try:
+    import tomllib
+except ImportError:
+    import tomli as tomllib
+try:
+    import zoneinfo, graphlib
+except (ImportError, ModuleNotFoundError):
+    zoneinfo = graphlib = None
+try:
+    import tomllib
+except ValueError:
+    pass
+""",
+        {
+            "3.11": """
+import tomllib
+import zoneinfo,graphlib
+try:
+\timport tomllib
+except ValueError:pass
+""".strip(),
+            "3.10": """
+try:
+\timport tomllib
+except ImportError:
+\timport tomli as tomllib
+import zoneinfo,graphlib
+try:
+\timport tomllib
+except ValueError:pass
+""".strip(),
+        },
+    )
+
+    run_minifiyer_and_assert_correct_multiple_versions(before_and_after)
+
+
+@pytest.mark.parametrize(
+    "target_platform,expected",
+    [
+        ("win32", "a=1;b=1;c=1"),
+        ("linux", "a=2;b=2;c=2"),
+        (
+            None,
+            """
+import os,sys
+if sys.platform=='win32':a=1
+else:a=2
+b=1 if os.name=='nt'else 2
+if sys.platform.startswith('win'):c=1
+else:c=2
+""".strip(),
+        ),
+    ],
+)
+def test_platform_branches(target_platform: str | None, expected: str):
+    before_and_after = BeforeAndAfter(
+        """
+import os, sys
+if sys.platform == "win32":
+    a = 1
+else:
+    a = 2
+b = 1 if os.name == "nt" else 2
+if sys.platform.startswith("win"):
+    c = 1
+else:
+    c = 2
+""",
+        expected,
+    )
+
+    run_minifiyer_and_assert_correct(
+        before_and_after,
+        extras_to_skip_config=ExtrasToSkipConfig(skip_constant_expressions=True),
+        target_platform=target_platform,
+    )
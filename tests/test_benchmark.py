@@ -0,0 +1,48 @@
+import json
+
+from personal_python_ast_optimizer.benchmark import (
+    PHASES,
+    BenchmarkResult,
+    compare_to_baseline,
+    main,
+    run_benchmark,
+)
+
+
+def test_run_benchmark():
+    result: BenchmarkResult = run_benchmark(["a = 1", "def foo(:"], repeat=2)
+
+    assert result.files == 1
+    assert result.size_bytes == 5
+    assert result.errors == 1
+    assert set(result.phase_seconds) == set(PHASES)
+    assert result.total_seconds() > 0
+
+
+def test_compare_to_baseline():
+    baseline = BenchmarkResult(10, 100, 0, {phase: 1.0 for phase in PHASES})
+    result = BenchmarkResult(
+        20, 200, 0, {"parse": 2.0, "skip": 3.0, "unparse": 1.0, "autoflake": 2.1}
+    )
+
+    assert compare_to_baseline(result, baseline) == [
+        "skip is 50.0% slower than baseline"
+    ]
+
+
+def test_main_saves_and_compares(tmp_path):
+    (tmp_path / "a.py").write_text("a = 1\n")
+    output: str = str(tmp_path / "result.json")
+
+    assert main(["--corpus", str(tmp_path), "--output", output]) == 0
+
+    with open(output) as fp:
+        saved: dict = json.load(fp)
+    assert saved["files"] == 1
+
+    # Pretend the saved run took no time so this run is always slower
+    saved["phase_seconds"] = {phase: 1e-12 for phase in PHASES}
+    with open(output, "w") as fp:
+        json.dump(saved, fp)
+
+    assert main(["--corpus", str(tmp_path), "--baseline", output]) == 1
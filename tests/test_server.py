@@ -0,0 +1,111 @@
+import io
+import json
+import socket
+import threading
+
+import pytest
+from personal_python_ast_optimizer.parser.config import SkipConfig
+from personal_python_ast_optimizer.server import (
+    MinifyServer,
+    create_unix_socket_server,
+    serve_stream,
+)
+
+_config: dict = {
+    "tokens_to_skip_config": {"functions": ["foo", "baz"]},
+    "extras_to_skip_config": {"skip_type_hints": False},
+}
+
+
+def test_minify_request():
+    response: dict = MinifyServer().handle_request(
+        {
+            "id": 1,
+            "source": "def foo(): pass\na: int = 1",
+            "config": _config,
+            "module_name": "a",
+        }
+    )
+
+    assert response == {
+        "id": 1,
+        "source": "a:int=1",
+        "warnings": ["a: requested to skip functions baz but was not found"],
+    }
+
+
+def test_requests_share_config():
+    server = MinifyServer()
+    request: dict = {"id": 1, "source": "def foo(): pass", "config": _config}
+
+    # Tokens found by one request don't count for the next
+    assert server.handle_request(request) == server.handle_request(request)
+    assert server.get_config(_config) is server.get_config(_config)
+
+
+def test_bad_requests():
+    server = MinifyServer()
+
+    assert "error" in json.loads(server.handle_line("not json"))
+    assert "error" in server.handle_request({"id": 1, "source": "def foo(:"})
+    assert "error" in server.handle_request(
+        {"id": 2, "source": "a=1", "config": {"unknown": 1}}
+    )
+
+
+def test_configs_cached(tmp_path):
+    server = MinifyServer()
+    config_path: str = str(tmp_path / "config.json")
+    with open(config_path, "w") as fp:
+        json.dump(_config, fp)
+
+    config: SkipConfig | None = server.get_config(config_path)
+
+    assert config is not None
+    assert server.get_config(config_path) is config
+    assert server.get_config(dict(_config)) is server.get_config(_config)
+
+
+def test_serve_stream():
+    requests: str = '{"id": 1, "source": "a = 1"}\n\n{"id": 2, "source": "b = 2"}\n'
+    output = io.StringIO()
+
+    serve_stream(MinifyServer(), io.StringIO(requests), output)
+
+    responses: list[dict] = [
+        json.loads(line) for line in output.getvalue().splitlines()
+    ]
+    assert [response["source"] for response in responses] == ["a=1", "b=2"]
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+def test_serve_unix_socket(tmp_path):
+    path: str = str(tmp_path / "minifier.sock")
+    # Listening once created, so clients can connect right away
+    socket_server = create_unix_socket_server(MinifyServer(), path)
+    thread = threading.Thread(target=socket_server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        clients: list[socket.socket] = []
+        for index in range(2):
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            # Fails instead of hanging if the server never answers
+            client.settimeout(5)
+            client.connect(path)
+            client.sendall(
+                json.dumps({"id": index, "source": "a = 1"}).encode() + b"\n"
+            )
+            clients.append(client)
+
+        for index, client in enumerate(clients):
+            with client, client.makefile("r") as fp:
+                assert json.loads(fp.readline()) == {
+                    "id": index,
+                    "source": "a=1",
+                    "warnings": [],
+                }
+    finally:
+        socket_server.shutdown()
+        socket_server.server_close()
+        thread.join(5)
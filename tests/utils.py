@@ -32,6 +32,7 @@ class BeforeAndAfterBasedOnVersion:
 
 def run_minifiyer_and_assert_correct_multiple_versions(
     source: BeforeAndAfterBasedOnVersion,
+    extras_to_skip_config: ExtrasToSkipConfig = ExtrasToSkipConfig(),
 ):
     target_python_version: tuple[int, int] | None
     for version, expected in source.after.items():
@@ -43,7 +44,9 @@ def run_minifiyer_and_assert_correct_multiple_versions(
         version_specific_source = BeforeAndAfter(source.before, expected)
 
         run_minifiyer_and_assert_correct(
-            version_specific_source, target_python_version=target_python_version
+            version_specific_source,
+            target_python_version=target_python_version,
+            extras_to_skip_config=extras_to_skip_config,
         )
 
 
@@ -53,6 +56,8 @@ def run_minifiyer_and_assert_correct(
     constant_vars_to_fold: dict[str, int | str] | None = None,
     sections_to_skip_config: SectionsToSkipConfig = SectionsToSkipConfig(),
     tokens_to_skip_config: TokensToSkipConfig = TokensToSkipConfig(),
+    extras_to_skip_config: ExtrasToSkipConfig = ExtrasToSkipConfig(),
+    target_platform: str | None = None,
 ):
     unparser: MinifyUnparser = MinifyUnparser()
 
@@ -65,7 +70,8 @@ def run_minifiyer_and_assert_correct(
             constant_vars_to_fold,
             sections_to_skip_config,
             tokens_to_skip_config,
-            ExtrasToSkipConfig(),  # TODO: test
+            extras_to_skip_config,
+            target_platform,
         ),
     )
     assert python_code_is_valid(minified_code)